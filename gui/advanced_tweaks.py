@@ -27,39 +27,17 @@ from scripts.extra import (
     git_keystore,
     zeroconf_discover_pw,
     airplay_discover_pw,
+    is_git_keystore_enabled,
+    is_zeroconf_enabled,
+    is_airplay_enabled,
 )
-from programs.config import (
-    BLUE_RIGHT_ARROW_ICON_PATH,
-    ZEROCONF_DEST_PATH,
-    AIRPLAY_DEST_PATH,
-)
+from programs.config import BLUE_RIGHT_ARROW_ICON_PATH
 
 
 def set_status_icon(label: QLabel, enabled):
     apply_status_icon(label, enabled)
 
 
-def is_airplay_enabled():
-    return AIRPLAY_DEST_PATH.exists()
-
-
-def is_zeroconf_enabled():
-    return ZEROCONF_DEST_PATH.exists()
-
-
-def is_git_keystore_enabled():
-    result = subprocess.run(
-        ["git", "config", "--global", "credential.helper"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        check=False,
-    )
-    if result.returncode not in (0, 1):
-        return None
-    return result.stdout.strip() == "store"
-
-
 class AdvancedTweaks(QMainWindow):
     ADV_BUTTON_WIDTH = 300
 
@@ -1,55 +1,61 @@
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QObject, QTimer
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtWidgets import (
     QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QPushButton,
-    QListWidget, QListWidgetItem, QMessageBox, QLabel
+    QMessageBox, QLabel
 )
 
 from programs.apps_file import load_apps_from_file, load_yaml
 from programs.installer_logic import (
-    is_app_installed, app_install
+    get_installed_index, open_terminal, describe_packages
 )
+from programs.install_pipeline import InstallPipeline, describe_timings, pipeline_supported, root_prompt_count
+from programs.pty_runner import pty_supported
+from programs.transaction_planner import describe_plan, format_size, plan_install
 
 try:
     from .ui_helpers import create_back_button, create_select_refresh_row
     from .theme import configure_main_window, create_page_header
+    from .package_state import get_package_state_notifier
+    from .package_model import PackageListModel, PackageFilterProxyModel, create_package_view
+    from .install_console import InstallConsole, PHASE_LABELS
+    from .task_runner import PRIORITY_UI, get_task_runner
 except ImportError:
     from ui_helpers import create_back_button, create_select_refresh_row
     from theme import configure_main_window, create_page_header
-
-
-class AppManagerWorker(QObject):
-    finished = pyqtSignal(list, list)  # Returns (all_apps, uninstalled_apps)
-    error = pyqtSignal(str)
-
-    def run(self):
-        try:
-            # 1. Get the full list from the file
-            all_apps = load_apps_from_file()
-            # 2. Filter for what's actually missing
-            uninstalled = [app for app in all_apps if not is_app_installed(app)]
-            # 3. Return both so the UI knows the full list AND the display list
-            self.finished.emit(all_apps, uninstalled)
-        except Exception as e:
-            self.error.emit(str(e))
-
-
-class InstallOperationWorker(QObject):
-    finished = pyqtSignal()
-    error = pyqtSignal(str)
-
-    def __init__(self, operations):
-        super().__init__()
-        self.operations = operations
-
-    def run(self):
-        try:
-            for apps, method in self.operations:
-                process = app_install(apps, method)
-                if process and hasattr(process, "wait"):
-                    process.wait()
-            self.finished.emit()
-        except Exception as e:
-            self.error.emit(str(e))
+    from package_state import get_package_state_notifier
+    from package_model import PackageListModel, PackageFilterProxyModel, create_package_view
+    from install_console import InstallConsole, PHASE_LABELS
+    from task_runner import PRIORITY_UI, get_task_runner
+
+
+def load_missing_apps(force=False):
+    """(all apps from the file, rows for the uninstalled ones); ``force`` rebuilds the installed index first."""
+    if force:
+        get_installed_index(force=True)
+    all_apps = load_apps_from_file()
+    # One index build, O(1) per app
+    installed_index = get_installed_index()
+    return all_apps, describe_packages([app for app in all_apps if not installed_index.is_installed(app)])
+
+
+def run_install_steps(plan):
+    # Steps are ordered: repo packages (incl. AUR build deps) first, then the AUR.
+    for step in plan["steps"]:
+        process = open_terminal(step["command"])
+        if process and hasattr(process, "wait"):
+            process.wait()
+
+
+def run_pipeline_task(context, plan):
+    """Runs an InstallPipeline, reporting "output", "progress" and "stage" to the UI thread."""
+    pipeline = InstallPipeline(
+        plan,
+        on_output=lambda label, text: context.report("output", (label, text)),
+        on_event=lambda event: context.report("progress", event),
+        on_stage=lambda stage: context.report("stage", stage),
+    )
+    context.token.add_callback(pipeline.cancel)
+    return pipeline.run()
 
 
 class ArchAppInstaller(QMainWindow):
@@ -59,15 +65,18 @@ class ArchAppInstaller(QMainWindow):
         self.frame_layout = None
         self.back_button_container = None
         self.back_lbl = None
-        self.thread = None
-        self.worker = None
-        self.action_thread = None
-        self.action_worker = None
+        self.tasks = get_task_runner()
+        self.load_task = None
+        self.action_task = None
+        self.plan_task = None
         self.refresh_button = None
         self.install_button = None
         self.select_all_button = None
         self.back_button = None
-        self.list_widget = None
+        self.package_model = None
+        self.proxy_model = None
+        self.package_view = None
+        self.console = None
         self.loading_label = None
         self.bottom_layout = None
         self.third_layout = None
@@ -81,7 +90,11 @@ class ArchAppInstaller(QMainWindow):
         self.setWindowTitle("Arch App Installer")
         configure_main_window(self)
         self.apps = []
-        self.selected_apps = []
+        # (package state generation, app list) of the last successful/in-flight load
+        self.loaded_state = None
+        self.loading_state = None
+        self.package_state = get_package_state_notifier()
+        self.package_state.changed.connect(self.on_package_state_changed)
         self.init_ui()
         self.load_apps_async()
 
@@ -98,12 +111,18 @@ class ArchAppInstaller(QMainWindow):
         self.loading_label.setObjectName("syncStatusLabel")
         self.loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
-        # List widget to display Apps
-        self.list_widget = QListWidget()
-        self.list_widget.setSelectionMode(QListWidget.MultiSelection)
+        # Package table to display Apps
+        self.package_model = PackageListModel(self)
+        self.proxy_model = PackageFilterProxyModel(self)
+        self.proxy_model.setSourceModel(self.package_model)
+        self.package_view = create_package_view(self.proxy_model)
 
-        # Add Apps to the list
-        self.refresh_app_list()
+        # In-app console for install runs; hidden until the first one
+        self.console = InstallConsole()
+        self.console.progress.connect(self.on_install_progress)
+        self.console.finished.connect(self.on_install_console_finished)
+        self.console.stop_requested.connect(self.cancel_install)
+        self.console.hide()
 
         self.back_button_container, self.back_btn, self.back_lbl, self.frame_layout = create_back_button(
             self.go_back_to_setup
@@ -115,7 +134,7 @@ class ArchAppInstaller(QMainWindow):
         self.install_button.setFixedWidth(200)
 
         self.third_layout, self.select_all_button, self.refresh_button = create_select_refresh_row(
-            self.toggle_select_all_apps, self.load_apps_async
+            self.toggle_select_all_apps, self.force_refresh_apps
         )
 
         self.bottom_layout.addWidget(self.install_button)
@@ -126,180 +145,144 @@ class ArchAppInstaller(QMainWindow):
         self.main_layout.addLayout(self.third_layout)
         self.main_layout.addSpacing(20)
         self.main_layout.addWidget(self.loading_label)
-        self.main_layout.addWidget(self.list_widget)
+        self.main_layout.addWidget(self.package_view, 2)
+        self.main_layout.addWidget(self.console, 1)
         self.main_layout.addSpacing(20)
         self.main_layout.addLayout(self.bottom_layout)
 
         self.central_widget.setLayout(self.main_layout)
 
-    def load_apps_async(self):
-        if self.thread and self.thread.isRunning():
-            return
-
-        self.loading_label.show()
-        self.start_loading_animation("Syncing app list")
-
-        self.thread = QThread()
-        self.worker = AppManagerWorker()
-        self.worker.moveToThread(self.thread)
-
-        self.thread.started.connect(self.worker.run)
-
-        # Connect to the final UI updater
-        self.worker.finished.connect(self.update_ui_with_apps)
-        self.worker.error.connect(self.on_error)
+    def current_state(self):
+        return self.package_state.generation, tuple(load_apps_from_file())
 
-        # Standard Cleanup
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.thread.finished.connect(self.cleanup_thread)
+    def is_installing(self):
+        return self.action_task is not None or self.console.is_running()
 
-        self.thread.start()
+    def on_package_state_changed(self, _generation):
+        if not self.is_installing():
+            self.load_apps_async()
 
-    def cleanup_thread(self):
-        self.thread = None
-        self.worker = None
+    def force_refresh_apps(self):
+        # The Refresh button reloads even when the watcher saw no change (it can miss some).
+        self.load_apps_async(force=True)
 
-    def on_apps_loaded(self, apps):
-        self.apps = apps
-
-        # SAFETY: Ensure the 'loading' thread is fully dead before starting 'check' thread
-        if self.thread and self.thread.isRunning():
-            self.thread.quit()
-            self.thread.wait()
+    def load_apps_async(self, force=False):
+        if self.load_task is not None:
+            return
+        # Nothing was installed/removed and the app list is unchanged: the shown list is current.
+        state = self.current_state()
+        if state == self.loaded_state and not force:
+            return
+        self.loading_state = state
 
-        self.loading_label.setText("Checking installation status...")
+        self.loading_label.show()
+        self.start_loading_animation("Syncing app list")
 
-        self.thread = QThread()
-        self.worker = AppManagerWorker(self.apps)
-        self.worker.moveToThread(self.thread)
+        self.load_task = self.tasks.submit(
+            load_missing_apps,
+            force,
+            key="missing apps",
+            priority=PRIORITY_UI,
+            on_finished=self.on_apps_loaded,
+            on_error=self.on_error,
+            on_cancelled=self.cleanup_load_task,
+        )
 
-        self.thread.started.connect(self.worker.run)
-        # Don't forget this connection!
-        self.worker.finished.connect(self.on_apps_checked)
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.thread.finished.connect(self.cleanup_thread)
+    def on_apps_loaded(self, result):
+        all_apps, uninstalled_apps = result
+        self.update_ui_with_apps(all_apps, uninstalled_apps)
+        self.cleanup_load_task()
 
-        self.thread.start()
+    def cleanup_load_task(self):
+        self.load_task = None
+        # Package state changed while this load was running: load again.
+        if self.loaded_state is not None and self.loaded_state == self.loading_state:
+            self.load_apps_async()
 
     def on_error(self, error_message):
         QMessageBox.critical(
             self, "Error", f"Failed to load apps: {error_message}")
         self.stop_loading_animation()
         self.loading_label.hide()
-
-    def refresh_app_list(self):
-        """Only handles UI state before/during the check"""
-        self.list_widget.clear()
-        loading_item = QListWidgetItem("Checking system for installed apps...")
-        loading_item.setFlags(loading_item.flags() & ~
-        Qt.ItemFlag.ItemIsSelectable)
-        self.list_widget.addItem(loading_item)
-        # Don't start a thread here; let load_apps_async handle it.
+        self.cleanup_load_task()
 
     def closeEvent(self, event):
         self.stop_loading_animation()
-        if self.action_thread and self.action_thread.isRunning():
-            self.action_thread.quit()
-            self.action_thread.wait(3000)
-        if self.thread and self.thread.isRunning():
-            # 1. Ask the thread to stop
-            self.thread.quit()
-            # 2. Block the UI for a moment to let it finish safely
-            if not self.thread.wait(3000):  # Wait up to 3 seconds
-                print("Thread timed out, terminating...")
-                self.thread.terminate()
+        self.console.shutdown()
+        self.cancel_install()
+        for task in (self.load_task, self.plan_task):
+            if task is not None:
+                task.cancel()
         event.accept()
 
-    def on_apps_checked(self, uninstalled_apps):
-        # Hide loading UI
-        self.loading_label.hide()
-
-        self.list_widget.clear()
-        if not uninstalled_apps:
-            item = QListWidgetItem("All apps installed!")
-            item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsSelectable)
-            self.list_widget.addItem(item)
-        else:
-            for app in uninstalled_apps:
-                item = QListWidgetItem(app)
-                item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-                item.setCheckState(
-                    Qt.CheckState.Checked if app in self.selected_apps else Qt.CheckState.Unchecked)
-                self.list_widget.addItem(item)
-
     def toggle_select_all_apps(self):
-        all_selected = all(
-            self.list_widget.item(i).checkState() == Qt.CheckState.Checked
-            for i in range(self.list_widget.count())
-            if self.list_widget.item(i).flags() & Qt.ItemFlag.ItemIsUserCheckable
-        )
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            if item.flags() & Qt.ItemFlag.ItemIsUserCheckable:
-                item.setCheckState(
-                    Qt.CheckState.Unchecked if all_selected else Qt.CheckState.Checked)
+        self.package_model.toggle_all_checked()
 
     def install_selected(self):
-        selected_apps = []
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            if item.checkState() == Qt.CheckState.Checked:
-                selected_apps.append(item.text())
-
-        if selected_apps:
-            confirm = QMessageBox.question(
-                self, "Confirm Installation",
-                f"Do you want to install the following apps?\n{', '.join(selected_apps)}",
-                QMessageBox.Yes | QMessageBox.No
-            )
-            if confirm == QMessageBox.Yes:
-                yaml_source_map = self.get_yaml_source_map()
-                pacman_list = []
-                paru_list = []
-                unknown_apps = []
-                for app in selected_apps:
-                    method = self.get_install_method_from_source(yaml_source_map.get(app))
-                    if method == "paru":
-                        paru_list.append(app)
-                    elif method == "pacman":
-                        pacman_list.append(app)
-                    else:
-                        unknown_apps.append(app)
-
-                operations = []
-                if pacman_list:
-                    operations.append((pacman_list, "pacman"))
-                if paru_list:
-                    operations.append((paru_list, "paru"))
-
-                if unknown_apps:
-                    QMessageBox.warning(
-                        self,
-                        "Unknown Source",
-                        f"Could not detect install source for: {', '.join(unknown_apps)}",
-                    )
-                if operations:
-                    self.start_install_operations(operations)
-                    return
-        else:
+        selected_apps = self.package_model.checked_names()
+        if not selected_apps:
             QMessageBox.warning(self, "No Selection",
                                 "No apps selected for installation.")
+            self.load_apps_async()
+            return
+        if self.plan_task is not None or self.is_installing():
+            return
+
+        self.install_button.setEnabled(False)
+        self.loading_label.show()
+        self.start_loading_animation("Planning installation")
+
+        self.plan_task = self.tasks.submit(
+            plan_install,
+            selected_apps,
+            self.get_yaml_source_map(),
+            name="install plan",
+            priority=PRIORITY_UI,
+            on_finished=self.on_plan_ready,
+            on_error=self.on_plan_error,
+            on_cancelled=self.cleanup_plan_task,
+        )
+
+    def on_plan_ready(self, plan):
+        self.cleanup_plan_task()
+        self.stop_loading_animation()
+        self.loading_label.hide()
+        self.install_button.setEnabled(True)
+
+        if not plan["steps"]:
+            QMessageBox.information(self, "Nothing to Install", describe_plan(plan) or "Nothing to install.")
+            self.load_apps_async()
+            return
+
+        package_count = len(plan["repo_packages"]) + len(plan["aur_packages"])
+        summary = (
+            f"Install {package_count} packages in {len(plan['steps'])} steps?\n"
+            f"Repositories: {len(plan['repo_packages'])} packages (+{len(plan['pulled_in'])} dependencies), "
+            f"{format_size(plan['download_size'])} download, {format_size(plan['install_size'])} installed\n"
+            f"AUR: {len(plan['aur_packages'])} packages"
+        )
+        if plan["unknown"]:
+            summary += f"\nSkipped, source not found: {', '.join(plan['unknown'])}"
+        prompts = root_prompt_count(plan) if pipeline_supported() else 0
+        if prompts > 1:
+            summary += f"\n\nThe system will ask for your password up to {prompts} times, once per root step."
+        confirm = QMessageBox(QMessageBox.Question, "Confirm Installation", summary,
+                              QMessageBox.Yes | QMessageBox.No, self)
+        confirm.setDetailedText(describe_plan(plan))
+        if confirm.exec_() == QMessageBox.Yes:
+            self.start_install_operations(plan)
+            return
         self.load_apps_async()
 
-    @staticmethod
-    def get_install_method_from_source(source):
-        if not source:
-            return None
-        normalized = str(source).strip().lower()
-        if normalized in {"pacman", "official", "repo", "repository"}:
-            return "pacman"
-        if normalized in {"paru", "aur"}:
-            return "paru"
-        return None
+    def on_plan_error(self, error_message):
+        self.cleanup_plan_task()
+        self.stop_loading_animation()
+        self.loading_label.hide()
+        self.install_button.setEnabled(True)
+        QMessageBox.critical(self, "Install Error", f"Could not plan the installation: {error_message}")
+
+    def cleanup_plan_task(self):
+        self.plan_task = None
 
     @staticmethod
     def get_yaml_source_map():
@@ -315,22 +298,17 @@ class ArchAppInstaller(QMainWindow):
     def update_ui_with_apps(self, all_apps, uninstalled_apps):
         """The single point of entry for your UI data"""
         self.apps = all_apps  # Keep the master list for the editor
+        self.loaded_state = self.loading_state
         self.stop_loading_animation()
         self.loading_label.hide()
-        self.list_widget.clear()
+        # Keep earlier check marks for apps that are still missing
+        self.package_model.set_packages(uninstalled_apps, self.package_model.checked)
+        self.proxy_model.sort(self.package_view.header().sortIndicatorSection(),
+                              self.package_view.header().sortIndicatorOrder())
 
         if not uninstalled_apps:
-            item = QListWidgetItem("All apps are currently installed!")
-            item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsSelectable)
-            self.list_widget.addItem(item)
-        else:
-            for app in uninstalled_apps:
-                item = QListWidgetItem(app)
-                item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-                # Check if it was previously selected
-                state = Qt.Checked if app in self.selected_apps else Qt.Unchecked
-                item.setCheckState(state)
-                self.list_widget.addItem(item)
+            self.loading_label.setText("All apps are currently installed!")
+            self.loading_label.show()
 
     def go_back_to_setup(self):
         self.setup_window.show()
@@ -355,8 +333,8 @@ class ArchAppInstaller(QMainWindow):
         if self.loading_timer and self.loading_timer.isActive():
             self.loading_timer.stop()
 
-    def start_install_operations(self, operations):
-        if self.action_thread and self.action_thread.isRunning():
+    def start_install_operations(self, plan):
+        if self.is_installing():
             return
 
         self.install_button.setEnabled(False)
@@ -365,17 +343,87 @@ class ArchAppInstaller(QMainWindow):
         self.loading_label.show()
         self.start_loading_animation("Waiting installation to finish")
 
-        self.action_thread = QThread()
-        self.action_worker = InstallOperationWorker(operations)
-        self.action_worker.moveToThread(self.action_thread)
-        self.action_thread.started.connect(self.action_worker.run)
-        self.action_worker.finished.connect(self.on_install_operations_finished)
-        self.action_worker.error.connect(self.on_install_operations_error)
-        self.action_worker.finished.connect(self.action_thread.quit)
-        self.action_worker.finished.connect(self.action_worker.deleteLater)
-        self.action_thread.finished.connect(self.action_thread.deleteLater)
-        self.action_thread.finished.connect(self.cleanup_action_thread)
-        self.action_thread.start()
+        if pipeline_supported():
+            self.start_install_pipeline(plan)
+            return
+        if pty_supported():
+            self.console.clear()
+            self.console.show()
+            self.console.run_commands([step["command"] for step in plan["steps"]])
+            return
+
+        # No pseudo-terminals: run each step in an external terminal emulator instead.
+        self.action_task = self.tasks.submit(
+            run_install_steps,
+            plan,
+            name="install steps",
+            on_finished=self.on_install_steps_finished,
+            on_error=self.on_install_steps_error,
+        )
+
+    def on_install_steps_finished(self, _result):
+        self.cleanup_action_task()
+        self.on_install_operations_finished()
+
+    def on_install_steps_error(self, error_message):
+        self.cleanup_action_task()
+        self.on_install_operations_error(error_message)
+
+    def start_install_pipeline(self, plan):
+        self.console.clear()
+        self.console.show()
+        self.console.set_running(True)
+
+        self.action_task = self.tasks.submit(
+            run_pipeline_task,
+            plan,
+            name="install pipeline",
+            with_context=True,
+            on_progress=self.on_install_pipeline_progress,
+            on_finished=self.on_install_pipeline_finished,
+            on_error=self.on_install_pipeline_error,
+            on_cancelled=self.on_install_pipeline_cancelled,
+        )
+
+    def on_install_pipeline_progress(self, kind, value):
+        if kind == "output":
+            self.console.append_job_output(*value)
+        elif kind == "progress":
+            self.console.show_progress(value)
+            self.on_install_progress(value)
+        elif kind == "stage":
+            self.on_install_stage_changed(value)
+
+    def on_install_stage_changed(self, stage):
+        self.loading_base_text = f"Stage: {stage}"
+
+    def on_install_pipeline_finished(self, report):
+        self.cleanup_action_task()
+        self.console.set_running(False)
+        self.console.append_output(f"\n{describe_timings(report)}\n")
+        if report["failed"]:
+            message = QMessageBox(QMessageBox.Warning, "Install Incomplete",
+                                  f"{len(report['failed'])} packages could not be installed.",
+                                  QMessageBox.Ok, self)
+            message.setDetailedText(describe_timings(report))
+            message.exec_()
+        self.on_install_operations_finished()
+
+    def on_install_pipeline_error(self, error_message):
+        self.cleanup_action_task()
+        self.console.set_running(False)
+        self.on_install_operations_error(error_message)
+
+    def on_install_pipeline_cancelled(self):
+        self.cleanup_action_task()
+        self.console.set_running(False)
+        self.console.append_output("\nInstallation cancelled.\n")
+        self.on_install_operations_finished()
+
+    def cancel_install(self):
+        # Only the pipeline can be stopped; terminal steps run until the user closes them.
+        if self.action_task is not None and self.action_task.name == "install pipeline":
+            self.action_task.cancel()
 
     def on_install_operations_finished(self):
         self.stop_loading_animation()
@@ -394,6 +442,16 @@ class ArchAppInstaller(QMainWindow):
         QMessageBox.critical(self, "Install Error", f"Installation failed: {error_message}")
         self.load_apps_async()
 
-    def cleanup_action_thread(self):
-        self.action_thread = None
-        self.action_worker = None
+    def on_install_progress(self, event):
+        label = PHASE_LABELS.get(event["phase"], event["phase"].title())
+        percent = f" {event['percent']}%" if event.get("percent") is not None else ""
+        self.loading_base_text = f"{label} {event['package']}{percent}"
+
+    def on_install_console_finished(self, exit_code):
+        if exit_code == 0:
+            self.on_install_operations_finished()
+        else:
+            self.on_install_operations_error(f"exit code {exit_code}\n\n{self.console.tail()}")
+
+    def cleanup_action_task(self):
+        self.action_task = None
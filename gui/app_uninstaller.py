@@ -1,60 +1,49 @@
 import sys
 from pathlib import Path
 
-from PyQt5.QtCore import Qt, QThread, QObject, pyqtSignal
-from PyQt5.QtGui import QIcon
-from PyQt5.QtWidgets import QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QPushButton, QListWidget, QListWidgetItem, \
-    QMessageBox, QInputDialog
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QPushButton, QLabel, QMessageBox
 
 parent_dir = str(Path(__file__).resolve().parent.parent.joinpath("programs"))
 sys.path.append(parent_dir)
 
-from programs.installer_logic import (list_all_installed_apps, remove_apps)
+from programs.installer_logic import (describe_packages, get_installed_index, list_all_installed_apps, remove_apps)
 
 try:
     from .ui_helpers import create_back_button, create_select_refresh_row
     from .theme import configure_main_window, create_page_header
+    from .package_state import get_package_state_notifier
+    from .package_model import PackageListModel, PackageFilterProxyModel, create_package_view, show_search_results
+    from .search_box import PackageSearchBox
+    from .task_runner import PRIORITY_UI, get_task_runner
 except ImportError:
     from ui_helpers import create_back_button, create_select_refresh_row
     from theme import configure_main_window, create_page_header
+    from package_state import get_package_state_notifier
+    from package_model import PackageListModel, PackageFilterProxyModel, create_package_view, show_search_results
+    from search_box import PackageSearchBox
+    from task_runner import PRIORITY_UI, get_task_runner
 
 
-class AppListWorker(QObject):
-    finished = pyqtSignal(list)
-    error = pyqtSignal(str)
+def load_installed_rows(force=False):
+    """One row dict per explicitly installed package; ``force`` rebuilds the installed index first."""
+    if force:
+        get_installed_index(force=True)
+    return describe_packages(list_all_installed_apps())
 
-    def run(self):
-        try:
-            self.finished.emit(list_all_installed_apps())
-        except Exception as e:
-            self.error.emit(str(e))
 
-
-class RemoveOperationWorker(QObject):
-    finished = pyqtSignal()
-    error = pyqtSignal(str)
-
-    def __init__(self, apps):
-        super().__init__()
-        self.apps = apps
-
-    def run(self):
-        try:
-            process = remove_apps(self.apps, "paru")
-            if process and hasattr(process, "wait"):
-                process.wait()
-            self.finished.emit()
-        except Exception as e:
-            self.error.emit(str(e))
+def remove_and_wait(apps):
+    process = remove_apps(apps, "paru")
+    if process and hasattr(process, "wait"):
+        process.wait()
 
 
 class AppUninstaller(QMainWindow):
     def __init__(self, setup_window):
         super().__init__()
-        self.thread = None
-        self.worker = None
-        self.action_thread = None
-        self.action_worker = None
+        self.tasks = get_task_runner()
+        self.load_task = None
+        self.action_task = None
         # Buttons
         self.back_lbl = None
         self.back_btn = None
@@ -62,11 +51,14 @@ class AppUninstaller(QMainWindow):
         self.back_button_container = None
         self.install_button = None
         self.select_all_button = None
-        self.search_button = None
+        self.search_box = None
         self.back_button = None
         self.refresh_button = None
         # layouts
-        self.list_widget = None
+        self.package_model = None
+        self.proxy_model = None
+        self.package_view = None
+        self.list_status_label = None
         self.bottom_layout = None
         self.third_layout = None
         self.app_layout = None
@@ -80,7 +72,11 @@ class AppUninstaller(QMainWindow):
         configure_main_window(self)
         # app list
         self.apps = []
-        self.search_icon_path = Path(__file__).resolve().parent.parent.joinpath("icons", "search.svg")
+        # package state generation of the last successful/in-flight load
+        self.loaded_generation = None
+        self.loading_generation = None
+        self.package_state = get_package_state_notifier()
+        self.package_state.changed.connect(self.on_package_state_changed)
         self.init_ui()
 
     def init_ui(self):
@@ -92,9 +88,14 @@ class AppUninstaller(QMainWindow):
         self.third_layout = QHBoxLayout()
         self.bottom_layout = QHBoxLayout()
 
-        # List widget to display Apps
-        self.list_widget = QListWidget()
-        self.list_widget.setSelectionMode(QListWidget.MultiSelection)
+        # Package table (model/view, so thousands of rows cost nothing until scrolled into view)
+        self.package_model = PackageListModel(self)
+        self.proxy_model = PackageFilterProxyModel(self)
+        self.proxy_model.setSourceModel(self.package_model)
+        self.package_view = create_package_view(self.proxy_model)
+        self.list_status_label = QLabel()
+        self.list_status_label.setObjectName("syncStatusLabel")
+        self.list_status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
         # Add Apps to the list
         self.refresh_app_list_async()
@@ -110,12 +111,11 @@ class AppUninstaller(QMainWindow):
 
         # select and refresh layout
         self.third_layout, self.select_all_button, self.refresh_button = create_select_refresh_row(
-            self.toggle_select_all_apps, self.refresh_app_list_async
+            self.toggle_select_all_apps, self.force_refresh_app_list
         )
-        self.search_button = QPushButton("Search")
-        self.search_button.setIcon(QIcon(str(self.search_icon_path)))
-        self.search_button.clicked.connect(self.search_app)
-        self.third_layout.insertWidget(1, self.search_button)
+        self.search_box = PackageSearchBox("Search installed apps...")
+        self.search_box.results_changed.connect(self.on_search_results)
+        self.third_layout.insertWidget(1, self.search_box, 1)
 
         # bottom layout
         self.bottom_layout.addWidget(self.install_button)
@@ -125,83 +125,78 @@ class AppUninstaller(QMainWindow):
         self.main_layout.addSpacing(20)
         self.main_layout.addLayout(self.app_layout)
         self.main_layout.addLayout(self.third_layout)
-        self.main_layout.addWidget(self.list_widget)
+        self.main_layout.addWidget(self.list_status_label)
+        self.main_layout.addWidget(self.package_view)
         self.main_layout.addSpacing(20)
         self.main_layout.addLayout(self.bottom_layout)
 
         self.main_window_frame.setLayout(self.main_layout)
 
     def refresh_app_list(self):
-        """Render current installed apps in the list widget."""
-        self.list_widget.clear()
+        """Render current installed apps in the package table."""
+        self.package_model.set_packages(self.apps, self.package_model.checked)
+        show_search_results(self.package_view, self.package_model.matches)
+        self.search_box.set_packages(self.apps)
         if self.apps:
-            for app in self.apps:
-                item = QListWidgetItem(app)
-                item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-                item.setCheckState(Qt.CheckState.Unchecked)
-                self.list_widget.addItem(item)
+            self.list_status_label.hide()
         else:
-            item = QListWidgetItem("No apps to remove.!")
-            item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsSelectable &
-                          ~Qt.ItemFlag.ItemIsUserCheckable)
-            self.list_widget.addItem(item)
-
-    def refresh_app_list_async(self):
-        if self.thread and self.thread.isRunning():
-            return
-
-        self.list_widget.clear()
-        loading_item = QListWidgetItem("Refreshing installed app list...")
-        loading_item.setFlags(loading_item.flags() & ~Qt.ItemFlag.ItemIsSelectable)
-        self.list_widget.addItem(loading_item)
-
-        self.thread = QThread()
-        self.worker = AppListWorker()
-        self.worker.moveToThread(self.thread)
-        self.thread.started.connect(self.worker.run)
+            self.list_status_label.setText("No apps to remove.!")
+            self.list_status_label.show()
 
-        self.worker.finished.connect(self.on_apps_loaded)
-        self.worker.error.connect(self.on_refresh_error)
+    def on_package_state_changed(self, _generation):
+        if self.action_task is None:
+            self.refresh_app_list_async()
 
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.thread.finished.connect(self.cleanup_thread)
+    def force_refresh_app_list(self):
+        # The Refresh button reloads even when the watcher saw no change (it can miss some).
+        self.refresh_app_list_async(force=True)
 
-        self.thread.start()
+    def refresh_app_list_async(self, force=False):
+        if self.load_task is not None:
+            return
+        # Nothing was installed/removed since the last load: the shown list is current.
+        generation = self.package_state.generation
+        if generation == self.loaded_generation and not force:
+            return
+        self.loading_generation = generation
+
+        self.list_status_label.setText("Refreshing installed app list...")
+        self.list_status_label.show()
+
+        self.load_task = self.tasks.submit(
+            load_installed_rows,
+            force,
+            key="installed apps",
+            priority=PRIORITY_UI,
+            on_finished=self.on_apps_loaded,
+            on_error=self.on_refresh_error,
+            on_cancelled=self.cleanup_load_task,
+        )
 
     def on_apps_loaded(self, apps):
         self.apps = apps
+        self.loaded_generation = self.loading_generation
         self.refresh_app_list()
+        self.cleanup_load_task()
 
     def on_refresh_error(self, error_message):
         QMessageBox.critical(self, "Error", f"Failed to refresh app list: {error_message}")
         self.apps = []
         self.refresh_app_list()
+        self.cleanup_load_task()
 
-    def cleanup_thread(self):
-        self.thread = None
-        self.worker = None
+    def cleanup_load_task(self):
+        self.load_task = None
+        # Package state changed while this load was running: load again.
+        if self.loaded_generation is not None and self.loaded_generation == self.loading_generation:
+            self.refresh_app_list_async()
 
     def toggle_select_all_apps(self):
         """Toggle between selecting and deselecting all apps."""
-        all_selected = all(
-            self.list_widget.item(i).checkState() == Qt.CheckState.Checked
-            for i in range(self.list_widget.count())
-            if self.list_widget.item(i).flags() & Qt.ItemFlag.ItemIsUserCheckable
-        )
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            if item.flags() & Qt.ItemFlag.ItemIsUserCheckable:
-                item.setCheckState(
-                    Qt.CheckState.Unchecked if all_selected else Qt.CheckState.Checked)
+        self.package_model.toggle_all_checked()
 
     def remove_selected(self):
-        selected_apps = []
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            if item.checkState() == Qt.CheckState.Checked:
-                selected_apps.append(item.text())
+        selected_apps = self.package_model.checked_names()
 
         if selected_apps:
             confirm = QMessageBox.question(
@@ -222,74 +217,44 @@ class AppUninstaller(QMainWindow):
         self.hide()  # Hide the current window
 
     def closeEvent(self, event):
-        if self.action_thread and self.action_thread.isRunning():
-            self.action_thread.quit()
-            self.action_thread.wait(3000)
-        if self.thread and self.thread.isRunning():
-            self.thread.quit()
-            self.thread.wait(3000)
+        self.search_box.stop()
+        if self.load_task is not None:
+            self.load_task.cancel()
         event.accept()
 
     def start_remove_operation(self, selected_apps):
-        if self.action_thread and self.action_thread.isRunning():
+        if self.action_task is not None:
             return
 
         self.install_button.setEnabled(False)
         self.refresh_button.setEnabled(False)
         self.select_all_button.setEnabled(False)
-        self.search_button.setEnabled(False)
-
-        self.action_thread = QThread()
-        self.action_worker = RemoveOperationWorker(selected_apps)
-        self.action_worker.moveToThread(self.action_thread)
-        self.action_thread.started.connect(self.action_worker.run)
-        self.action_worker.finished.connect(self.on_remove_operation_finished)
-        self.action_worker.error.connect(self.on_remove_operation_error)
-        self.action_worker.finished.connect(self.action_thread.quit)
-        self.action_worker.finished.connect(self.action_worker.deleteLater)
-        self.action_thread.finished.connect(self.action_thread.deleteLater)
-        self.action_thread.finished.connect(self.cleanup_action_thread)
-        self.action_thread.start()
-
-    def on_remove_operation_finished(self):
+        self.search_box.setEnabled(False)
+
+        self.action_task = self.tasks.submit(
+            remove_and_wait,
+            selected_apps,
+            name="remove apps",
+            on_finished=self.on_remove_operation_finished,
+            on_error=self.on_remove_operation_error,
+        )
+
+    def on_remove_operation_finished(self, _result):
+        self.action_task = None
         self.install_button.setEnabled(True)
         self.refresh_button.setEnabled(True)
         self.select_all_button.setEnabled(True)
-        self.search_button.setEnabled(True)
+        self.search_box.setEnabled(True)
         self.refresh_app_list_async()
 
     def on_remove_operation_error(self, error_message):
+        self.action_task = None
         self.install_button.setEnabled(True)
         self.refresh_button.setEnabled(True)
         self.select_all_button.setEnabled(True)
-        self.search_button.setEnabled(True)
+        self.search_box.setEnabled(True)
         QMessageBox.critical(self, "Remove Error", f"Removal failed: {error_message}")
         self.refresh_app_list_async()
 
-    def cleanup_action_thread(self):
-        self.action_thread = None
-        self.action_worker = None
-
-    def search_app(self):
-        search_text, ok = QInputDialog.getText(
-            self, "Search Application", "Enter app name to search:"
-        )
-        if not ok:
-            return
-
-        query = search_text.strip()
-        if not query:
-            QMessageBox.information(self, "Search", "Please enter an application name.")
-            return
-
-        lower_query = query.lower()
-        for index in range(self.list_widget.count()):
-            item = self.list_widget.item(index)
-            if not (item.flags() & Qt.ItemFlag.ItemIsUserCheckable):
-                continue
-            if lower_query in item.text().lower():
-                self.list_widget.setCurrentRow(index)
-                self.list_widget.scrollToItem(item)
-                return
-
-        QMessageBox.information(self, "Not Found", f"No application found for '{query}'.")
+    def on_search_results(self, ranked_names):
+        show_search_results(self.package_view, ranked_names)
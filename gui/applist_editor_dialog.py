@@ -1,23 +1,22 @@
-import subprocess
-from pathlib import Path
-
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QListWidget, QPushButton, QMessageBox, QInputDialog, QHBoxLayout, \
     QListWidgetItem
 
 from programs.apps_file import add_app_to_yaml, get_app_source, remove_app_from_yaml
 from programs.installer_logic import (
-    command_exists,
+    detect_install_methods,
     detect_installed_method,
     get_install_method_from_source,
     is_app_installed,
     remove_apps,
 )
+from programs.sync_db import get_sync_index
 try:
     from .theme import configure_dialog
+    from .search_box import PackageSearchBox
 except ImportError:
     from theme import configure_dialog
+    from search_box import PackageSearchBox
 
 
 class AppListEditorDialog(QDialog):
@@ -28,13 +27,16 @@ class AppListEditorDialog(QDialog):
         configure_dialog(self, width=620, height=720, min_width=560, min_height=640)
         self.selected_item = None
         self.apps = apps
-        self.search_icon_path = Path(__file__).resolve().parent.parent.joinpath("icons", "search.svg")
 
         # use vertical box layout
         layout = QHBoxLayout(self)
         button_layout = QVBoxLayout()
         list_layout = QVBoxLayout()
 
+        # Search-as-you-type over names and repo descriptions
+        self.search_box = PackageSearchBox("Search apps...", self)
+        self.search_box.results_changed.connect(self.on_search_results)
+
         # List widget
         self.list_widget = QListWidget(self)
         self.populate_list()
@@ -51,22 +53,17 @@ class AppListEditorDialog(QDialog):
         remove_btn = QPushButton("Remove Selected", self)
         remove_btn.clicked.connect(self.remove_selected)
 
-        # Search button
-        search_btn = QPushButton("Search", self)
-        search_btn.setIcon(QIcon(str(self.search_icon_path)))
-        search_btn.clicked.connect(self.search_app)
-
         # Cancel button
         cancel_btn = QPushButton("Cancel", self)
         cancel_btn.clicked.connect(self.reject)
 
         # list
+        list_layout.addWidget(self.search_box)
         list_layout.addWidget(self.list_widget)
 
         # button layout
         button_layout.addStretch()
         button_layout.addWidget(add_btn)
-        button_layout.addWidget(search_btn)
         button_layout.addWidget(remove_btn)
         button_layout.addSpacing(15)
         button_layout.addWidget(ok_btn)
@@ -83,6 +80,7 @@ class AppListEditorDialog(QDialog):
             item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
             item.setCheckState(Qt.CheckState.Unchecked)
             self.list_widget.addItem(item)
+        self.search_box.set_packages(self.apps)
 
     def get_checked_apps(self):
         checked_apps = []
@@ -185,38 +183,32 @@ class AppListEditorDialog(QDialog):
         added_apps = []
         duplicate_apps = []
         not_found_apps = []
+        sync_index = get_sync_index()
 
+        candidates = []
         for new_app in requested_apps:
             if new_app in self.apps:
                 duplicate_apps.append(new_app)
-                continue
-
-            available_in = []
-            try:
-                subprocess.run(
-                    ["pacman", "-Si", new_app],
-                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
-                )
-                available_in.append("pacman")
-            except subprocess.CalledProcessError:
-                pass
-
-            if command_exists("paru"):
-                try:
-                    subprocess.run(
-                        ["paru", "-Si", new_app],
-                        stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
-                    )
-                    available_in.append("AUR")
-                except subprocess.CalledProcessError:
-                    pass
-
-            if available_in:
-                self.apps.append(new_app)
-                add_app_to_yaml(new_app)
-                added_apps.append(f"{new_app} ({', '.join(available_in)})")
+            else:
+                candidates.append(new_app)
+
+        # Repo names come from the sync database index; the rest share one AUR RPC round trip.
+        methods = detect_install_methods(candidates)
+
+        for new_app in candidates:
+            source = methods.get(new_app)
+            if source == "pacman":
+                repo = sync_index.repo_of(new_app) if sync_index.is_available() else None
+                available_in = f"pacman: {repo}" if repo else "pacman"
+            elif source == "paru":
+                available_in = "AUR"
             else:
                 not_found_apps.append(new_app)
+                continue
+
+            self.apps.append(new_app)
+            add_app_to_yaml(new_app, source)
+            added_apps.append(f"{new_app} ({available_in})")
 
         self.apps.sort()
         self.populate_list()
@@ -237,24 +229,18 @@ class AppListEditorDialog(QDialog):
     def get_apps(self):
         return self.apps
 
-    def search_app(self):
-        search_text, ok = QInputDialog.getText(
-            self, "Search Application", "Enter app name to search:"
-        )
-        if not ok:
-            return
-
-        query = search_text.strip()
-        if not query:
-            QMessageBox.information(self, "Search", "Please enter an application name.")
-            return
-
-        lower_query = query.lower()
+    def on_search_results(self, ranked_names):
+        """Hide apps that do not match and jump to the best match."""
+        matches = None if ranked_names is None else set(ranked_names)
         for index in range(self.list_widget.count()):
             item = self.list_widget.item(index)
-            if lower_query in item.text().lower():
-                self.list_widget.setCurrentRow(index)
-                self.list_widget.scrollToItem(item)
-                return
-
-        QMessageBox.information(self, "Not Found", f"No application found for '{query}'.")
+            item.setHidden(matches is not None and item.text() not in matches)
+        if ranked_names:
+            best_match = self.list_widget.findItems(ranked_names[0], Qt.MatchFlag.MatchExactly)
+            if best_match:
+                self.list_widget.setCurrentItem(best_match[0])
+                self.list_widget.scrollToItem(best_match[0])
+
+    def done(self, result):
+        self.search_box.stop()
+        super().done(result)
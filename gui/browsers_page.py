@@ -1,5 +1,5 @@
 from .catalog_page import CatalogPage
-from programs.browsers_logic import load_browsers_with_status, run_browser_action
+from programs.browsers_logic import stream_browsers, run_browser_action
 
 
 class BrowsersPage(CatalogPage):
@@ -8,6 +8,6 @@ class BrowsersPage(CatalogPage):
             setup_window,
             "Web Browsers",
             "Web Browsers",
-            load_browsers_with_status,
+            stream_browsers,
             run_browser_action,
         )
@@ -1,7 +1,6 @@
 from pathlib import Path
 
-from PyQt5.QtCore import QObject, QThread, Qt, pyqtSignal
-from PyQt5.QtGui import QPixmap
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
 from PyQt5.QtWidgets import (
     QFrame,
     QHBoxLayout,
@@ -15,50 +14,35 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
+from programs.catalog_logic import catalog_action_command
 from programs.config import CHECKMARK_ICON_PATH, QUESTION_MARK_ICON_PATH, RED_X_ICON_PATH
+from programs.installer_logic import get_installed_index
+from programs.pty_runner import pty_supported
 
 try:
     from .ui_helpers import create_back_button
     from .theme import configure_main_window, create_page_header
+    from .package_state import get_package_state_notifier
+    from .pixmap_cache import cached_pixmap, ensure_thumbnail, screen_pixel_ratio
+    from .install_console import InstallConsole, PHASE_LABELS
+    from .task_runner import PRIORITY_UI, get_task_runner
 except ImportError:
     from ui_helpers import create_back_button
     from theme import configure_main_window, create_page_header
+    from package_state import get_package_state_notifier
+    from pixmap_cache import cached_pixmap, ensure_thumbnail, screen_pixel_ratio
+    from install_console import InstallConsole, PHASE_LABELS
+    from task_runner import PRIORITY_UI, get_task_runner
 
 
-class CatalogLoadWorker(QObject):
-    finished = pyqtSignal(list)
-    error = pyqtSignal(str)
-
-    def __init__(self, load_function):
-        super().__init__()
-        self.load_function = load_function
-
-    def run(self):
-        try:
-            self.finished.emit(self.load_function())
-        except Exception as e:
-            self.error.emit(str(e))
-
-
-class CatalogActionWorker(QObject):
-    finished = pyqtSignal()
-    error = pyqtSignal(str)
-
-    def __init__(self, entry, action_function):
-        super().__init__()
-        self.entry = entry
-        self.action_function = action_function
-
-    def run(self):
-        try:
-            self.action_function(self.entry)
-            self.finished.emit()
-        except Exception as e:
-            self.error.emit(str(e))
+class IconRelay(QObject):
+    """Outlives load tasks so icon downloads finishing later still reach the page."""
+    icon_ready = pyqtSignal(str, str)
 
 
 class CatalogPage(QMainWindow):
     ICON_SIZE = 72
+    STATUS_ICON_SIZE = 18
 
     def __init__(self, setup_window, title, noun_plural, load_function, action_function):
         super().__init__()
@@ -67,16 +51,26 @@ class CatalogPage(QMainWindow):
         self.noun_plural = noun_plural
         self.load_function = load_function
         self.action_function = action_function
-        self.thread = None
-        self.worker = None
-        self.action_thread = None
-        self.action_worker = None
+        self.tasks = get_task_runner()
+        self.load_task = None
+        self.action_task = None
         self.current_entry = None
         self.refresh_button = None
         self.status_label = None
         self.cards_layout = None
-        self.card_buttons = []
+        self.console = None
+        self.card_widgets = {}
+        self.icon_labels = {}
+        self.ready_icons = {}
+        self.icon_relay = IconRelay(self)
+        self.icon_relay.icon_ready.connect(self.on_icon_ready)
+        self.pixel_ratio = screen_pixel_ratio()
         self.back_button_container = None
+        # package state generation of the last successful/in-flight load
+        self.loaded_generation = None
+        self.loading_generation = None
+        self.package_state = get_package_state_notifier()
+        self.package_state.changed.connect(self.on_package_state_changed)
         self.setWindowTitle(title)
         configure_main_window(self)
         self.init_ui()
@@ -95,7 +89,7 @@ class CatalogPage(QMainWindow):
 
         self.refresh_button = QPushButton("Refresh")
         self.refresh_button.setFixedWidth(200)
-        self.refresh_button.clicked.connect(self.refresh_catalog_async)
+        self.refresh_button.clicked.connect(self.force_refresh_catalog)
 
         scroll_area = QScrollArea()
         scroll_area.setWidgetResizable(True)
@@ -107,47 +101,109 @@ class CatalogPage(QMainWindow):
         self.cards_layout.addStretch()
         scroll_area.setWidget(scroll_content)
 
+        # In-app console for install/uninstall runs; hidden until the first one
+        self.console = InstallConsole()
+        self.console.progress.connect(self.on_action_progress)
+        self.console.finished.connect(self.on_action_console_finished)
+        self.console.hide()
+
         layout.addWidget(header_widget)
         layout.addSpacing(12)
         layout.addWidget(self.status_label)
-        layout.addWidget(scroll_area)
+        layout.addWidget(scroll_area, 2)
+        layout.addWidget(self.console, 1)
         layout.addWidget(self.refresh_button, alignment=Qt.AlignmentFlag.AlignHCenter)
 
-    def refresh_catalog_async(self):
-        if self.thread and self.thread.isRunning():
+    def is_action_running(self):
+        return self.action_task is not None or self.console.is_running()
+
+    def on_package_state_changed(self, _generation):
+        if not self.is_action_running():
+            self.refresh_catalog_async()
+
+    def force_refresh_catalog(self):
+        # The Refresh button reloads even when the watcher saw no change (it can miss some).
+        self.refresh_catalog_async(force=True)
+
+    def refresh_catalog_async(self, force=False):
+        if self.load_task is not None:
+            return
+        # Nothing was installed/removed since the last load: the shown cards are current.
+        generation = self.package_state.generation
+        if generation == self.loaded_generation and not force:
             return
+        self.loading_generation = generation
 
         self.set_controls_enabled(False)
         self.status_label.setText(f"Refreshing {self.noun_plural.lower()}...")
-        self.clear_cards()
 
-        self.thread = QThread()
-        self.worker = CatalogLoadWorker(self.load_function)
-        self.worker.moveToThread(self.thread)
-        self.thread.started.connect(self.worker.run)
-        self.worker.finished.connect(self.on_entries_loaded)
-        self.worker.error.connect(self.on_entries_error)
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.worker.error.connect(self.thread.quit)
-        self.worker.error.connect(self.worker.deleteLater)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.thread.finished.connect(self.cleanup_thread)
-        self.thread.start()
-
-    def on_entries_loaded(self, entries):
+        self.load_task = self.tasks.submit(
+            self.load_catalog,
+            force,
+            key=("catalog", self.page_title),
+            priority=PRIORITY_UI,
+            with_context=True,
+            on_progress=self.on_load_progress,
+            on_finished=self.on_entries_loaded,
+            on_error=self.on_entries_error,
+            on_cancelled=self.cleanup_load_task,
+        )
+
+    def load_catalog(self, context, force=False):
+        # Staged: entries as soon as the YAML is parsed, then installed state;
+        # icons keep arriving via on_icon_fetched after this returns.
+        if force:
+            get_installed_index(force=True)
+        return self.load_function(
+            lambda entries: context.report("entries", entries),
+            lambda statuses: context.report("status", statuses),
+            self.on_icon_fetched,
+        )
+
+    def on_load_progress(self, kind, value):
+        if kind == "entries":
+            self.render_entries(value)
+        elif kind == "status":
+            self.on_status_loaded(value)
+
+    def on_status_loaded(self, statuses):
+        for name, installed in statuses.items():
+            self.update_card_status(name, installed)
+
+    def on_entries_loaded(self, _entries):
+        self.loaded_generation = self.loading_generation
         self.set_controls_enabled(True)
         self.status_label.setText(f"{self.noun_plural} are ready.")
-        self.render_entries(entries)
+        self.cleanup_load_task()
 
     def on_entries_error(self, error_message):
         self.set_controls_enabled(True)
         self.status_label.setText(f"Could not load {self.noun_plural.lower()}: {error_message}")
         QMessageBox.critical(self, f"{self.page_title} Error", error_message)
-
-    def cleanup_thread(self):
-        self.thread = None
-        self.worker = None
+        self.cleanup_load_task()
+
+    def on_icon_fetched(self, name, icon_path):
+        # Runs on a download thread: scale once to card size so the UI thread only loads a small PNG.
+        thumbnail = ensure_thumbnail(icon_path, round(self.ICON_SIZE * self.pixel_ratio))
+        self.icon_relay.icon_ready.emit(name, str(thumbnail))
+
+    def on_icon_ready(self, name, icon_path):
+        self.ready_icons[name] = icon_path
+        icon_label = self.icon_labels.get(name)
+        if icon_label is not None:
+            self.set_icon_pixmap(icon_label, icon_path)
+
+    def set_icon_pixmap(self, icon_label, icon_path):
+        path = Path(icon_path or "")
+        if not path.exists():
+            path = QUESTION_MARK_ICON_PATH
+        icon_label.setPixmap(cached_pixmap(path, self.ICON_SIZE, self.pixel_ratio))
+
+    def cleanup_load_task(self):
+        self.load_task = None
+        # Package state changed while this load was running: load again.
+        if self.loaded_generation is not None and self.loaded_generation == self.loading_generation:
+            self.refresh_catalog_async()
 
     def render_entries(self, entries):
         self.clear_cards()
@@ -168,10 +224,8 @@ class CatalogPage(QMainWindow):
             icon_label = QLabel()
             icon_label.setFixedSize(self.ICON_SIZE, self.ICON_SIZE)
             icon_label.setScaledContents(True)
-            icon_path = Path(entry.get("icon_path") or "")
-            if not icon_path.exists():
-                icon_path = QUESTION_MARK_ICON_PATH
-            icon_label.setPixmap(QPixmap(str(icon_path)))
+            self.set_icon_pixmap(icon_label, self.ready_icons.get(entry["name"], entry.get("icon_path")))
+            self.icon_labels[entry["name"]] = icon_label
 
             info_layout = QVBoxLayout()
             title_label = QLabel(entry["title"])
@@ -182,9 +236,7 @@ class CatalogPage(QMainWindow):
 
             status_row = QHBoxLayout()
             status_icon = QLabel()
-            status_path = CHECKMARK_ICON_PATH if entry["installed"] else RED_X_ICON_PATH
-            status_icon.setPixmap(QPixmap(str(status_path)).scaled(18, 18))
-            status_label = QLabel("Installed" if entry["installed"] else "Not installed")
+            status_label = QLabel()
             status_row.addWidget(status_icon)
             status_row.addWidget(status_label)
             status_row.addStretch()
@@ -193,14 +245,20 @@ class CatalogPage(QMainWindow):
             info_layout.addWidget(description_label)
             info_layout.addLayout(status_row)
 
-            action_button = QPushButton("Uninstall" if entry["installed"] else "Install")
+            action_button = QPushButton()
             action_button.setObjectName("serviceAction")
             action_button.setFixedWidth(160)
             action_button.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
             action_button.clicked.connect(
                 lambda checked=False, current_entry=entry: self.start_catalog_action(current_entry)
             )
-            self.card_buttons.append(action_button)
+            self.card_widgets[entry["name"]] = {
+                "entry": entry,
+                "status_icon": status_icon,
+                "status_label": status_label,
+                "action_button": action_button,
+            }
+            self.update_card_status(entry["name"], entry.get("installed"))
 
             card_layout.addWidget(icon_label)
             card_layout.addLayout(info_layout, 1)
@@ -208,6 +266,24 @@ class CatalogPage(QMainWindow):
 
             self.cards_layout.insertWidget(self.cards_layout.count() - 1, card)
 
+    def update_card_status(self, name, installed):
+        widgets = self.card_widgets.get(name)
+        if widgets is None:
+            return
+        widgets["entry"]["installed"] = installed
+        action_button = widgets["action_button"]
+        if installed is None:
+            widgets["status_icon"].setPixmap(cached_pixmap(QUESTION_MARK_ICON_PATH, self.STATUS_ICON_SIZE))
+            widgets["status_label"].setText("Checking...")
+            action_button.setText("Install")
+            action_button.setEnabled(False)
+            return
+        status_path = CHECKMARK_ICON_PATH if installed else RED_X_ICON_PATH
+        widgets["status_icon"].setPixmap(cached_pixmap(status_path, self.STATUS_ICON_SIZE))
+        widgets["status_label"].setText("Installed" if installed else "Not installed")
+        action_button.setText("Uninstall" if installed else "Install")
+        action_button.setEnabled(not self.is_action_running())
+
     def clear_cards(self):
         while self.cards_layout.count() > 1:
             item = self.cards_layout.takeAt(0)
@@ -219,10 +295,11 @@ class CatalogPage(QMainWindow):
             if item and item.widget() is not None and isinstance(item.widget(), QLabel):
                 widget = self.cards_layout.takeAt(0).widget()
                 widget.deleteLater()
-        self.card_buttons = []
+        self.card_widgets = {}
+        self.icon_labels = {}
 
     def start_catalog_action(self, entry):
-        if self.action_thread and self.action_thread.isRunning():
+        if self.is_action_running():
             return
 
         verb = "Uninstalling" if entry.get("installed") else "Installing"
@@ -239,19 +316,34 @@ class CatalogPage(QMainWindow):
         self.set_controls_enabled(False)
         self.status_label.setText(f"{verb} {entry['title']}...")
 
-        self.action_thread = QThread()
-        self.action_worker = CatalogActionWorker(entry, self.action_function)
-        self.action_worker.moveToThread(self.action_thread)
-        self.action_thread.started.connect(self.action_worker.run)
-        self.action_worker.finished.connect(self.on_catalog_action_finished)
-        self.action_worker.error.connect(self.on_catalog_action_error)
-        self.action_worker.finished.connect(self.action_thread.quit)
-        self.action_worker.finished.connect(self.action_worker.deleteLater)
-        self.action_worker.error.connect(self.action_thread.quit)
-        self.action_worker.error.connect(self.action_worker.deleteLater)
-        self.action_thread.finished.connect(self.action_thread.deleteLater)
-        self.action_thread.finished.connect(self.cleanup_action_thread)
-        self.action_thread.start()
+        if pty_supported():
+            try:
+                command = catalog_action_command(entry)
+            except RuntimeError as e:
+                self.on_catalog_action_error(str(e))
+                self.current_entry = None
+                return
+            self.console.clear()
+            self.console.show()
+            self.console.run_commands([command])
+            return
+
+        # No pseudo-terminals: the action runs in an external terminal emulator instead.
+        self.action_task = self.tasks.submit(
+            self.action_function,
+            entry,
+            name=f"{self.page_title} action",
+            on_finished=self.on_action_task_finished,
+            on_error=self.on_action_task_error,
+        )
+
+    def on_action_task_finished(self, _result):
+        self.cleanup_action_task()
+        self.on_catalog_action_finished()
+
+    def on_action_task_error(self, error_message):
+        self.cleanup_action_task()
+        self.on_catalog_action_error(error_message)
 
     def on_catalog_action_finished(self):
         self.set_controls_enabled(True)
@@ -264,15 +356,27 @@ class CatalogPage(QMainWindow):
         QMessageBox.critical(self, f"{self.page_title} Action Error", error_message)
         self.refresh_catalog_async()
 
-    def cleanup_action_thread(self):
-        self.action_thread = None
-        self.action_worker = None
+    def on_action_progress(self, event):
+        label = PHASE_LABELS.get(event["phase"], event["phase"].title())
+        percent = f" {event['percent']}%" if event.get("percent") is not None else ""
+        self.status_label.setText(f"{label} {event['package']}{percent}")
+
+    def on_action_console_finished(self, exit_code):
+        self.current_entry = None
+        if exit_code == 0:
+            self.on_catalog_action_finished()
+        else:
+            self.on_catalog_action_error(f"exit code {exit_code}\n\n{self.console.tail()}")
+
+    def cleanup_action_task(self):
+        self.action_task = None
         self.current_entry = None
 
     def set_controls_enabled(self, enabled):
         self.refresh_button.setEnabled(enabled)
-        for button in self.card_buttons:
-            button.setEnabled(enabled)
+        for widgets in self.card_widgets.values():
+            # Cards whose installed state is still unknown stay disabled.
+            widgets["action_button"].setEnabled(enabled and widgets["entry"].get("installed") is not None)
 
     def go_back_to_setup(self):
         if self.setup_window:
@@ -280,10 +384,7 @@ class CatalogPage(QMainWindow):
         self.hide()
 
     def closeEvent(self, event):
-        if self.thread and self.thread.isRunning():
-            self.thread.quit()
-            self.thread.wait(3000)
-        if self.action_thread and self.action_thread.isRunning():
-            self.action_thread.quit()
-            self.action_thread.wait(3000)
+        self.console.shutdown()
+        if self.load_task is not None:
+            self.load_task.cancel()
         super().closeEvent(event)
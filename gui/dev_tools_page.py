@@ -1,5 +1,5 @@
 from .catalog_page import CatalogPage
-from programs.dev_tools_logic import load_dev_tools_with_status, run_dev_tool_action
+from programs.dev_tools_logic import stream_dev_tools, run_dev_tool_action
 
 
 class DevToolsPage(CatalogPage):
@@ -8,6 +8,6 @@ class DevToolsPage(CatalogPage):
             setup_window,
             "Developer Tools",
             "Developer Tools",
-            load_dev_tools_with_status,
+            stream_dev_tools,
             run_dev_tool_action,
         )
@@ -0,0 +1,280 @@
+import re
+import subprocess
+
+from PyQt5.QtCore import QSocketNotifier, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QFontDatabase, QTextCharFormat, QTextCursor
+from PyQt5.QtWidgets import QHBoxLayout, QLabel, QLineEdit, QPlainTextEdit, QProgressBar, QPushButton, QVBoxLayout, \
+    QWidget
+
+from programs.pty_runner import PacmanProgressParser, PtyProcess, ScrollbackBuffer, strip_ansi
+
+# Lines kept in the visible console; the full (bounded) scrollback lives in ScrollbackBuffer.
+CONSOLE_MAX_LINES = 5000
+
+ANSI_COLORS = {
+    30: "#4b5563", 31: "#f87171", 32: "#4ade80", 33: "#facc15",
+    34: "#60a5fa", 35: "#c084fc", 36: "#22d3ee", 37: "#e5e7eb",
+    90: "#6b7280", 91: "#fca5a5", 92: "#86efac", 93: "#fde047",
+    94: "#93c5fd", 95: "#d8b4fe", 96: "#67e8f9", 97: "#ffffff",
+}
+TOKEN_PATTERN = re.compile(
+    r"(?P<sgr>\x1b\[[0-9;]*m)"
+    r"|(?P<newline>\r?\n)"
+    r"|(?P<carriage>\r)"
+    r"|(?P<escape>\x1b\[[0-9;?]*[ -/]*[@-~]|\x1b\][^\x07]*\x07|\x1b[()][0-9A-B])"
+    r"|(?P<text>[^\x1b\r\n]+)"
+)
+# Output ending in an unfinished escape sequence or a lone "\r" (maybe half of "\r\n") waits for more.
+INCOMPLETE_TAIL_PATTERN = re.compile(r"(\x1b(\[[0-9;?]*[ -/]*|\][^\x07]*|[()])?|\r)$")
+PASSWORD_PROMPT_PATTERN = re.compile(r"password.*:\s*$", re.IGNORECASE)
+
+PHASE_LABELS = {
+    "download": "Downloading",
+    "install": "Installing",
+    "upgrade": "Upgrading",
+    "remove": "Removing",
+    "build": "Building",
+}
+
+
+class InstallConsole(QWidget):
+    """
+    In-app terminal for pacman/paru runs.
+
+    Commands run one after another in a pseudo-terminal, so colours,
+    progress bars and prompts (sudo password, [Y/n]) behave as in a terminal
+    emulator; the input line answers prompts. Output is read through a
+    QSocketNotifier, never blocking the UI thread, rendered with its ANSI
+    colours and kept in a bounded scrollback. ``progress`` emits the parsed
+    per-package events from ``PacmanProgressParser``.
+    """
+
+    progress = pyqtSignal(dict)
+    command_finished = pyqtSignal(int)
+    finished = pyqtSignal(int)  # exit code of the last command that ran
+    stop_requested = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.process = None
+        self.notifier = None
+        self.queue = []
+        self.parser = PacmanProgressParser()
+        self.scrollback = ScrollbackBuffer()
+        self.pending_text = ""
+        self.job_partial = {}
+        self.overwrite_line = False
+        self.char_format = QTextCharFormat()
+
+        self.status_label = QLabel()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setTextVisible(True)
+
+        self.output_view = QPlainTextEdit()
+        self.output_view.setReadOnly(True)
+        self.output_view.setMaximumBlockCount(CONSOLE_MAX_LINES)
+        self.output_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        font = QFontDatabase.systemFont(QFontDatabase.FixedFont)
+        font.setStyleHint(QFont.Monospace)
+        self.output_view.setFont(font)
+        self.cursor = QTextCursor(self.output_view.document())
+
+        self.input_line = QLineEdit()
+        self.input_line.setPlaceholderText("Answer a prompt (Enter sends)")
+        self.input_line.returnPressed.connect(self.send_input)
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.clicked.connect(self.stop)
+
+        input_row = QHBoxLayout()
+        input_row.addWidget(self.input_line, 1)
+        input_row.addWidget(self.stop_button)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.output_view, 1)
+        layout.addLayout(input_row)
+        self.set_running(False)
+
+    def is_running(self):
+        return self.process is not None or bool(self.queue)
+
+    def set_running(self, running):
+        self.input_line.setEnabled(running)
+        self.stop_button.setEnabled(running)
+
+    def run_commands(self, commands):
+        """Run each argv in turn; stops at the first command that fails."""
+        if self.is_running():
+            raise RuntimeError("A command is already running in the console")
+        self.queue = [list(command) for command in commands if command]
+        self.set_running(True)
+        self.start_next()
+
+    def start_next(self):
+        if not self.queue:
+            self.set_running(False)
+            self.finished.emit(0)
+            return
+        command = self.queue.pop(0)
+        self.append_output(f"\x1b[1;36m$ {' '.join(command)}\x1b[0m\n")
+        self.parser = PacmanProgressParser()
+        try:
+            self.process = PtyProcess(command)
+        except OSError as e:
+            self.append_output(f"\x1b[31mCould not start {command[0]}: {e}\x1b[0m\n")
+            self.queue = []
+            self.set_running(False)
+            self.command_finished.emit(127)
+            self.finished.emit(127)
+            return
+        self.notifier = QSocketNotifier(self.process.fileno(), QSocketNotifier.Read, self)
+        self.notifier.activated.connect(self.on_readable)
+
+    def on_readable(self, _fd):
+        if self.process is None:
+            return
+        text = self.process.read()
+        if text is None:
+            self.on_process_exit()
+            return
+        if not text:
+            return
+        self.scrollback.append(text)
+        self.append_output(text)
+        for event in self.parser.feed(text):
+            self.show_progress(event)
+            self.progress.emit(event)
+        last_line = strip_ansi(text).rsplit("\n", 1)[-1]
+        self.input_line.setEchoMode(
+            QLineEdit.Password if PASSWORD_PROMPT_PATTERN.search(last_line) else QLineEdit.Normal
+        )
+
+    def on_process_exit(self):
+        self.notifier.setEnabled(False)
+        self.notifier.deleteLater()
+        self.notifier = None
+        process, self.process = self.process, None
+        process.close()
+        exit_code = process.wait()
+        if self.pending_text:
+            pending, self.pending_text = self.pending_text, ""
+            self.render(pending)
+        self.append_output(f"\x1b[90m[exit code {exit_code}]\x1b[0m\n")
+        self.command_finished.emit(exit_code)
+        if exit_code != 0:
+            self.queue = []
+            self.set_running(False)
+            self.finished.emit(exit_code)
+            return
+        self.start_next()
+
+    def show_progress(self, event):
+        label = PHASE_LABELS.get(event["phase"], event["phase"].title())
+        counter = f" ({event['index']}/{event['total']})" if event.get("index") else ""
+        self.status_label.setText(f"{label} {event['package']}{counter}")
+        if event.get("percent") is not None:
+            self.progress_bar.setValue(event["percent"])
+
+    def send_input(self):
+        if self.process is not None:
+            self.process.write(self.input_line.text() + "\n")
+        self.input_line.clear()
+
+    def stop(self):
+        self.stop_requested.emit()
+        self.queue = []
+        if self.process is not None:
+            self.process.terminate()
+
+    def tail(self, count=15):
+        """Last ``count`` output lines without escape sequences, for error messages."""
+        return "\n".join(self.scrollback.tail_lines(count))
+
+    def clear(self):
+        self.output_view.clear()
+        self.scrollback.clear()
+        self.job_partial = {}
+        self.status_label.clear()
+        self.progress_bar.setValue(0)
+
+    def append_job_output(self, label, text):
+        """
+        Output of one of several concurrent jobs (not run by this console),
+        written line by line with a ``label`` prefix so the jobs do not mix.
+        """
+        self.scrollback.append(text)
+        lines = re.split(r"\r?\n", self.job_partial.get(label, "") + text)
+        self.job_partial[label] = lines.pop()
+        for line in lines:
+            # Progress bars redraw with "\r"; only their final state is kept.
+            line = line.rsplit("\r", 1)[-1]
+            if line.strip():
+                self.append_output(f"\x1b[90m{label} |\x1b[0m {line}\x1b[0m\n")
+
+    def append_output(self, text):
+        text = self.pending_text + text
+        incomplete = INCOMPLETE_TAIL_PATTERN.search(text)
+        self.pending_text = incomplete.group(0) if incomplete else ""
+        if self.pending_text:
+            text = text[:-len(self.pending_text)]
+        self.render(text)
+
+    def render(self, text):
+        scroll_bar = self.output_view.verticalScrollBar()
+        follow = scroll_bar.value() == scroll_bar.maximum()
+        self.cursor.movePosition(QTextCursor.End)
+        for match in TOKEN_PATTERN.finditer(text):
+            kind = match.lastgroup
+            if kind == "text":
+                if self.overwrite_line:
+                    # A carriage return redraws the line (progress bars).
+                    self.cursor.movePosition(QTextCursor.StartOfBlock, QTextCursor.KeepAnchor)
+                    self.cursor.removeSelectedText()
+                    self.overwrite_line = False
+                self.cursor.insertText(match.group(), self.char_format)
+            elif kind == "newline":
+                self.cursor.insertBlock()
+                self.overwrite_line = False
+            elif kind == "carriage":
+                self.overwrite_line = True
+            elif kind == "sgr":
+                self.apply_sgr(match.group()[2:-1])
+        if follow:
+            scroll_bar.setValue(scroll_bar.maximum())
+
+    def apply_sgr(self, parameters):
+        codes = [int(code) for code in parameters.split(";") if code.isdigit()] or [0]
+        char_format = QTextCharFormat(self.char_format)
+        skip = 0
+        for position, code in enumerate(codes):
+            if skip:
+                skip -= 1
+                continue
+            if code == 0:
+                char_format = QTextCharFormat()
+            elif code == 1:
+                char_format.setFontWeight(QFont.Bold)
+            elif code == 22:
+                char_format.setFontWeight(QFont.Normal)
+            elif code in ANSI_COLORS:
+                char_format.setForeground(QColor(ANSI_COLORS[code]))
+            elif code == 39:
+                char_format.clearForeground()
+            elif code in (38, 48):
+                # 256-colour / truecolour arguments are skipped, not rendered.
+                skip = 2 if position + 1 < len(codes) and codes[position + 1] == 5 else 4
+        self.char_format = char_format
+
+    def shutdown(self):
+        """Stop the running command and release the pty (window close)."""
+        self.stop()
+        if self.process is not None:
+            try:
+                self.process.wait(3)
+            except subprocess.TimeoutExpired:
+                pass
+            self.process.close()
+            self.process = None
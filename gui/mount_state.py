@@ -0,0 +1,48 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from programs.drive_health import get_drive_health_monitor
+from programs.mount_table import get_mount_table
+
+
+class MountStateNotifier(QObject):
+    """Re-emits mount table changes (mounts made anywhere on the system) on the UI thread."""
+
+    changed = pyqtSignal(int)
+
+    def __init__(self):
+        super().__init__()
+        self.mount_table = get_mount_table().start()
+        # Emitting from the watcher thread is delivered queued to receivers living on the UI thread.
+        self.mount_table.add_listener(self.changed.emit)
+
+
+_notifier = None
+
+
+def get_mount_state_notifier():
+    global _notifier
+    if _notifier is None:
+        _notifier = MountStateNotifier()
+    return _notifier
+
+
+class DriveHealthNotifier(QObject):
+    """Re-emits drive health samples (mount point, DriveHealthMonitor.summary()) on the UI thread."""
+
+    sampled = pyqtSignal(str, dict)
+
+    def __init__(self):
+        super().__init__()
+        self.monitor = get_drive_health_monitor()
+        self.monitor.add_listener(self.sampled.emit)
+        self.monitor.start()
+
+
+_health_notifier = None
+
+
+def get_drive_health_notifier():
+    global _health_notifier
+    if _health_notifier is None:
+        _health_notifier = DriveHealthNotifier()
+    return _health_notifier
@@ -0,0 +1,181 @@
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+from PyQt5.QtWidgets import QAbstractItemView, QHeaderView, QTreeView
+
+from programs.transaction_planner import format_size
+
+# Raw (unformatted) column value, used for sorting so sizes sort numerically.
+SortRole = Qt.UserRole + 1
+
+
+class PackageListModel(QAbstractTableModel):
+    """
+    Checkable package table backed by a plain list of row dicts (see
+    ``installer_logic.describe_packages``). Check state lives in a set of
+    names, so checking or clearing every row is one dataChanged signal
+    instead of one item update per row. ``set_matches()`` narrows the
+    model to ranked search results without touching the rows themselves.
+    """
+
+    COLUMNS = (
+        ("name", "Package"),
+        ("version", "Version"),
+        ("size", "Size"),
+        ("repo", "Repo"),
+    )
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.row_of = {}
+        self.checked = set()
+        self.matches = None
+        # positions in self.rows shown, in display order; None shows every row
+        self.visible = None
+
+    def set_packages(self, rows, checked=()):
+        """Replace all rows; names in ``checked`` that are still listed stay checked."""
+        self.beginResetModel()
+        self.rows = list(rows)
+        self.row_of = {row["name"]: position for position, row in enumerate(self.rows)}
+        self.checked = {name for name in checked if name in self.row_of}
+        self._update_visible()
+        self.endResetModel()
+
+    def set_matches(self, ranked_names):
+        """Show only ``ranked_names`` in that order; None shows every row again."""
+        self.beginResetModel()
+        self.matches = None if ranked_names is None else list(ranked_names)
+        self._update_visible()
+        self.endResetModel()
+
+    def _update_visible(self):
+        if self.matches is None:
+            self.visible = None
+        else:
+            self.visible = [self.row_of[name] for name in self.matches if name in self.row_of]
+
+    def row_at(self, position):
+        return self.rows[position if self.visible is None else self.visible[position]]
+
+    def visible_names(self):
+        if self.visible is None:
+            return list(self.row_of)
+        return [self.rows[position]["name"] for position in self.visible]
+
+    def clear(self):
+        self.set_packages([])
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows) if self.visible is None else len(self.visible)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUMNS[section][1]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.row_at(index.row())
+        key = self.COLUMNS[index.column()][0]
+        if role == Qt.DisplayRole:
+            return format_size(row.get(key)) if key == "size" else row.get(key) or ""
+        if role == SortRole:
+            value = row.get(key)
+            if key == "size":
+                return value or 0
+            return (value or "").lower()
+        if role == Qt.CheckStateRole and index.column() == 0:
+            return Qt.Checked if row["name"] in self.checked else Qt.Unchecked
+        if role == Qt.ToolTipRole:
+            return row.get("description") or None
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.column() == 0:
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole or index.column() != 0:
+            return False
+        name = self.row_at(index.row())["name"]
+        if value == Qt.Checked:
+            self.checked.add(name)
+        else:
+            self.checked.discard(name)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    def all_checked(self):
+        """True when every shown row is checked."""
+        names = self.visible_names()
+        return bool(names) and self.checked.issuperset(names)
+
+    def set_all_checked(self, checked):
+        """Check or clear every shown row (only the search results while searching)."""
+        if checked:
+            self.checked.update(self.visible_names())
+        else:
+            self.checked.difference_update(self.visible_names())
+        row_count = self.rowCount()
+        if row_count:
+            self.dataChanged.emit(self.index(0, 0), self.index(row_count - 1, 0), [Qt.CheckStateRole])
+
+    def toggle_all_checked(self):
+        self.set_all_checked(not self.all_checked())
+
+    def checked_names(self):
+        """Checked package names in model order."""
+        return [row["name"] for row in self.rows if row["name"] in self.checked]
+
+
+class PackageFilterProxyModel(QSortFilterProxyModel):
+    """
+    Sorts on raw values. While search results are shown sorting is turned
+    off so rows keep their rank order and no Python comparisons run.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(SortRole)
+        self.setDynamicSortFilter(False)
+
+
+def create_package_view(proxy_model):
+    """Uniform-row tree view over a package proxy model: only visible rows are ever laid out."""
+    view = QTreeView()
+    view.setModel(proxy_model)
+    view.setRootIsDecorated(False)
+    view.setUniformRowHeights(True)
+    view.setAlternatingRowColors(True)
+    view.setSortingEnabled(True)
+    view.sortByColumn(0, Qt.AscendingOrder)
+    view.setSelectionMode(QAbstractItemView.NoSelection)
+    header = view.header()
+    header.setStretchLastSection(False)
+    # Fixed widths: ResizeToContents would measure every row on each reset.
+    header.setSectionResizeMode(0, QHeaderView.Stretch)
+    for column in range(1, proxy_model.columnCount()):
+        header.setSectionResizeMode(column, QHeaderView.Interactive)
+        header.resizeSection(column, 150)
+    return view
+
+
+def show_search_results(view, ranked_names):
+    """Apply PackageSearchBox results to a view over PackageFilterProxyModel/PackageListModel."""
+    proxy_model = view.model()
+    package_model = proxy_model.sourceModel()
+    if ranked_names is None:
+        package_model.set_matches(None)
+        header = view.header()
+        proxy_model.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
+    else:
+        proxy_model.sort(-1)
+        package_model.set_matches(ranked_names)
@@ -0,0 +1,29 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from programs.pacman_watch import get_package_watcher
+
+
+class PackageStateNotifier(QObject):
+    """Re-emits package state generation bumps from the watcher thread on the UI thread."""
+
+    changed = pyqtSignal(int)
+
+    def __init__(self):
+        super().__init__()
+        self.watcher = get_package_watcher()
+        # Emitting from the watcher thread is delivered queued to receivers living on the UI thread.
+        self.watcher.add_listener(self.changed.emit)
+
+    @property
+    def generation(self):
+        return self.watcher.generation
+
+
+_notifier = None
+
+
+def get_package_state_notifier():
+    global _notifier
+    if _notifier is None:
+        _notifier = PackageStateNotifier()
+    return _notifier
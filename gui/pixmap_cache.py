@@ -0,0 +1,105 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QGuiApplication, QImageReader, QPixmap
+
+from programs.config import CACHE_DIR
+
+THUMBNAIL_DIR = CACHE_DIR.joinpath("thumbnails")
+# Decoded pixmaps kept in memory; status icons and one catalog's worth of cards fit easily.
+PIXMAP_CACHE_LIMIT = 512
+
+_pixmaps = OrderedDict()
+_thumbnail_lock = threading.Lock()
+
+
+def screen_pixel_ratio():
+    app = QGuiApplication.instance()
+    return app.devicePixelRatio() if app is not None else 1.0
+
+
+def _file_stamp(path: Path):
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def thumbnail_path(source, size):
+    """Return where the pre-scaled ``size`` px thumbnail of ``source`` lives (it may not exist yet)."""
+    source = Path(source)
+    key = f"{source.resolve()}:{_file_stamp(source)}:{size}"
+    return THUMBNAIL_DIR.joinpath(f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.png")
+
+
+def read_scaled_image(path, size):
+    """Decode ``path`` straight to ``size`` px (aspect kept); vector and JPEG sources are never decoded at full size."""
+    reader = QImageReader(str(path))
+    original = reader.size()
+    if original.isValid():
+        reader.setScaledSize(original.scaled(size, size, Qt.KeepAspectRatio))
+    image = reader.read()
+    if not image.isNull() and (image.width() > size or image.height() > size):
+        image = image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return image
+
+
+def ensure_thumbnail(source, size):
+    """
+    Write a ``size`` px PNG thumbnail of ``source`` to the cache unless it
+    already exists and return its path (or ``source`` when it cannot be read).
+    Uses only QImage, so it is safe to call from worker threads.
+    """
+    target = thumbnail_path(source, size)
+    if target.exists():
+        return target
+    image = read_scaled_image(source, size)
+    if image.isNull():
+        return Path(source)
+    with _thumbnail_lock:
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".png")
+            os.close(fd)
+            if not image.save(temp_path, "PNG"):
+                os.unlink(temp_path)
+                return Path(source)
+            os.replace(temp_path, target)
+        except OSError as e:
+            print(f"Failed to write icon thumbnail: {e}")
+            return Path(source)
+    return target
+
+
+def cached_pixmap(path, size, pixel_ratio=None):
+    """
+    Return a ``size`` px pixmap for ``path``, shared process-wide and keyed by
+    (path, size, devicePixelRatio). An existing on-disk thumbnail is preferred
+    over the original file, so repeated renders never decode an image.
+    """
+    pixel_ratio = pixel_ratio or screen_pixel_ratio()
+    key = (str(path), size, pixel_ratio)
+    pixmap = _pixmaps.get(key)
+    if pixmap is not None:
+        _pixmaps.move_to_end(key)
+        return pixmap
+
+    device_size = round(size * pixel_ratio)
+    source = thumbnail_path(path, device_size)
+    if not source.exists():
+        source = path
+    pixmap = QPixmap.fromImage(read_scaled_image(source, device_size))
+    pixmap.setDevicePixelRatio(pixel_ratio)
+    _pixmaps[key] = pixmap
+    if len(_pixmaps) > PIXMAP_CACHE_LIMIT:
+        _pixmaps.popitem(last=False)
+    return pixmap
+
+
+def clear_pixmap_cache():
+    _pixmaps.clear()
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtGui import QIcon
+from PyQt5.QtWidgets import QLineEdit
+
+from programs.package_search import build_search_index
+
+try:
+    from .task_runner import PRIORITY_BACKGROUND, get_task_runner
+except ImportError:
+    from task_runner import PRIORITY_BACKGROUND, get_task_runner
+
+SEARCH_ICON_PATH = Path(__file__).resolve().parent.parent.joinpath("icons", "search.svg")
+
+
+class PackageSearchBox(QLineEdit):
+    """
+    Search-as-you-type field over a package list.
+
+    ``set_packages()`` rebuilds the search index as a background task (a
+    newer list replaces a build still in progress); every edit then queries
+    it synchronously and emits ``results_changed`` with the ranked matching
+    names, or None when the field is empty. Text typed while the index is
+    building is applied as soon as it is ready.
+    """
+
+    results_changed = pyqtSignal(object)
+
+    def __init__(self, placeholder="Search packages...", parent=None):
+        super().__init__(parent)
+        self.index = None
+        self.task = None
+        self.setPlaceholderText(placeholder)
+        self.setClearButtonEnabled(True)
+        self.addAction(QIcon(str(SEARCH_ICON_PATH)), QLineEdit.LeadingPosition)
+        self.textChanged.connect(self.apply_query)
+
+    def set_packages(self, packages):
+        # Only the newest list matters: a build still running for an older one is cancelled.
+        self.task = get_task_runner().submit(
+            build_search_index,
+            list(packages),
+            key=("search index", id(self)),
+            name="search index",
+            priority=PRIORITY_BACKGROUND,
+            replace=True,
+            on_finished=self.on_index_ready,
+            on_error=self.on_index_error,
+        )
+
+    def on_index_ready(self, index):
+        self.task = None
+        self.index = index
+        self.apply_query()
+
+    def on_index_error(self, error_message):
+        self.task = None
+        print(f"Failed to build search index: {error_message}")
+
+    def apply_query(self):
+        query = self.text().strip()
+        if not query:
+            self.results_changed.emit(None)
+        elif self.index is not None:
+            self.results_changed.emit(self.index.search(query))
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
@@ -1,4 +1,3 @@
-from PyQt5.QtCore import QObject, QThread, pyqtSignal
 from PyQt5.QtWidgets import (
     QFrame,
     QHBoxLayout,
@@ -19,6 +18,7 @@ from programs.services_logic import (
     has_system_services,
     invalidate_sudo_timestamp,
     is_sudo_auth_error,
+    reconcile_services,
     start_service,
     validate_sudo_password,
 )
@@ -26,37 +26,25 @@ from programs.services_logic import (
 try:
     from .ui_helpers import create_back_button
     from .theme import configure_main_window, create_page_header
+    from .task_runner import PRIORITY_UI, get_task_runner
+    from .systemd_dbus import SystemdUnitWatcher
 except ImportError:
     from ui_helpers import create_back_button
     from theme import configure_main_window, create_page_header
+    from task_runner import PRIORITY_UI, get_task_runner
+    from systemd_dbus import SystemdUnitWatcher
 
 
-class ServicesWorker(QObject):
-    finished = pyqtSignal(list)
-    error = pyqtSignal(str)
-
-    def run(self):
-        try:
-            self.finished.emit(get_managed_services())
-        except Exception as e:
-            self.error.emit(str(e))
-
-
-class ServiceActionWorker(QObject):
-    finished = pyqtSignal()
-    error = pyqtSignal(str)
-
-    def __init__(self, action, service):
-        super().__init__()
-        self.action = action
-        self.service = service
-
-    def run(self):
-        try:
-            self.action(self.service)
-            self.finished.emit()
-        except Exception as e:
-            self.error.emit(str(e))
+def describe_desired_state(service):
+    """e.g. "enabled, active" for the states bin/services.yaml declares."""
+    if service.get("masked"):
+        return "masked"
+    wanted = []
+    if service.get("enabled") is not None:
+        wanted.append("enabled" if service["enabled"] else "disabled")
+    if service.get("active") is not None:
+        wanted.append("active" if service["active"] else "inactive")
+    return ", ".join(wanted)
 
 
 class ServicesPage(QMainWindow):
@@ -64,11 +52,12 @@ class ServicesPage(QMainWindow):
         super().__init__()
         self.setup_window = setup_window
         self.back_button_container = None
-        self.thread = None
-        self.worker = None
-        self.action_thread = None
-        self.action_worker = None
+        self.tasks = get_task_runner()
+        self.load_task = None
+        self.action_task = None
+        self.unit_watcher = None
         self.refresh_button = None
+        self.apply_button = None
         self.status_label = None
         self.service_rows = {}
         self.sudo_authenticated = False
@@ -76,8 +65,18 @@ class ServicesPage(QMainWindow):
         self.setWindowTitle("Services")
         configure_main_window(self)
         self.init_ui()
+        self.start_unit_watcher()
         self.refresh_services_async()
 
+    def start_unit_watcher(self):
+        """Follow unit state over D-Bus; without systemd on the buses the page reads it with systemctl."""
+        watcher = SystemdUnitWatcher(MANAGED_SERVICES, parent=self)
+        watcher.unit_changed.connect(self.on_unit_changed)
+        if watcher.start():
+            self.unit_watcher = watcher
+        else:
+            watcher.deleteLater()
+
     def init_ui(self):
         central = QWidget()
         self.setCentralWidget(central)
@@ -93,6 +92,11 @@ class ServicesPage(QMainWindow):
         self.refresh_button.clicked.connect(self.refresh_services_async)
         self.refresh_button.setFixedWidth(200)
 
+        self.apply_button = QPushButton("Apply All")
+        self.apply_button.setToolTip("Bring every service to the state declared in bin/services.yaml")
+        self.apply_button.clicked.connect(self.apply_declared_state)
+        self.apply_button.setFixedWidth(200)
+
         services_layout = QVBoxLayout()
         for service in MANAGED_SERVICES:
             card = QFrame()
@@ -137,7 +141,11 @@ class ServicesPage(QMainWindow):
         layout.addSpacing(12)
         layout.addWidget(self.status_label)
         layout.addLayout(services_layout)
-        layout.addWidget(self.refresh_button)
+        bottom_row = QHBoxLayout()
+        bottom_row.addWidget(self.refresh_button)
+        bottom_row.addWidget(self.apply_button)
+        bottom_row.addStretch()
+        layout.addLayout(bottom_row)
         layout.addStretch()
 
     def go_back_to_setup(self):
@@ -146,56 +154,66 @@ class ServicesPage(QMainWindow):
         self.hide()
 
     def refresh_services_async(self):
-        if self.thread and self.thread.isRunning():
-            return
-        if not self.ensure_system_access():
+        if self.unit_watcher is not None:
+            # D-Bus replies and change signals update the rows as they arrive.
+            self.unit_watcher.refresh()
             self.set_controls_enabled(True)
-            self.status_label.setText("System service access not granted.")
-            self.set_all_state_labels("Status unavailable.")
+            self.status_label.setText("Services update live.")
             return
-
+        if self.load_task is not None:
+            return
+        # Reading unit state needs no root; the admin password is asked for on the first system action.
         self.set_controls_enabled(False)
         self.status_label.setText("Refreshing services...")
         self.set_all_state_labels("Refreshing...")
 
-        self.thread = QThread()
-        self.worker = ServicesWorker()
-        self.worker.moveToThread(self.thread)
-        self.thread.started.connect(self.worker.run)
-        self.worker.finished.connect(self.on_services_loaded)
-        self.worker.error.connect(self.on_services_error)
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.worker.error.connect(self.thread.quit)
-        self.worker.error.connect(self.worker.deleteLater)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.thread.finished.connect(self.cleanup_thread)
-        self.thread.start()
+        self.load_task = self.tasks.submit(
+            get_managed_services,
+            key="services",
+            priority=PRIORITY_UI,
+            on_finished=self.on_services_loaded,
+            on_error=self.on_services_error,
+            on_cancelled=self.cleanup_load_task,
+        )
 
     def on_services_loaded(self, services):
+        self.cleanup_load_task()
         self.set_controls_enabled(True)
         self.status_label.setText("Services are ready.")
         for service in services:
-            row = self.service_rows.get(service["key"])
-            if row is None:
-                continue
-            row["state_label"].setText(
-                f"Scope: {service['scope']} | Unit: {service['unit']} | Enabled: {service['enabled_state']} | Active: {service['active_state']}"
-            )
+            self.show_service_state(service)
+
+    def on_unit_changed(self, scope, unit, state):
+        for service in MANAGED_SERVICES:
+            if service["unit"] == unit and service.get("scope", "user") == scope:
+                self.show_service_state({**service, **state})
+
+    def show_service_state(self, service):
+        row = self.service_rows.get(service["key"])
+        if row is None:
+            return
+        active_state = service["active_state"]
+        if service.get("sub_state"):
+            active_state = f"{active_state} ({service['sub_state']})"
+        wanted = describe_desired_state(service)
+        row["state_label"].setText(
+            f"Scope: {service['scope']} | Unit: {service['unit']} | Enabled: {service['enabled_state']} | Active: {active_state}"
+            + (f" | Wanted: {wanted}" if wanted else "")
+        )
 
     def on_services_error(self, error_message):
+        self.cleanup_load_task()
         self.set_controls_enabled(True)
         if is_sudo_auth_error(error_message):
             self.sudo_authenticated = False
         self.set_all_state_labels("Status unavailable.")
         self.status_label.setText(f"Could not load services: {error_message}")
 
-    def cleanup_thread(self):
-        self.thread = None
-        self.worker = None
+    def cleanup_load_task(self):
+        self.load_task = None
 
     def run_service_action(self, action, service, status_message):
-        if self.action_thread and self.action_thread.isRunning():
+        if self.action_task is not None:
             return
         if service.get("scope") == "system" and not self.ensure_system_access():
             self.status_label.setText("System service action cancelled.")
@@ -204,37 +222,60 @@ class ServicesPage(QMainWindow):
         self.set_controls_enabled(False)
         self.status_label.setText(status_message)
 
-        self.action_thread = QThread()
-        self.action_worker = ServiceActionWorker(action, service)
-        self.action_worker.moveToThread(self.action_thread)
-        self.action_thread.started.connect(self.action_worker.run)
-        self.action_worker.finished.connect(self.on_service_action_finished)
-        self.action_worker.error.connect(self.on_service_action_error)
-        self.action_worker.finished.connect(self.action_thread.quit)
-        self.action_worker.finished.connect(self.action_worker.deleteLater)
-        self.action_worker.error.connect(self.action_thread.quit)
-        self.action_worker.error.connect(self.action_worker.deleteLater)
-        self.action_thread.finished.connect(self.action_thread.deleteLater)
-        self.action_thread.finished.connect(self.cleanup_action_thread)
-        self.action_thread.start()
-
-    def on_service_action_finished(self):
+        self.action_task = self.tasks.submit(
+            action,
+            service,
+            name="service action",
+            on_finished=self.on_service_action_finished,
+            on_error=self.on_service_action_error,
+            on_cancelled=self.cleanup_action_task,
+        )
+
+    def apply_declared_state(self):
+        if self.action_task is not None:
+            return
+        if not self.ensure_system_access():
+            self.status_label.setText("System service action cancelled.")
+            return
+
+        self.set_controls_enabled(False)
+        self.status_label.setText("Applying declared service state...")
+        self.action_task = self.tasks.submit(
+            reconcile_services,
+            name="service reconcile",
+            on_finished=self.on_reconcile_finished,
+            on_error=self.on_service_action_error,
+            on_cancelled=self.cleanup_action_task,
+        )
+
+    def on_reconcile_finished(self, plan):
+        self.cleanup_action_task()
+        changes = ", ".join(f"{change['verb']} {change['unit']}" for change in plan["changes"])
+        message = f"Applied: {changes}." if changes else "All services already match bin/services.yaml."
+        if plan["skipped"]:
+            message += " Skipped: " + ", ".join(f"{item['unit']} ({item['reason']})" for item in plan["skipped"])
+        self.refresh_services_async()
+        QMessageBox.information(self, "Services", message)
+
+    def on_service_action_finished(self, _result):
+        self.cleanup_action_task()
         self.status_label.setText("Service action completed.")
         self.refresh_services_async()
 
     def on_service_action_error(self, error_message):
+        self.cleanup_action_task()
         self.set_controls_enabled(True)
         if is_sudo_auth_error(error_message):
             self.sudo_authenticated = False
         self.status_label.setText(f"Service action failed: {error_message}")
         QMessageBox.critical(self, "Service Error", error_message)
 
-    def cleanup_action_thread(self):
-        self.action_thread = None
-        self.action_worker = None
+    def cleanup_action_task(self):
+        self.action_task = None
 
     def set_controls_enabled(self, enabled):
         self.refresh_button.setEnabled(enabled)
+        self.apply_button.setEnabled(enabled)
         for row in self.service_rows.values():
             row["start_button"].setEnabled(enabled)
             row["enable_button"].setEnabled(enabled)
@@ -271,12 +312,13 @@ class ServicesPage(QMainWindow):
             return False
 
     def closeEvent(self, event):
-        if self.thread and self.thread.isRunning():
-            self.thread.quit()
-            self.thread.wait(3000)
-        if self.action_thread and self.action_thread.isRunning():
-            self.action_thread.quit()
-            self.action_thread.wait(3000)
+        # Results of a cancelled load are dropped; a running systemctl call finishes on its own.
+        if self.load_task is not None:
+            self.load_task.cancel()
+        if self.unit_watcher is not None:
+            self.unit_watcher.stop()
+            self.unit_watcher.deleteLater()
+            self.unit_watcher = None
         if self.sudo_authenticated:
             invalidate_sudo_timestamp()
             self.sudo_authenticated = False
@@ -2,11 +2,10 @@ import json
 import shutil
 import subprocess
 import sys
-import urllib.request
 from pathlib import Path
 
-from PyQt5.QtCore import pyqtSignal, QObject, QThread
-from PyQt5.QtGui import QPixmap, QColor, QBrush
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QBrush
 from PyQt5.QtWidgets import QMainWindow, QVBoxLayout, QWidget, QPushButton, QLabel, QHBoxLayout, QMessageBox, QFrame, \
     QLineEdit, QSizePolicy, QDialog, QFormLayout, QDialogButtonBox, QApplication, QTreeWidget, QTreeWidgetItem, QHeaderView
 
@@ -16,95 +15,100 @@ sys.path.append(programs_dir)
 scripts_dir = str(Path(__file__).resolve().parent.parent.joinpath("scripts"))
 sys.path.append(scripts_dir)
 
-from scripts.detect_gpu import detect_gpu_vendor
+from programs.hardware_probe import detect_gpus, driver_packages, gpu_driver_installed, gpu_vendors
 from programs.config import CHECKMARK_ICON_PATH, RED_X_ICON_PATH
-from programs.installer_logic import install_paru, add_samba_drive, command_exists, open_terminal, parse_fstab_network_drives, get_mount_size
+from programs.installer_logic import install_paru, add_samba_drive, command_exists, open_terminal
+from programs.mount_probe import STATUS_MOUNTED, STATUS_UNRESPONSIVE, get_mount_probe
+from programs.mount_table import get_mount_table
+from programs.network_drives import reconcile_drives
+from programs.drive_health import describe_health, format_latency, get_drive_health_monitor
 try:
     from .theme import configure_main_window, configure_dialog
+    from .pixmap_cache import cached_pixmap
+    from .task_runner import PRIORITY_BACKGROUND, PRIORITY_UI, get_task_runner
+    from .mount_state import get_drive_health_notifier, get_mount_state_notifier
 except ImportError:
     from theme import configure_main_window, configure_dialog
-
-
-def gpu_driver_installed():
-    vendor = detect_gpu_vendor()
-    mesa_installed = is_mesa_installed()
-    if vendor == "AMD":
-        return mesa_installed
-    if vendor == "Intel":
-        return shutil.which("intel-virtual-output") is not None
-    if vendor == "NVIDIA":
-        return shutil.which("nvidia-modprobe") is not None
-    return False
-
-def is_mesa_installed():
-    """Check if the Mesa package is installed on the system."""
-    if shutil.which("pacman"):
-        command = ["pacman", "-Q", "mesa"]
-    elif shutil.which("dnf"):
-        command = ["dnf", "list", "installed", "mesa"]
-    else:
-        return False
-
-    result = subprocess.run(
-        command,
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
+    from pixmap_cache import cached_pixmap
+    from task_runner import PRIORITY_BACKGROUND, PRIORITY_UI, get_task_runner
+    from mount_state import get_drive_health_notifier, get_mount_state_notifier
+
+
+# Size column colours by mount probe status
+MOUNT_STATUS_COLORS = {
+    STATUS_MOUNTED: "#4CAF50",
+    STATUS_UNRESPONSIVE: "#FFA726",
+}
+NOT_MOUNTED_COLOR = "#EF5350"
+# p50/p95 columns by drive health status
+HEALTH_STATUS_COLORS = {
+    "unresponsive": "#FFA726",
+    "error": "#EF5350",
+}
+LATENCY_COLUMNS = (5, 6)
+
+
+def load_network_drives(context):
+    """
+    Reports "drives" (the fstab network drives joined with the mount table)
+    right away, then "size" (mount_point, status, size_text) per mounted
+    drive as its statvfs answers or times out.
+    """
+    drives = get_mount_table().network_drives()
+    context.report("drives", drives)
+    get_mount_probe().probe(
+        [drive["mount_point"] for drive in drives if drive["mounted"]],
+        lambda mount_point, status, size_text: context.report("size", (mount_point, status, size_text)),
     )
 
-    return result.returncode == 0
 
-class UpdateCheckWorker(QObject):
-    finished = pyqtSignal(str, bool, str, str)
-    error = pyqtSignal(str)
-
-    def run(self):
-        try:
-            latest_tag = self.fetch_latest_release_tag()
-            current_version = self.get_current_version()
-
-            if current_version == latest_tag:
-                status_text = f"Up to date ({latest_tag})"
-                update_available = False
-            elif current_version == "unknown":
-                status_text = f"Latest release: {latest_tag} (local version unknown)"
-                update_available = True
-            else:
-                status_text = f"Update available: {current_version} -> {latest_tag}"
-                update_available = True
-
-            self.finished.emit(status_text, update_available, current_version, latest_tag)
-        except Exception as e:
-            self.error.emit(str(e))
+def check_for_update():
+    """(status_text, update_available, current_version, latest_tag)"""
+    latest_tag = fetch_latest_release_tag()
+    current_version = get_current_version()
 
-    @staticmethod
-    def fetch_latest_release_tag():
-        url = "https://api.github.com/repos/aleksireede/arch-mysetup/releases/latest"
-        request = urllib.request.Request(url, headers={"User-Agent": "arch-mysetup"})
-        with urllib.request.urlopen(request, timeout=6) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-        tag_name = payload.get("tag_name")
-        if not tag_name:
-            raise RuntimeError("Could not resolve latest release tag from GitHub")
-        return tag_name
-
-    @staticmethod
-    def get_current_version():
-        repo_root = Path(__file__).resolve().parent.parent
+    if current_version == latest_tag:
+        status_text = f"Up to date ({latest_tag})"
+        update_available = False
+    elif current_version == "unknown":
+        status_text = f"Latest release: {latest_tag} (local version unknown)"
+        update_available = True
+    else:
+        status_text = f"Update available: {current_version} -> {latest_tag}"
+        update_available = True
+    return status_text, update_available, current_version, latest_tag
+
+
+def fetch_latest_release_tag():
+    import urllib.request  # only needed off the startup path, on a task thread
+
+    url = "https://api.github.com/repos/aleksireede/arch-mysetup/releases/latest"
+    request = urllib.request.Request(url, headers={"User-Agent": "arch-mysetup"})
+    with urllib.request.urlopen(request, timeout=6) as response:
+        payload = json.loads(response.read().decode("utf-8"))
+    tag_name = payload.get("tag_name")
+    if not tag_name:
+        raise RuntimeError("Could not resolve latest release tag from GitHub")
+    return tag_name
+
+
+def get_current_version():
+    repo_root = Path(__file__).resolve().parent.parent
+    try:
+        return subprocess.check_output(
+            ["git", "-C", str(repo_root), "describe", "--tags", "--exact-match"],
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except subprocess.CalledProcessError:
         try:
             return subprocess.check_output(
-                ["git", "-C", str(repo_root), "describe", "--tags", "--exact-match"],
+                ["git", "-C", str(repo_root), "describe", "--tags", "--abbrev=0"],
                 stderr=subprocess.DEVNULL,
                 text=True,
             ).strip()
         except subprocess.CalledProcessError:
-            try:
-                return subprocess.check_output(
-                    ["git", "-C", str(repo_root), "describe", "--tags", "--abbrev=0"],
-                    stderr=subprocess.DEVNULL,
-                    text=True,
-                ).strip()
-            except subprocess.CalledProcessError:
-                return "unknown"
+            return "unknown"
 
 
 def run_sudo_command(command, validate_only=False):
@@ -136,6 +140,8 @@ class SetupWindow(QMainWindow):
     open_games_page = pyqtSignal()
     open_dev_tools_page = pyqtSignal()
     open_browsers_page = pyqtSignal()
+    # Name of a background startup probe that just finished ("gpu status", ...)
+    probe_finished = pyqtSignal(str)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -151,8 +157,12 @@ class SetupWindow(QMainWindow):
         self.update_status_icon = None
         self.update_state_label = None
         self.update_button = None
-        self.update_check_thread = None
-        self.update_check_worker = None
+        self.tasks = get_task_runner()
+        self.update_check_task = None
+        self.gpu_task = None
+        self.gpu_drivers_installed = False
+        self.network_drives_task = None
+        self.apply_drives_task = None
         self.latest_tag = ""
         self.sudo_password = None
         self.gpudrv_label = None
@@ -169,7 +179,10 @@ class SetupWindow(QMainWindow):
         self.add_network_drive_button = None
         self.network_drives_card = None
         self.network_drives_tree = None
+        self.network_drive_items = {}
+        self.network_drives_stale = False
         self.refresh_network_drives_button = None
+        self.apply_drives_button = None
         self.install_paru_button = None
         # end buttons
         self.paru_status = None
@@ -201,7 +214,8 @@ class SetupWindow(QMainWindow):
         self.gpudrv_label.setObjectName("serviceTitle")
         self.gpudrv_button.clicked.connect(self.handle_gpu_driver_install)
         self.gpudrv_status = QLabel()
-        self.update_gpu_status()
+        self.gpudrv_button.setText("Checking...")
+        self.gpudrv_button.setEnabled(False)
 
         # Gpu driver layout setup
         self.gpudrv_layout.addWidget(self.gpudrv_label, 1)
@@ -264,7 +278,7 @@ class SetupWindow(QMainWindow):
         network_title.setObjectName("serviceTitle")
 
         self.network_drives_tree = QTreeWidget()
-        self.network_drives_tree.setHeaderLabels(["Device", "Mount Point", "Type", "Options", "Size"])
+        self.network_drives_tree.setHeaderLabels(["Device", "Mount Point", "Type", "Options", "Size", "p50", "p95"])
         self.network_drives_tree.setMinimumHeight(150)
         self.network_drives_tree.setAlternatingRowColors(True)
         network_header = self.network_drives_tree.header()
@@ -272,6 +286,10 @@ class SetupWindow(QMainWindow):
         # Let "Options" absorb extra width; keep "Size" tight to its content.
         network_header.setSectionResizeMode(3, QHeaderView.Stretch)
         network_header.setSectionResizeMode(4, QHeaderView.ResizeToContents)
+        for column in LATENCY_COLUMNS:
+            network_header.setSectionResizeMode(column, QHeaderView.ResizeToContents)
+        self.network_drives_tree.headerItem().setToolTip(5, "Median latency of stat plus a 4 KiB write/read round trip")
+        self.network_drives_tree.headerItem().setToolTip(6, "95th percentile latency over the recent samples")
 
         self.add_network_drive_button = QPushButton("Add Network Drive (Samba)")
         self.add_network_drive_button.setObjectName("serviceAction")
@@ -279,12 +297,17 @@ class SetupWindow(QMainWindow):
         self.add_network_drive_button.setFixedWidth(200)
         self.add_network_drive_button.clicked.connect(self.add_network_drive)
 
+        self.apply_drives_button = QPushButton("Apply Drive List")
+        self.apply_drives_button.setToolTip("Write the drives of bin/drives.yaml to /etc/fstab and mount them")
+        self.apply_drives_button.clicked.connect(self.apply_drive_list)
+
         self.refresh_network_drives_button = QPushButton("Refresh")
         self.refresh_network_drives_button.clicked.connect(self.refresh_network_drives)
 
         network_button_row = QHBoxLayout()
         network_button_row.setSpacing(12)
         network_button_row.addWidget(self.add_network_drive_button)
+        network_button_row.addWidget(self.apply_drives_button)
         network_button_row.addWidget(self.refresh_network_drives_button)
         network_button_row.addStretch()
 
@@ -359,42 +382,60 @@ class SetupWindow(QMainWindow):
         self.layout.addSpacing(16)
         self.layout.addStretch()
 
+        # Probes run on the task runner so the window paints before they finish.
+        self.update_gpu_status()
         self.refresh_network_drives()
         self.start_update_check()
+        # Mounts and unmounts made outside the app update the list as well.
+        get_mount_state_notifier().changed.connect(self.on_mounts_changed)
+        # Mounted shares are sampled in the background for the p50/p95 columns.
+        get_drive_health_notifier().sampled.connect(self.show_network_drive_health)
 
     def update_gpu_status(self):
-        if gpu_driver_installed():
-            self.gpudrv_status.setPixmap(QPixmap(str(CHECKMARK_ICON_PATH)).scaled(20, 20))
+        # The sysfs scan and the package index stay off the UI thread; repeated calls join the running check.
+        self.gpu_task = self.tasks.submit(
+            gpu_driver_installed,
+            key="gpu status",
+            priority=PRIORITY_UI,
+            on_finished=self.on_gpu_status_ready,
+            on_error=self.on_gpu_status_error,
+        )
+
+    def on_gpu_status_error(self, error_message):
+        print(f"Failed to check GPU drivers: {error_message}")
+        self.on_gpu_status_ready(False)
+
+    def on_gpu_status_ready(self, installed):
+        self.gpu_drivers_installed = installed
+        self.gpudrv_button.setEnabled(True)
+        self.probe_finished.emit("gpu status")
+        if installed:
+            self.gpudrv_status.setPixmap(cached_pixmap(CHECKMARK_ICON_PATH, 20))
             self.gpudrv_button.setText("Installed")
             self.set_service_button_state(self.gpudrv_button, installed=True)
         else:
-            self.gpudrv_status.setPixmap(QPixmap(str(RED_X_ICON_PATH)).scaled(20, 20))
+            self.gpudrv_status.setPixmap(cached_pixmap(RED_X_ICON_PATH, 20))
             self.gpudrv_button.setText("Install GPU Drivers")
             self.set_service_button_state(self.gpudrv_button, installed=False)
 
     def handle_gpu_driver_install(self):
-        if gpu_driver_installed():
+        if self.gpu_drivers_installed:
             QMessageBox.information(self, "Installed", "GPU drivers are already installed.")
             return
-        vendor = detect_gpu_vendor()
-        if vendor is None:
+        gpus = detect_gpus()
+        vendors = " + ".join(gpu_vendors(gpus))
+        if not gpus:
             QMessageBox.warning(self, "GPU Not Detected", "Could not detect GPU vendor.")
             return
-        packages = []
-        if vendor == "Intel":
-            packages = ["mesa", "lib32-mesa", "vulkan-intel", "lib32-vulkan-intel", "xf86-video-intel"]
-        elif vendor == "NVIDIA":
-            packages = ["nvidia", "nvidia-utils", "lib32-nvidia-utils"]
-        elif vendor == "AMD":
-            packages = ["mesa", "lib32-mesa", "vulkan-radeon", "lib32-vulkan-radeon", "xf86-video-amdgpu"]
-
+        packages = driver_packages(gpus)
         if not packages:
-            QMessageBox.warning(self, "Unsupported GPU", f"No package rule for vendor: {vendor}")
+            unknown = ", ".join(gpu["vendor"] for gpu in gpus)
+            QMessageBox.warning(self, "Unsupported GPU", f"No package rule for vendor: {unknown}")
             return
 
         try:
             run_sudo_command(["pacman", "-S", "--needed", "--noconfirm", *packages])
-            QMessageBox.information(self, "Success", f"{vendor} driver packages installed.")
+            QMessageBox.information(self, "Success", f"{vendors} driver packages installed.")
             self.update_gpu_status()
         except RuntimeError as e:
             QMessageBox.critical(self, "Error", f"Failed to install GPU drivers: {e}")
@@ -402,11 +443,11 @@ class SetupWindow(QMainWindow):
     def update_paru_status(self):
         """Update the Paru status icon or text."""
         if command_exists("paru"):
-            self.paru_status.setPixmap(QPixmap(str(CHECKMARK_ICON_PATH)).scaled(20, 20))
+            self.paru_status.setPixmap(cached_pixmap(CHECKMARK_ICON_PATH, 20))
             self.install_paru_button.setText("Installed")
             self.set_service_button_state(self.install_paru_button, installed=True)
         else:
-            self.paru_status.setPixmap(QPixmap(str(RED_X_ICON_PATH)).scaled(20, 20))
+            self.paru_status.setPixmap(cached_pixmap(RED_X_ICON_PATH, 20))
             self.install_paru_button.setText("Install Paru")
             self.set_service_button_state(self.install_paru_button, installed=False)
 
@@ -466,48 +507,153 @@ class SetupWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to add network drive: {e}")
 
+    def apply_drive_list(self):
+        """Reconcile bin/drives.yaml with fstab in one pkexec prompt."""
+        if self.apply_drives_task is not None:
+            return
+        self.apply_drives_button.setEnabled(False)
+        self.apply_drives_task = self.tasks.submit(
+            reconcile_drives,
+            name="drive reconcile",
+            on_finished=self.on_drive_list_applied,
+            on_error=self.on_drive_list_error,
+            on_cancelled=self.cleanup_apply_drives_task,
+        )
+
+    def on_drive_list_applied(self, result):
+        self.cleanup_apply_drives_task()
+        changes = ", ".join(f"{change['action']} {change['mount_point']}" for change in result["changes"])
+        message = f"Applied: {changes}." if changes else "All drives already match bin/drives.yaml."
+        if result["failed"]:
+            message += " Failed to mount: " + ", ".join(result["failed"])
+        # Automounted shares show up later through the mount table watcher.
+        self.refresh_network_drives()
+        QMessageBox.information(self, "Network Drives", message)
+
+    def on_drive_list_error(self, error_message):
+        self.cleanup_apply_drives_task()
+        QMessageBox.critical(self, "Network Drives", f"Failed to apply bin/drives.yaml:\n{error_message}")
+
+    def cleanup_apply_drives_task(self):
+        self.apply_drives_task = None
+        self.apply_drives_button.setEnabled(True)
+
     def refresh_network_drives(self):
-        """Re-read /etc/fstab and refresh the list of existing network drives.
+        """Join fstab with the mount table and probe the mount sizes on the task runner."""
+        if self.network_drives_task is not None and not self.network_drives_task.is_done():
+            self.network_drives_stale = True
+            return
+        self.network_drives_stale = False
+        self.refresh_network_drives_button.setEnabled(False)
+        if self.network_drives_tree.topLevelItemCount() == 0:
+            self.network_drives_tree.addTopLevelItem(QTreeWidgetItem(["Loading network drives...", "", "", "", "", "", ""]))
+
+        self.network_drives_task = self.tasks.submit(
+            load_network_drives,
+            key="network drives",
+            priority=PRIORITY_UI,
+            with_context=True,
+            on_progress=self.on_network_drives_progress,
+            on_finished=self.on_network_drives_loaded,
+            on_error=self.on_network_drives_error,
+        )
+
+    def on_network_drives_progress(self, kind, value):
+        if kind == "drives":
+            self.show_network_drives(value)
+        elif kind == "size":
+            self.show_network_drive_size(*value)
+
+    def on_network_drives_loaded(self, _result):
+        self.refresh_network_drives_button.setEnabled(True)
+        if self.network_drives_stale:
+            self.refresh_network_drives()
+
+    def on_mounts_changed(self, _generation):
+        self.refresh_network_drives()
+
+    def on_network_drives_error(self, error_message):
+        print(f"Failed to read network drives: {error_message}")
+        self.show_network_drives([])
+        self.refresh_network_drives_button.setEnabled(True)
 
-        For each drive the Size column shows the live usage of its mount point
-        (e.g. "12G / 50G (24%)") when the path is currently mounted, or
-        "Not mounted" when the mount point is not an active mount point.
+    def show_network_drives(self, drives):
+        """Fill the list of existing network drives.
+
+        Mounted drives show "Checking..." in the Size column until
+        show_network_drive_size() fills in the live usage of the mount point
+        (e.g. "12G / 50G (24%)") or marks it unresponsive; the others show
+        "Not mounted". The p50/p95 columns keep the drive health history
+        collected so far and are updated by show_network_drive_health().
         """
+        self.probe_finished.emit("network drives")
         self.network_drives_tree.setUpdatesEnabled(False)
         self.network_drives_tree.clear()
-        drives = parse_fstab_network_drives()
+        self.network_drive_items = {}
         if not drives:
-            placeholder = QTreeWidgetItem(["No network drives found in /etc/fstab.", "", "", "", ""])
+            placeholder = QTreeWidgetItem(["No network drives found in /etc/fstab.", "", "", "", "", "", ""])
             placeholder.setToolTip(0, "No CIFS/NFS/SSHFS/WebDAV entries were detected in /etc/fstab")
             self.network_drives_tree.addTopLevelItem(placeholder)
         for drive in drives:
             mount_point = drive["mount_point"]
-            mounted, size_text = get_mount_size(mount_point)
+            mounted = drive["mounted"]
+            if mounted:
+                size_text = "Checking..."
+            else:
+                # An idle automount is left alone; reading its size would mount it.
+                size_text = "Automount (idle)" if drive["automount"] else "Not mounted"
             item = QTreeWidgetItem([
                 drive["device"],
                 mount_point,
                 drive["fs_type"],
                 drive["options"],
                 size_text,
+                "",
+                "",
             ])
             item.setToolTip(0, drive["raw"])
             item.setToolTip(3, drive["options"])
             item.setToolTip(4, size_text)
-            if mounted:
-                item.setForeground(4, QBrush(QColor("#4CAF50")))
-            else:
-                item.setForeground(4, QBrush(QColor("#EF5350")))
+            if not mounted:
+                item.setForeground(4, QBrush(QColor(NOT_MOUNTED_COLOR)))
+            self.network_drive_items[mount_point] = item
             self.network_drives_tree.addTopLevelItem(item)
+            if mounted:
+                self.show_network_drive_health(mount_point, get_drive_health_monitor().summary(mount_point))
         self.network_drives_tree.setUpdatesEnabled(True)
         for col in range(self.network_drives_tree.columnCount()):
             self.network_drives_tree.resizeColumnToContents(col)
 
+    def show_network_drive_size(self, mount_point, status, size_text):
+        item = self.network_drive_items.get(mount_point)
+        if item is None:
+            return
+        item.setText(4, size_text)
+        item.setToolTip(4, size_text)
+        item.setForeground(4, QBrush(QColor(MOUNT_STATUS_COLORS.get(status, NOT_MOUNTED_COLOR))))
+        self.network_drives_tree.resizeColumnToContents(4)
+
+    def show_network_drive_health(self, mount_point, summary):
+        item = self.network_drive_items.get(mount_point)
+        if item is None or not summary["samples"]:
+            return
+        tooltip = describe_health(summary)
+        color = HEALTH_STATUS_COLORS.get(summary["status"])
+        for column, key in zip(LATENCY_COLUMNS, ("p50_ms", "p95_ms")):
+            item.setText(column, format_latency(summary[key]))
+            item.setToolTip(column, tooltip)
+            if color is not None:
+                item.setForeground(column, QBrush(QColor(color)))
+            else:
+                item.setData(column, Qt.ForegroundRole, None)
+            self.network_drives_tree.resizeColumnToContents(column)
+
     def open_app_installer(self):
         self.app_installer_callback()
         self.close()
 
     def start_update_check(self):
-        if self.update_check_thread and self.update_check_thread.isRunning():
+        if self.update_check_task is not None and not self.update_check_task.is_done():
             return
 
         self.update_status.setText("Checking latest release...")
@@ -516,19 +662,18 @@ class SetupWindow(QMainWindow):
         self.update_button.setEnabled(False)
         self.set_service_button_state(self.update_button, installed=False)
 
-        self.update_check_thread = QThread()
-        self.update_check_worker = UpdateCheckWorker()
-        self.update_check_worker.moveToThread(self.update_check_thread)
-        self.update_check_thread.started.connect(self.update_check_worker.run)
-        self.update_check_worker.finished.connect(self.on_update_check_finished)
-        self.update_check_worker.error.connect(self.on_update_check_error)
-        self.update_check_worker.finished.connect(self.update_check_thread.quit)
-        self.update_check_worker.finished.connect(self.update_check_worker.deleteLater)
-        self.update_check_thread.finished.connect(self.update_check_thread.deleteLater)
-        self.update_check_thread.finished.connect(self.cleanup_update_thread)
-        self.update_check_thread.start()
-
-    def on_update_check_finished(self, status_text, update_available, _current_version, latest_tag):
+        # Network bound and not needed to use the window: queued behind the local probes.
+        self.update_check_task = self.tasks.submit(
+            check_for_update,
+            key="update check",
+            priority=PRIORITY_BACKGROUND,
+            on_finished=self.on_update_check_finished,
+            on_error=self.on_update_check_error,
+        )
+
+    def on_update_check_finished(self, result):
+        status_text, update_available, _current_version, latest_tag = result
+        self.probe_finished.emit("update check")
         self.latest_tag = latest_tag
         self.update_status.setText(status_text)
         if update_available:
@@ -543,6 +688,7 @@ class SetupWindow(QMainWindow):
             self.set_service_button_state(self.update_button, installed=True)
 
     def on_update_check_error(self, error_message):
+        self.probe_finished.emit("update check")
         self.update_status.setText(f"Could not check updates: {error_message}")
         self.set_update_indicator("error")
         self.update_button.setText("Retry Check")
@@ -573,22 +719,18 @@ class SetupWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Update Error", f"Failed to start updater: {e}")
 
-    def cleanup_update_thread(self):
-        self.update_check_thread = None
-        self.update_check_worker = None
-
     def set_update_indicator(self, state):
         if state == "latest":
-            self.update_status_icon.setPixmap(QPixmap(str(CHECKMARK_ICON_PATH)).scaled(18, 18))
+            self.update_status_icon.setPixmap(cached_pixmap(CHECKMARK_ICON_PATH, 18))
             self.update_state_label.setText("Up to Date")
         elif state == "available":
-            self.update_status_icon.setPixmap(QPixmap(str(RED_X_ICON_PATH)).scaled(18, 18))
+            self.update_status_icon.setPixmap(cached_pixmap(RED_X_ICON_PATH, 18))
             self.update_state_label.setText("Update Available")
         elif state == "checking":
             self.update_status_icon.clear()
             self.update_state_label.setText("Checking...")
         else:
-            self.update_status_icon.setPixmap(QPixmap(str(RED_X_ICON_PATH)).scaled(18, 18))
+            self.update_status_icon.setPixmap(cached_pixmap(RED_X_ICON_PATH, 18))
             self.update_state_label.setText("Check Failed")
 
     @staticmethod
@@ -599,7 +741,7 @@ class SetupWindow(QMainWindow):
         button.update()
 
     def closeEvent(self, event):
-        if self.update_check_thread and self.update_check_thread.isRunning():
-            self.update_check_thread.quit()
-            self.update_check_thread.wait(1500)
+        for task in (self.update_check_task, self.gpu_task, self.network_drives_task, self.apply_drives_task):
+            if task is not None:
+                task.cancel()
         super().closeEvent(event)
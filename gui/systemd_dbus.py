@@ -0,0 +1,130 @@
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+from PyQt5.QtDBus import QDBusConnection, QDBusMessage, QDBusPendingCallWatcher, QDBusVariant
+
+from programs.services_logic import describe_unit_state, unit_error_state
+
+SYSTEMD_SERVICE = "org.freedesktop.systemd1"
+MANAGER_PATH = "/org/freedesktop/systemd1"
+MANAGER_INTERFACE = "org.freedesktop.systemd1.Manager"
+UNIT_INTERFACE = "org.freedesktop.systemd1.Unit"
+PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
+UNIT_PATH_PREFIX = "/org/freedesktop/systemd1/unit/"
+# Milliseconds before a GetAll without reply counts as failed.
+CALL_TIMEOUT = 5000
+
+
+def unit_object_path(unit):
+    """systemd's object path for ``unit``: bytes other than [A-Za-z0-9] (and a leading digit) become _xx."""
+    escaped = []
+    for index, byte in enumerate(unit.encode("utf-8")):
+        character = chr(byte)
+        if character.isascii() and (character.isalpha() or (character.isdigit() and index > 0)):
+            escaped.append(character)
+        else:
+            escaped.append(f"_{byte:02x}")
+    return UNIT_PATH_PREFIX + ("".join(escaped) or "_")
+
+
+def unwrap(value):
+    return value.variant() if isinstance(value, QDBusVariant) else value
+
+
+def default_buses():
+    return {"user": QDBusConnection.sessionBus(), "system": QDBusConnection.systemBus()}
+
+
+class SystemdUnitWatcher(QObject):
+    """
+    Unit state of the managed services straight from systemd over D-Bus.
+
+    ``start()`` subscribes to the systemd manager of every scope and reads
+    the Unit properties of all units with pipelined GetAll calls (no
+    processes forked); afterwards every PropertiesChanged of a unit and
+    every UnitFilesChanged (enable/disable) re-reads the affected units, so
+    ``unit_changed(scope, unit, state)`` fires without polling. ``state``
+    has the keys of services_logic.describe_unit_state().
+
+    ``buses`` maps a scope ("user", "system") to a QDBusConnection, by
+    default the session and system bus. Tests can pass connections from
+    ``QDBusConnection.connectToBus(address, name)`` to a private
+    ``dbus-daemon --session`` where a stand-in owns org.freedesktop.systemd1.
+    """
+
+    unit_changed = pyqtSignal(str, str, dict)
+
+    def __init__(self, services, buses=None, parent=None):
+        super().__init__(parent)
+        self.buses = buses if buses is not None else default_buses()
+        self.units = {}
+        for service in services:
+            self.units.setdefault(service.get("scope", "user"), []).append(service["unit"])
+        # object path -> [(scope, unit)]; the same unit name can be watched on both buses
+        self.paths = {}
+        self.connected = []
+
+    def is_available(self, scope):
+        bus = self.buses.get(scope)
+        if bus is None or not bus.isConnected():
+            return False
+        reply = bus.interface().isServiceRegistered(SYSTEMD_SERVICE)
+        return reply.isValid() and bool(reply.value())
+
+    def start(self):
+        """Subscribe and read every unit; False (and nothing connected) when a scope has no systemd on its bus."""
+        if not all(self.is_available(scope) for scope in self.units):
+            return False
+        for scope, units in self.units.items():
+            bus = self.buses[scope]
+            bus.asyncCall(QDBusMessage.createMethodCall(SYSTEMD_SERVICE, MANAGER_PATH, MANAGER_INTERFACE, "Subscribe"))
+            self.connect_signal(bus, MANAGER_PATH, MANAGER_INTERFACE, "UnitFilesChanged", self.on_unit_files_changed)
+            for unit in units:
+                path = unit_object_path(unit)
+                self.paths.setdefault(path, []).append((scope, unit))
+                self.connect_signal(bus, path, PROPERTIES_INTERFACE, "PropertiesChanged", self.on_properties_changed)
+        self.refresh()
+        return True
+
+    def connect_signal(self, bus, path, interface, name, slot):
+        if bus.connect(SYSTEMD_SERVICE, path, interface, name, slot):
+            self.connected.append((bus, path, interface, name, slot))
+
+    def stop(self):
+        for bus, path, interface, name, slot in self.connected:
+            bus.disconnect(SYSTEMD_SERVICE, path, interface, name, slot)
+        self.connected = []
+        self.paths = {}
+
+    def refresh(self):
+        for scope, units in self.units.items():
+            for unit in units:
+                self.read_unit(scope, unit)
+
+    def read_unit(self, scope, unit):
+        message = QDBusMessage.createMethodCall(SYSTEMD_SERVICE, unit_object_path(unit), PROPERTIES_INTERFACE, "GetAll")
+        message.setArguments([UNIT_INTERFACE])
+        watcher = QDBusPendingCallWatcher(self.buses[scope].asyncCall(message, CALL_TIMEOUT), self)
+        watcher.finished.connect(
+            lambda finished, current_scope=scope, current_unit=unit: self.on_unit_read(current_scope, current_unit, finished)
+        )
+
+    def on_unit_read(self, scope, unit, watcher):
+        watcher.deleteLater()
+        if watcher.isError():
+            self.unit_changed.emit(scope, unit, unit_error_state(watcher.error().message()))
+            return
+        arguments = watcher.reply().arguments()
+        properties = {name: unwrap(value) for name, value in (arguments[0] if arguments else {}).items()}
+        self.unit_changed.emit(scope, unit, describe_unit_state(properties))
+
+    @pyqtSlot(QDBusMessage)
+    def on_properties_changed(self, message):
+        arguments = message.arguments()
+        if not arguments or arguments[0] != UNIT_INTERFACE:
+            return
+        # UnitFileState is not part of the change notification, so the whole unit is read again.
+        for scope, unit in self.paths.get(message.path(), []):
+            self.read_unit(scope, unit)
+
+    @pyqtSlot(QDBusMessage)
+    def on_unit_files_changed(self, _message):
+        self.refresh()
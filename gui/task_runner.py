@@ -0,0 +1,238 @@
+import os
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+# Threads shared by every page; long installs take one slot like any other task.
+TASK_POOL_SIZE = max(4, min(8, os.cpu_count() or 4))
+
+# Priority lanes: queued UI probes start before queued background fetches.
+PRIORITY_UI = 2
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 0
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task by ``TaskContext.check_cancelled()``."""
+
+
+class CancellationToken:
+    """Thread-safe cancel flag; callbacks run once, on the thread that cancels."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def is_cancelled(self):
+        return self._event.is_set()
+
+    def add_callback(self, callback):
+        """Call ``callback()`` on cancel (immediately if already cancelled), e.g. to kill a process."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+
+class TaskContext:
+    """Passed to tasks submitted with ``with_context=True``."""
+
+    def __init__(self, handle):
+        self.token = handle.token
+        self._handle = handle
+
+    def is_cancelled(self):
+        return self.token.is_cancelled()
+
+    def check_cancelled(self):
+        if self.token.is_cancelled():
+            raise TaskCancelled()
+
+    def report(self, kind, value=None):
+        """Send an intermediate result to the ``on_progress`` callbacks on the UI thread."""
+        if not self.token.is_cancelled():
+            self._handle.progress_reported.emit(kind, value)
+
+
+class TaskHandle(QObject):
+    """
+    One submitted task. Callbacks are plain callables run on the UI thread:
+    ``on_finished(result)``, ``on_error(message)``, ``on_progress(kind, value)``
+    and ``on_cancelled()``. Every caller attached to a coalesced task gets them.
+    """
+
+    progress_reported = pyqtSignal(str, object)
+    completed = pyqtSignal(str, object)  # ("finished" | "error" | "cancelled", payload)
+
+    def __init__(self, name, key, priority):
+        super().__init__()
+        self.name = name
+        self.key = key
+        self.priority = priority
+        self.token = CancellationToken()
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self.status = "queued"
+        self.callbacks = {"finished": [], "error": [], "progress": [], "cancelled": []}
+        self.progress_reported.connect(self.dispatch_progress)
+
+    def attach(self, on_finished=None, on_error=None, on_progress=None, on_cancelled=None):
+        for kind, callback in (("finished", on_finished), ("error", on_error),
+                               ("progress", on_progress), ("cancelled", on_cancelled)):
+            if callback is not None and callback not in self.callbacks[kind]:
+                self.callbacks[kind].append(callback)
+
+    def cancel(self):
+        self.token.cancel()
+
+    def is_done(self):
+        return self.status in ("finished", "error", "cancelled")
+
+    def dispatch_progress(self, kind, value):
+        if self.token.is_cancelled():
+            return
+        for callback in list(self.callbacks["progress"]):
+            callback(kind, value)
+
+    def dispatch(self, status, payload):
+        self.status = status
+        for callback in list(self.callbacks[status]):
+            if status == "cancelled":
+                callback()
+            else:
+                callback(payload)
+
+
+class TaskRunnable(QRunnable):
+    def __init__(self, handle, function, args, kwargs, with_context):
+        super().__init__()
+        self.handle = handle
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.with_context = with_context
+
+    def run(self):
+        handle = self.handle
+        handle.started_at = time.perf_counter()
+        if handle.token.is_cancelled():
+            handle.completed.emit("cancelled", None)
+            return
+        try:
+            if self.with_context:
+                result = self.function(TaskContext(handle), *self.args, **self.kwargs)
+            else:
+                result = self.function(*self.args, **self.kwargs)
+        except TaskCancelled:
+            handle.completed.emit("cancelled", None)
+        except Exception as e:
+            handle.completed.emit("cancelled" if handle.token.is_cancelled() else "error", str(e))
+        else:
+            handle.completed.emit("cancelled" if handle.token.is_cancelled() else "finished", result)
+
+
+class TaskRunner(QObject):
+    """
+    Runs blocking work for every window on one bounded QThreadPool.
+
+    ``submit()`` returns a TaskHandle. Tasks with the same ``key`` are
+    coalesced: while one is queued or running, a new submit attaches its
+    callbacks to it instead of starting a duplicate (``replace=True``
+    cancels it and starts over instead). Cancellation is cooperative through
+    the handle's CancellationToken. Queue wait and run time are recorded
+    per task name; ``task_completed`` reports each finished task.
+    """
+
+    task_completed = pyqtSignal(str, str, float, float)  # name, status, queued ms, run ms
+
+    def __init__(self, max_threads=TASK_POOL_SIZE, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.in_flight = {}
+        self.handles = set()
+        self.task_metrics = {}
+
+    def submit(self, function, *args, key=None, name=None, priority=PRIORITY_NORMAL, with_context=False,
+               replace=False, on_finished=None, on_error=None, on_progress=None, on_cancelled=None, **kwargs):
+        name = name or (str(key) if key is not None else getattr(function, "__qualname__", "task"))
+        existing = self.in_flight.get(key) if key is not None else None
+        if existing is not None and not existing.token.is_cancelled():
+            if not replace:
+                existing.attach(on_finished, on_error, on_progress, on_cancelled)
+                self.metrics_for(name)["coalesced"] += 1
+                return existing
+            existing.cancel()
+
+        handle = TaskHandle(name, key, priority)
+        handle.attach(on_finished, on_error, on_progress, on_cancelled)
+        handle.completed.connect(lambda status, payload, done=handle: self.on_task_completed(done, status, payload))
+        if key is not None:
+            self.in_flight[key] = handle
+        self.handles.add(handle)
+        self.pool.start(TaskRunnable(handle, function, args, kwargs, with_context), priority)
+        return handle
+
+    def on_task_completed(self, handle, status, payload):
+        handle.finished_at = time.perf_counter()
+        if handle.key is not None and self.in_flight.get(handle.key) is handle:
+            del self.in_flight[handle.key]
+        self.handles.discard(handle)
+
+        started_at = handle.started_at or handle.finished_at
+        queued_ms = (started_at - handle.submitted_at) * 1000
+        run_ms = (handle.finished_at - started_at) * 1000
+        metrics = self.metrics_for(handle.name)
+        metrics["runs"] += 1
+        metrics[status] += 1
+        metrics["queued_ms"] += queued_ms
+        metrics["total_ms"] += run_ms
+        metrics["last_ms"] = run_ms
+        metrics["max_ms"] = max(metrics["max_ms"], run_ms)
+        self.task_completed.emit(handle.name, status, queued_ms, run_ms)
+        handle.dispatch(status, payload)
+
+    def metrics_for(self, name):
+        return self.task_metrics.setdefault(name, {
+            "runs": 0, "finished": 0, "error": 0, "cancelled": 0, "coalesced": 0,
+            "queued_ms": 0.0, "total_ms": 0.0, "last_ms": 0.0, "max_ms": 0.0,
+        })
+
+    def metrics(self):
+        """Copy of the per task name counters and timings."""
+        return {name: dict(values) for name, values in self.task_metrics.items()}
+
+    def cancel(self, key):
+        handle = self.in_flight.get(key)
+        if handle is not None:
+            handle.cancel()
+
+    def shutdown(self, timeout_ms=3000):
+        """Cancel everything and give running tasks ``timeout_ms`` to return (application exit)."""
+        for handle in list(self.handles):
+            handle.cancel()
+        self.pool.clear()
+        return self.pool.waitForDone(timeout_ms)
+
+
+_task_runner = None
+
+
+def get_task_runner():
+    global _task_runner
+    if _task_runner is None:
+        _task_runner = TaskRunner()
+    return _task_runner
@@ -1,8 +1,13 @@
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPixmap
 from PyQt5.QtWidgets import QHBoxLayout, QVBoxLayout, QLabel, QWidget, QFrame
 
 from programs.config import CHECKMARK_ICON_PATH, RED_X_ICON_PATH, QUESTION_MARK_ICON_PATH
+try:
+    from .pixmap_cache import cached_pixmap
+except ImportError:
+    from pixmap_cache import cached_pixmap
+
+STATUS_ICON_SIZE = 20
 
 APP_DARK_THEME = """
 QWidget {
@@ -116,7 +121,7 @@ QFrame#pageHeaderSeparator {
     background-color: #ffffffdd;
     border: none;
 }
-QTreeWidget {
+QTreeView {
     background-color: #111923;
     border: 1px solid #2f4155;
     border-radius: 8px;
@@ -124,7 +129,7 @@ QTreeWidget {
     alternate-background-color: #161f2a;
     color: #d6dee8;
 }
-QTreeWidget::item {
+QTreeView::item {
     border-bottom: 1px solid #1b2430;
 }
 QHeaderView::section {
@@ -200,11 +205,11 @@ def apply_status_icon(
     unknown_tooltip="Unknown",
 ):
     if enabled is True:
-        label.setPixmap(QPixmap(str(CHECKMARK_ICON_PATH)).scaled(20, 20))
+        label.setPixmap(cached_pixmap(CHECKMARK_ICON_PATH, STATUS_ICON_SIZE))
         label.setToolTip(enabled_tooltip)
     elif enabled is False:
-        label.setPixmap(QPixmap(str(RED_X_ICON_PATH)).scaled(20, 20))
+        label.setPixmap(cached_pixmap(RED_X_ICON_PATH, STATUS_ICON_SIZE))
         label.setToolTip(disabled_tooltip)
     else:
-        label.setPixmap(QPixmap(str(QUESTION_MARK_ICON_PATH)).scaled(20, 20))
+        label.setPixmap(cached_pixmap(QUESTION_MARK_ICON_PATH, STATUS_ICON_SIZE))
         label.setToolTip(unknown_tooltip)
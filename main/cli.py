@@ -0,0 +1,316 @@
+#!/usr/bin/env python
+"""
+Headless arch-mysetup: applies bin/apps.yaml, bin/services.yaml, bin/drives.yaml and tweaks without Qt.
+
+Every subcommand prints one JSON document on stdout; everything else written
+while it runs (pacman/paru output, prompts, progress prints of the shared
+modules) goes to stderr. Modules are imported inside the subcommands, so a
+status check only loads what it reads.
+
+Exit codes: 0 done / nothing to do, 1 failed, 2 usage error,
+3 changes pending (status, plan, services diff, drives diff), 4 applied only partially.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+from pathlib import Path
+
+# Ensure project root is importable when this file is run directly.
+project_root = str(Path(__file__).resolve().parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_PENDING = 3
+EXIT_PARTIAL = 4
+
+# The real stdout while a subcommand runs with fd 1 pointed at stderr (see main()).
+json_output = None
+
+
+def emit(document):
+    output = json_output or sys.stdout
+    json.dump(document, output, indent=2 if output.isatty() else None)
+    output.write("\n")
+    output.flush()
+
+
+def load_app_selection(apps):
+    """The apps named on the command line, or every app in apps.yaml, plus their yaml sources."""
+    from programs.apps_file import load_yaml
+
+    yaml_data = load_yaml()
+    sources = {app["name"]: app.get("source") for app in yaml_data if app.get("name")}
+    return (apps or list(sources)), sources
+
+
+def load_tweaks():
+    """{key: (name, apply, is_enabled)} for the tweaks of the Advanced Tweaks and Pacman Config pages."""
+    from programs.text_editor import (
+        check_multilib,
+        check_pacman_color,
+        enable_multilib,
+        pacman_check_database_refreshed,
+        pacman_enable_color,
+        pacman_refresh_database,
+    )
+    from scripts.extra import (
+        airplay_discover_pw,
+        git_keystore,
+        is_airplay_enabled,
+        is_git_keystore_enabled,
+        is_reflector_enabled,
+        is_zeroconf_enabled,
+        reflector_service_timer,
+        zeroconf_discover_pw,
+    )
+
+    return {
+        "multilib": ("Enable Pacman Multilib", enable_multilib, check_multilib),
+        "pacman_color": ("Enable Pacman Color", pacman_enable_color, check_pacman_color),
+        "pacman_sync": ("Refresh Pacman Database", pacman_refresh_database, pacman_check_database_refreshed),
+        "reflector": ("Enable Reflector Timer", reflector_service_timer, is_reflector_enabled),
+        "git_keystore": ("Enable Git Credential Store", git_keystore, is_git_keystore_enabled),
+        "zeroconf": ("Enable PipeWire Zeroconf Discover", zeroconf_discover_pw, is_zeroconf_enabled),
+        "airplay": ("Enable PipeWire AirPlay Discover", airplay_discover_pw, is_airplay_enabled),
+    }
+
+
+def tweak_state(is_enabled):
+    try:
+        return is_enabled()
+    except Exception:
+        return None
+
+
+def command_status(args):
+    from programs.installer_logic import get_installed_index
+
+    apps, _ = load_app_selection(args.apps)
+    installed_index = get_installed_index()
+    missing = [app for app in apps if not installed_index.is_installed(app)]
+    emit({
+        "apps": len(apps),
+        "installed": [app for app in apps if installed_index.is_installed(app)],
+        "missing": missing,
+    })
+    return EXIT_PENDING if missing else EXIT_OK
+
+
+def command_plan(args):
+    from programs.transaction_planner import plan_install
+
+    apps, sources = load_app_selection(args.apps)
+    plan = plan_install(apps, sources)
+    emit(plan)
+    return EXIT_PENDING if plan["steps"] else EXIT_OK
+
+
+def command_apply(args):
+    import subprocess
+
+    from programs.installer_logic import get_installed_index
+    from programs.transaction_planner import plan_install
+
+    apps, sources = load_app_selection(args.apps)
+    plan = plan_install(apps, sources)
+    if not plan["steps"] or args.dry_run:
+        emit({"plan": plan, "applied": False})
+        return EXIT_PENDING if plan["steps"] else EXIT_OK
+
+    result = {"plan": plan, "applied": True}
+    if args.parallel:
+        from programs.install_pipeline import PIPELINE_BUILD_JOBS, pipeline_supported, run_install_pipeline
+
+        if not pipeline_supported():
+            raise RuntimeError("The parallel pipeline needs a pty, pkexec, git and makepkg")
+        result["report"] = run_install_pipeline(
+            plan,
+            jobs=args.jobs or PIPELINE_BUILD_JOBS,
+            on_output=lambda _label, text: sys.stderr.write(text),
+            on_stage=lambda stage: print(f"==> {stage}", file=sys.stderr),
+        )
+    else:
+        for step in plan["steps"]:
+            command = [*step["command"], "--noconfirm"] if args.yes else step["command"]
+            # stdout carries the JSON result, so the package manager writes to stderr.
+            exit_code = subprocess.run(command, stdout=sys.stderr).returncode
+            if exit_code != 0:
+                result["failed_step"] = {**step, "exit_code": exit_code}
+                break
+
+    installed_index = get_installed_index(force=True)
+    pending = [app for app in apps if app not in plan["already_installed"] and app not in plan["unknown"]]
+    result["missing"] = [app for app in pending if not installed_index.is_installed(app)]
+    emit(result)
+    if "failed_step" in result and len(result["missing"]) == len(pending):
+        return EXIT_FAILED
+    return EXIT_PARTIAL if result["missing"] or plan["unknown"] else EXIT_OK
+
+
+def command_services(args):
+    from programs.services_logic import (
+        enable_service,
+        get_managed_services,
+        plan_reconcile,
+        reconcile_services,
+        start_service,
+        with_requirements,
+    )
+
+    if args.action == "list":
+        emit(get_managed_services())
+        return EXIT_OK
+
+    services = {service["key"]: service for service in get_managed_services()}
+    unknown = [key for key in args.keys if key not in services]
+    if unknown:
+        emit({"error": f"Unknown services: {', '.join(unknown)}", "services": list(services)})
+        return EXIT_USAGE
+    if args.action == "diff":
+        selected = {service["key"] for service in with_requirements(args.keys or list(services))}
+        plan = plan_reconcile([service for service in services.values() if service["key"] in selected])
+        emit(plan)
+        return EXIT_PENDING if plan["changes"] else EXIT_OK
+    if args.action == "apply":
+        plan = reconcile_services(args.keys or None)
+        emit(plan)
+        return EXIT_PARTIAL if plan["skipped"] else EXIT_OK
+    action = enable_service if args.action == "enable" else start_service
+    for key in args.keys:
+        action(services[key])
+    emit([service for service in get_managed_services() if service["key"] in args.keys])
+    return EXIT_OK
+
+
+def command_drives(args):
+    from programs.network_drives import load_drives, plan_drives, reconcile_drives
+
+    drives = load_drives()
+    if args.action == "list":
+        emit(drives)
+        return EXIT_OK
+
+    declared = {drive["mount_point"] for drive in drives}
+    unknown = [mount_point for mount_point in args.mount_points if os.path.normpath(mount_point) not in declared]
+    if unknown:
+        emit({"error": f"Unknown drives: {', '.join(unknown)}", "drives": sorted(declared)})
+        return EXIT_USAGE
+    if args.action == "diff":
+        wanted = {os.path.normpath(mount_point) for mount_point in args.mount_points} or declared
+        plan = plan_drives([drive for drive in drives if drive["mount_point"] in wanted])
+        emit(plan)
+        return EXIT_PENDING if plan["changes"] else EXIT_OK
+    result = reconcile_drives(args.mount_points or None)
+    emit(result)
+    return EXIT_PARTIAL if result["failed"] else EXIT_OK
+
+
+def command_tweaks(args):
+    tweaks = load_tweaks()
+    if args.action == "list":
+        emit([{"key": key, "name": name, "enabled": tweak_state(is_enabled)}
+              for key, (name, _, is_enabled) in tweaks.items()])
+        return EXIT_OK
+
+    keys = [key for key in tweaks if not tweak_state(tweaks[key][2])] if args.keys == ["all"] else args.keys
+    unknown = [key for key in keys if key not in tweaks]
+    if unknown:
+        emit({"error": f"Unknown tweaks: {', '.join(unknown)}", "tweaks": list(tweaks)})
+        return EXIT_USAGE
+    results = []
+    for key in keys:
+        name, apply, is_enabled = tweaks[key]
+        try:
+            apply()
+            results.append({"key": key, "name": name, "enabled": tweak_state(is_enabled)})
+        except Exception as e:
+            results.append({"key": key, "name": name, "enabled": tweak_state(is_enabled), "error": str(e)})
+    emit(results)
+    failed = sum(1 for result in results if "error" in result)
+    if not failed:
+        return EXIT_OK
+    return EXIT_FAILED if failed == len(results) else EXIT_PARTIAL
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="arch-mysetup", description="Apply the arch-mysetup configuration headlessly.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    status = subparsers.add_parser("status", help="installed and missing apps from apps.yaml")
+    status.add_argument("apps", nargs="*", help="limit to these apps")
+    status.set_defaults(handler=command_status)
+
+    plan = subparsers.add_parser("plan", help="dry-run install plan for the missing apps")
+    plan.add_argument("apps", nargs="*", help="limit to these apps")
+    plan.set_defaults(handler=command_plan)
+
+    apply = subparsers.add_parser("apply", help="install the missing apps")
+    apply.add_argument("apps", nargs="*", help="limit to these apps")
+    apply.add_argument("--dry-run", action="store_true", help="only print the plan")
+    apply.add_argument("-y", "--yes", action="store_true", help="pass --noconfirm to pacman and paru")
+    apply.add_argument("--parallel", action="store_true",
+                       help="download and build in parallel (needs pkexec, git and makepkg)")
+    apply.add_argument("-j", "--jobs", type=int, default=None, help="concurrent AUR builds with --parallel")
+    apply.set_defaults(handler=command_apply)
+
+    services = subparsers.add_parser("services", help="list, enable or start managed services, or apply bin/services.yaml")
+    services.add_argument("action", nargs="?", choices=("list", "enable", "start", "diff", "apply"), default="list")
+    services.add_argument("keys", nargs="*", help="service keys, see 'services list'; diff/apply default to all")
+    services.set_defaults(handler=command_services)
+
+    drives = subparsers.add_parser("drives", help="list, diff or apply the network drives of bin/drives.yaml")
+    drives.add_argument("action", nargs="?", choices=("list", "diff", "apply"), default="list")
+    drives.add_argument("mount_points", nargs="*", help="limit to these mount points; default all")
+    drives.set_defaults(handler=command_drives)
+
+    tweaks = subparsers.add_parser("tweaks", help="list or apply system tweaks")
+    tweaks.add_argument("action", nargs="?", choices=("list", "apply"), default="list")
+    tweaks.add_argument("keys", nargs="*", help="tweak keys, see 'tweaks list', or 'all'")
+    tweaks.set_defaults(handler=command_tweaks)
+    return parser
+
+
+@contextlib.contextmanager
+def json_stdout():
+    """
+    Keep a duplicate of fd 1 for emit() and point fd 1 at stderr meanwhile,
+    so print() in shared modules and output of child processes (pactl,
+    pacman, ...) cannot end up in front of the JSON document.
+    """
+    global json_output
+    sys.stdout.flush()
+    json_output = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            yield
+    finally:
+        sys.stderr.flush()
+        os.dup2(json_output.fileno(), 1)
+        json_output.close()
+        json_output = None
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    optional_keys = ("list", "diff", "apply") if args.command == "services" else ("list",)
+    if args.command in ("services", "tweaks") and args.action not in optional_keys and not args.keys:
+        parser.error(f"{args.command} {args.action} needs at least one key")
+    with json_stdout():
+        try:
+            return args.handler(args)
+        except (RuntimeError, OSError) as e:
+            emit({"error": str(e)})
+            return EXIT_FAILED
+        except KeyboardInterrupt:
+            return EXIT_FAILED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,30 +1,46 @@
 #!/usr/bin/env python
+import importlib
 import sys
+import time
 from pathlib import Path
 
+# --profile-startup prints an import/init timeline to stderr.
+PROFILE_STARTUP = "--profile-startup" in sys.argv
+startup_time = time.perf_counter()
+
+
+def mark(label, since=None):
+    if not PROFILE_STARTUP:
+        return
+    elapsed = (time.perf_counter() - startup_time) * 1000
+    duration = f" ({(time.perf_counter() - since) * 1000:.1f} ms)" if since is not None else ""
+    print(f"[startup] {elapsed:8.1f} ms  {label}{duration}", file=sys.stderr)
+
+
+started = time.perf_counter()
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication
+mark("imported PyQt5", started)
 
 # Ensure project root is importable when this file is run directly.
 project_root = str(Path(__file__).resolve().parent.parent)
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-from programs.apps_file import load_yaml
-from gui.app_uninstaller import AppUninstaller
-from gui.app_installer_window import ArchAppInstaller
-from gui.apps_page import AppsPage
-from gui.browsers_page import BrowsersPage
-from gui.dev_tools_page import DevToolsPage
-from gui.games_page import GamesPage
+started = time.perf_counter()
 from gui.setup_window import SetupWindow
-from gui.advanced_tweaks import AdvancedTweaks
-from gui.services_page import ServicesPage
+from gui.task_runner import get_task_runner
+from programs.icon_cache import get_icon_cache
+mark("imported gui.setup_window", started)
 
-app = QApplication(sys.argv)
+started = time.perf_counter()
+app = QApplication([arg for arg in sys.argv if arg != "--profile-startup"])
+mark("created QApplication", started)
 
-# Create the setup window first
+# Create the setup window first; every other page is imported and built on first use.
+started = time.perf_counter()
 setup_window = SetupWindow()
-load_yaml()
+mark("built SetupWindow", started)
 
 # Reference to the other windows
 app_installer_window = None
@@ -37,10 +53,17 @@ dev_tools_page_window = None
 browsers_page_window = None
 
 
+def import_page(module_name, class_name):
+    started_import = time.perf_counter()
+    module = importlib.import_module(module_name)
+    mark(f"imported {module_name}", started_import)
+    return getattr(module, class_name)
+
+
 def ensure_apps_page():
     global apps_page_window
     if apps_page_window is None:
-        apps_page_window = AppsPage(setup_window)
+        apps_page_window = import_page("gui.apps_page", "AppsPage")(setup_window)
     return apps_page_window
 
 
@@ -48,7 +71,7 @@ def open_app_installer():
     global app_installer_window
     apps_page = ensure_apps_page()
     if app_installer_window is None:
-        app_installer_window = ArchAppInstaller(apps_page)
+        app_installer_window = import_page("gui.app_installer_window", "ArchAppInstaller")(apps_page)
     app_installer_window.show()
     setup_window.hide()
 
@@ -57,7 +80,7 @@ def open_app_uninstaller():
     global app_uninstaller_window
     apps_page = ensure_apps_page()
     if app_uninstaller_window is None:
-        app_uninstaller_window = AppUninstaller(apps_page)
+        app_uninstaller_window = import_page("gui.app_uninstaller", "AppUninstaller")(apps_page)
     app_uninstaller_window.show()
     setup_window.hide()
 
@@ -65,7 +88,7 @@ def open_app_uninstaller():
 def open_advanced_tweaks():
     global advanced_tweaks_window
     if advanced_tweaks_window is None:
-        advanced_tweaks_window = AdvancedTweaks(setup_window)
+        advanced_tweaks_window = import_page("gui.advanced_tweaks", "AdvancedTweaks")(setup_window)
     advanced_tweaks_window.show()
     setup_window.hide()
 
@@ -79,7 +102,7 @@ def open_apps_page():
 def open_services_page():
     global services_page_window
     if services_page_window is None:
-        services_page_window = ServicesPage(setup_window)
+        services_page_window = import_page("gui.services_page", "ServicesPage")(setup_window)
     services_page_window.show()
     setup_window.hide()
 
@@ -87,7 +110,7 @@ def open_services_page():
 def open_games_page():
     global games_page_window
     if games_page_window is None:
-        games_page_window = GamesPage(setup_window)
+        games_page_window = import_page("gui.games_page", "GamesPage")(setup_window)
     games_page_window.show()
     setup_window.hide()
 
@@ -95,7 +118,7 @@ def open_games_page():
 def open_dev_tools_page():
     global dev_tools_page_window
     if dev_tools_page_window is None:
-        dev_tools_page_window = DevToolsPage(setup_window)
+        dev_tools_page_window = import_page("gui.dev_tools_page", "DevToolsPage")(setup_window)
     dev_tools_page_window.show()
     setup_window.hide()
 
@@ -103,7 +126,7 @@ def open_dev_tools_page():
 def open_browsers_page():
     global browsers_page_window
     if browsers_page_window is None:
-        browsers_page_window = BrowsersPage(setup_window)
+        browsers_page_window = import_page("gui.browsers_page", "BrowsersPage")(setup_window)
     browsers_page_window.show()
     setup_window.hide()
 
@@ -118,8 +141,20 @@ def main():
     setup_window.open_games_page.connect(open_games_page)
     setup_window.open_dev_tools_page.connect(open_dev_tools_page)
     setup_window.open_browsers_page.connect(open_browsers_page)
+    # Cancel queued and running page tasks and let them wind down before the interpreter exits.
+    app.aboutToQuit.connect(get_task_runner().shutdown)
+    # Icon last-use times of this session feed the LRU eviction of the next one.
+    app.aboutToQuit.connect(get_icon_cache().flush)
+    if PROFILE_STARTUP:
+        setup_window.probe_finished.connect(lambda probe: mark(f"probe finished: {probe}"))
+        get_task_runner().task_completed.connect(
+            lambda name, status, queued_ms, run_ms: mark(
+                f"task {name} {status}: queued {queued_ms:.1f} ms, ran {run_ms:.1f} ms"))
     # Show setup window
     setup_window.show()
+    mark("shown SetupWindow")
+    # Runs once the event loop is up, i.e. right after the first frame is queued.
+    QTimer.singleShot(0, lambda: mark("event loop running"))
 
     sys.exit(app.exec_())
 
@@ -66,6 +66,10 @@ fi
 sudo bash -c "cat > '$LAUNCHER_BIN' << 'EOF'
 #!/usr/bin/env bash
 set -euo pipefail
+# Any arguments run the headless CLI (status, plan, apply, services, tweaks).
+if [[ \$# -gt 0 ]]; then
+  exec python /opt/arch-mysetup/main/cli.py \"\$@\"
+fi
 export QT_QPA_PLATFORM=wayland
 exec python /opt/arch-mysetup/main/main.py
 EOF"
@@ -0,0 +1,152 @@
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+from programs.config import CACHE_DIR
+
+AUR_BASE_URL = os.environ.get("ARCH_MYSETUP_AUR_URL", "https://aur.archlinux.org")
+AUR_INFO_CACHE_PATH = CACHE_DIR.joinpath("aur_info.json")
+AUR_INFO_CACHE_TTL = 6 * 60 * 60
+# Names that are not in the AUR are remembered for less time so new uploads show up soon.
+AUR_MISSING_CACHE_TTL = 30 * 60
+# The info endpoint accepts many arg[] values; requests are POSTed so URL length is not a limit.
+AUR_BATCH_SIZE = 200
+
+# RPC fields kept in the cache; everything else in the response is dropped.
+AUR_INFO_FIELDS = (
+    "Name", "PackageBase", "Version", "Description", "URLPath",
+    "Depends", "MakeDepends", "CheckDepends", "OutOfDate", "Popularity",
+)
+
+
+class AurRpcClient:
+    """
+    Batched client for the AUR ``/rpc/v5/info`` endpoint.
+
+    ``info()`` resolves any number of names with one POST per
+    ``batch_size`` names and caches every answer (including "not in the
+    AUR") on disk with a TTL. ``paru -Si`` is only used for names the RPC
+    could not answer because the AUR was unreachable. Point ``base_url`` at a
+    local stand-in server to use it without network access.
+    """
+
+    def __init__(self, base_url=None, cache_path=None, ttl=AUR_INFO_CACHE_TTL,
+                 missing_ttl=AUR_MISSING_CACHE_TTL, batch_size=AUR_BATCH_SIZE, timeout=10,
+                 paru_fallback=True):
+        self.base_url = (base_url or AUR_BASE_URL).rstrip("/")
+        self.cache_path = Path(cache_path) if cache_path else AUR_INFO_CACHE_PATH
+        self.ttl = ttl
+        self.missing_ttl = missing_ttl
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.paru_fallback = paru_fallback
+        self._cache = None
+        self._lock = threading.Lock()
+
+    def info(self, names):
+        """Return {name: info dict or None} for every requested name."""
+        names = list(dict.fromkeys(name for name in names if name))
+        with self._lock:
+            cache = self._load_cache()
+            now = time.time()
+            results = {}
+            misses = []
+            for name in names:
+                entry = cache.get(name)
+                if entry is not None and now - entry["time"] < (self.ttl if entry["info"] else self.missing_ttl):
+                    results[name] = entry["info"]
+                else:
+                    misses.append(name)
+
+            unreachable = []
+            for start in range(0, len(misses), self.batch_size):
+                batch = misses[start:start + self.batch_size]
+                try:
+                    found = self._fetch(batch)
+                except (urllib.error.URLError, OSError, ValueError) as e:
+                    print(f"AUR RPC request failed: {e}")
+                    unreachable.extend(batch)
+                    continue
+                for name in batch:
+                    results[name] = found.get(name)
+                    cache[name] = {"time": now, "info": results[name]}
+
+            for name in unreachable:
+                results[name] = self._paru_info(name) if self.paru_fallback else None
+
+            if misses and len(unreachable) < len(misses):
+                self._save_cache(cache)
+        return results
+
+    def exists(self, name):
+        return self.info([name]).get(name) is not None
+
+    def _fetch(self, names):
+        data = urllib.parse.urlencode([("arg[]", name) for name in names]).encode("utf-8")
+        request = urllib.request.Request(
+            f"{self.base_url}/rpc/v5/info",
+            data=data,
+            headers={"User-Agent": "arch-mysetup", "Content-Type": "application/x-www-form-urlencoded"},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            payload = json.loads(response.read().decode("utf-8"))
+        if payload.get("type") == "error":
+            raise ValueError(payload.get("error") or "AUR RPC error")
+
+        found = {}
+        for result in payload.get("results", []):
+            name = result.get("Name")
+            if name:
+                found[name] = {field: result.get(field) for field in AUR_INFO_FIELDS if field in result}
+        return found
+
+    @staticmethod
+    def _paru_info(name):
+        try:
+            subprocess.run(
+                ["paru", "-Si", "--aur", name],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=True
+            )
+            return {"Name": name}
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return None
+
+    def _load_cache(self):
+        if self._cache is None:
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as cache_file:
+                    data = json.load(cache_file)
+                self._cache = data if isinstance(data, dict) else {}
+            except (OSError, ValueError):
+                self._cache = {}
+        return self._cache
+
+    def _save_cache(self, cache):
+        now = time.time()
+        longest_ttl = max(self.ttl, self.missing_ttl)
+        cache = {name: entry for name, entry in cache.items() if now - entry["time"] < longest_ttl}
+        self._cache = cache
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_path.parent, prefix=".aur_info.")
+            with os.fdopen(fd, "w", encoding="utf-8") as cache_file:
+                json.dump(cache, cache_file, separators=(",", ":"))
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            print(f"Failed to write AUR cache: {e}")
+
+
+aur_rpc_client = AurRpcClient()
+
+
+def get_aur_client():
+    return aur_rpc_client
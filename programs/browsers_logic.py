@@ -1,9 +1,13 @@
-from programs.catalog_logic import load_catalog_with_status, run_catalog_action
+from programs.catalog_logic import load_catalog_with_status, run_catalog_action, stream_catalog
 from programs.config import BROWSER_CATALOG_PATH, BROWSER_ICONS_DIR
 
 
-def load_browsers_with_status():
-    return load_catalog_with_status(BROWSER_CATALOG_PATH, BROWSER_ICONS_DIR)
+def load_browsers_with_status(on_icon_ready=None):
+    return load_catalog_with_status(BROWSER_CATALOG_PATH, BROWSER_ICONS_DIR, on_icon_ready)
+
+
+def stream_browsers(on_entries, on_status, on_icon_ready):
+    return stream_catalog(BROWSER_CATALOG_PATH, BROWSER_ICONS_DIR, on_entries, on_status, on_icon_ready)
 
 
 def run_browser_action(browser):
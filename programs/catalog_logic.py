@@ -1,5 +1,5 @@
 import re
-import urllib.request
+from concurrent.futures import wait
 from pathlib import Path
 
 import yaml
@@ -8,9 +8,13 @@ from programs.config import QUESTION_MARK_ICON_PATH
 from programs.installer_logic import (
     app_install,
     get_install_method_from_source,
-    is_app_installed,
+    get_installed_index,
+    install_command,
     remove_apps,
+    remove_command,
 )
+from programs.icon_cache import get_icon_cache
+from programs.icon_fetcher import get_icon_fetcher
 
 
 def load_catalog_entries(catalog_path: Path):
@@ -37,45 +41,146 @@ def load_catalog_entries(catalog_path: Path):
 
 
 def get_catalog_icon_path(entry, icon_dir: Path):
-    icon_dir.mkdir(parents=True, exist_ok=True)
+    """Path of the icon bundled with the repository for this entry (may not exist)."""
     slug = re.sub(r"[^a-z0-9]+", "-", entry["name"].lower()).strip("-")
     return icon_dir.joinpath(f"{slug}.png")
 
 
-def ensure_catalog_icon(entry, icon_dir: Path):
-    icon_path = get_catalog_icon_path(entry, icon_dir)
-    if icon_path.exists():
-        return icon_path
-
+def resolve_catalog_icon(entry, icon_dir: Path):
+    """Best icon available without network: the cached download, the bundled icon, or the placeholder."""
     icon_url = entry.get("icon_url")
-    if not icon_url:
-        return QUESTION_MARK_ICON_PATH
+    if icon_url:
+        cached_path = get_icon_cache().lookup(icon_url)
+        if cached_path is not None:
+            return cached_path
+    bundled_path = get_catalog_icon_path(entry, icon_dir)
+    if bundled_path.exists():
+        return bundled_path
+    return QUESTION_MARK_ICON_PATH
 
-    try:
-        request = urllib.request.Request(
-            icon_url,
-            headers={"User-Agent": "arch-mysetup"},
-        )
-        with urllib.request.urlopen(request, timeout=12) as response:
-            content = response.read()
-        if not content:
-            return QUESTION_MARK_ICON_PATH
-        icon_path.write_bytes(content)
-        return icon_path
-    except Exception:
-        return QUESTION_MARK_ICON_PATH
 
+def ensure_catalog_icon(entry, icon_dir: Path):
+    icon_url = entry.get("icon_url")
+    if icon_url:
+        wait(fetch_catalog_icons([entry], icon_dir, lambda _name, _path: None))
+    return resolve_catalog_icon(entry, icon_dir)
+
+
+def fetch_catalog_icons(entries, icon_dir: Path, on_icon_ready):
+    """
+    Download icons that are missing from the icon cache, and revalidate
+    (If-None-Match / If-Modified-Since) the ones that are due, concurrently.
+    ``on_icon_ready(name, icon_path)`` is called from a pool thread whenever
+    new icon content lands. Returns the list of futures.
+    """
+    fetcher = get_icon_fetcher()
+    icon_cache = get_icon_cache()
+    futures = []
+    for entry in entries:
+        icon_url = entry.get("icon_url")
+        if not icon_url:
+            continue
+        validators = icon_cache.validators(icon_url)
+        if validators is None:
+            continue
 
-def load_catalog_with_status(catalog_path: Path, icon_dir: Path):
-    entries = []
-    for entry in load_catalog_entries(catalog_path):
+        def on_done(url, result, name=entry["name"]):
+            if result is None:
+                return
+            status, content, headers = result
+            if status == 304:
+                icon_cache.mark_validated(url, headers)
+                return
+            if not content:
+                return
+            try:
+                ready_path = icon_cache.store(url, content, headers)
+            except OSError as e:
+                print(f"Failed to cache icon for {name}: {e}")
+                return
+            on_icon_ready(name, str(ready_path))
+
+        futures.append(fetcher.submit(icon_url, on_done, validators))
+    return futures
+
+
+def with_icon_placeholders(entries, icon_dir: Path):
+    """Copy entries, pointing icon_path at the best offline icon; installed is unknown (None)."""
+    staged = []
+    for entry in entries:
         entry_data = dict(entry)
-        entry_data["installed"] = is_app_installed(entry["name"])
-        entry_data["icon_path"] = str(ensure_catalog_icon(entry, icon_dir))
-        entries.append(entry_data)
+        entry_data["installed"] = None
+        entry_data["icon_path"] = str(resolve_catalog_icon(entry, icon_dir))
+        staged.append(entry_data)
+    return staged
+
+
+def load_catalog_status(entries):
+    """Installed state for every entry from one installed-package index build."""
+    installed_index = get_installed_index()
+    return {entry["name"]: installed_index.is_installed(entry["name"]) for entry in entries}
+
+
+def stream_catalog(catalog_path: Path, icon_dir: Path, on_entries, on_status, on_icon_ready):
+    """
+    Load a catalog in stages so the page can draw before everything is known:
+
+    1. ``on_entries(entries)`` right after the YAML is parsed (installed is None,
+       icons are cached files or the placeholder),
+    2. ``on_status({name: installed})`` once the installed index answered,
+    3. ``on_icon_ready(name, icon_path)`` from pool threads as icons download.
+
+    Returns the entries with installed state filled in.
+    """
+    entries = with_icon_placeholders(load_catalog_entries(catalog_path), icon_dir)
+    on_entries(entries)
+    # Keep the last-use times of this page's icons for LRU eviction in later sessions.
+    get_icon_cache().flush()
+    # Start downloads before the status query so network time overlaps with it.
+    fetch_catalog_icons(entries, icon_dir, on_icon_ready)
+    statuses = load_catalog_status(entries)
+    on_status(statuses)
+    for entry_data in entries:
+        entry_data["installed"] = statuses[entry_data["name"]]
     return entries
 
 
+def load_catalog_with_status(catalog_path: Path, icon_dir: Path, on_icon_ready=None):
+    """
+    Load the catalog with installed state and icon paths.
+
+    Icons already on disk are used directly; missing ones are downloaded
+    concurrently. With ``on_icon_ready`` the function returns immediately
+    with placeholder icon paths and reports each icon as it arrives;
+    without it, it waits for all downloads.
+    """
+    entries = with_icon_placeholders(load_catalog_entries(catalog_path), icon_dir)
+    statuses = load_catalog_status(entries)
+    for entry_data in entries:
+        entry_data["installed"] = statuses[entry_data["name"]]
+
+    if on_icon_ready is not None:
+        fetch_catalog_icons(entries, icon_dir, on_icon_ready)
+        return entries
+
+    ready = {}
+    futures = fetch_catalog_icons(entries, icon_dir, lambda name, path: ready.__setitem__(name, path))
+    wait(futures)
+    for entry_data in entries:
+        entry_data["icon_path"] = ready.get(entry_data["name"], entry_data["icon_path"])
+    return entries
+
+
+def catalog_action_command(entry):
+    """Return the argv that installs the entry, or removes it when it is installed."""
+    method = get_install_method_from_source(entry.get("source"))
+    if method is None:
+        raise RuntimeError(f"Unknown install source for {entry['title']}")
+    if entry.get("installed"):
+        return remove_command(entry["name"], method)
+    return install_command(entry["name"], method)
+
+
 def run_catalog_action(entry):
     method = get_install_method_from_source(entry.get("source"))
     if method is None:
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Repository paths
@@ -24,6 +25,12 @@ PACMAN_MIRRORLIST_PATH = Path("/etc/pacman.d/mirrorlist")
 PACMAN_REFLECTOR_CONFIG_PATH = Path("/etc/xdg/reflector/reflector.conf")
 XORG_KEYBOARD_CONF_PATH = Path("/etc/X11/xorg.conf.d/00-keyboard.conf")
 FSTAB_PATH = Path("/etc/fstab")
+SYSTEMD_UNIT_DIR = Path("/etc/systemd/system")
+PACMAN_LOCAL_DB_PATH = Path("/var/lib/pacman/local")
+PACMAN_SYNC_DB_PATH = Path("/var/lib/pacman/sync")
+
+# Per-user cache directory for indexes and downloaded data
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home().joinpath(".cache")).joinpath("arch-mysetup")
 
 BASH_EXTRA_PATH = Path.home().joinpath(".bash_extra")
 BASHRC_PATH = Path.home().joinpath(".bashrc")
@@ -45,3 +52,5 @@ REFLECTOR_TEMPLATE_PATH = BIN_DIR.joinpath("reflector.txt")
 GAME_CATALOG_PATH = BIN_DIR.joinpath("games.yaml")
 DEV_TOOL_CATALOG_PATH = BIN_DIR.joinpath("dev_tools.yaml")
 BROWSER_CATALOG_PATH = BIN_DIR.joinpath("browsers.yaml")
+SERVICES_PATH = BIN_DIR.joinpath("services.yaml")
+DRIVES_PATH = BIN_DIR.joinpath("drives.yaml")
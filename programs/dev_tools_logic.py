@@ -1,9 +1,13 @@
-from programs.catalog_logic import load_catalog_with_status, run_catalog_action
+from programs.catalog_logic import load_catalog_with_status, run_catalog_action, stream_catalog
 from programs.config import DEV_TOOL_CATALOG_PATH, DEV_TOOL_ICONS_DIR
 
 
-def load_dev_tools_with_status():
-    return load_catalog_with_status(DEV_TOOL_CATALOG_PATH, DEV_TOOL_ICONS_DIR)
+def load_dev_tools_with_status(on_icon_ready=None):
+    return load_catalog_with_status(DEV_TOOL_CATALOG_PATH, DEV_TOOL_ICONS_DIR, on_icon_ready)
+
+
+def stream_dev_tools(on_entries, on_status, on_icon_ready):
+    return stream_catalog(DEV_TOOL_CATALOG_PATH, DEV_TOOL_ICONS_DIR, on_entries, on_status, on_icon_ready)
 
 
 def run_dev_tool_action(dev_tool):
@@ -0,0 +1,286 @@
+import os
+import threading
+import time
+from collections import deque
+
+from programs.mount_probe import PROBE_TIMEOUT
+from programs.mount_table import get_mount_table
+
+# Seconds between two samples of a healthy mount.
+HEALTH_INTERVAL = 30.0
+# Samples kept per mount (an hour at the default interval).
+HEALTH_HISTORY = 120
+# Longest pause between samples of a mount that keeps timing out.
+MAX_BACKOFF = 600.0
+ROUND_TRIP_SIZE = 4096
+THROUGHPUT_SIZE = 8 * 1024 * 1024
+THROUGHPUT_CHUNK = 1024 * 1024
+PROBE_FILE_NAME = ".arch-mysetup-health-{}"
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of ``values`` (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, -(-len(ordered) * fraction // 1) - 1))
+    return ordered[int(index)]
+
+
+def drop_cache(fd):
+    """Ask the kernel to forget cached pages so a read goes to the server."""
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except (AttributeError, OSError):
+        pass
+
+
+def write_and_read(path, payload, chunk_size=None):
+    """Write ``payload`` to ``path`` with fsync, read it back uncached; returns (write s, read s)."""
+    chunk_size = chunk_size or len(payload)
+    started = time.perf_counter()
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        for offset in range(0, len(payload), chunk_size):
+            os.write(fd, payload[offset:offset + chunk_size])
+        os.fsync(fd)
+        drop_cache(fd)
+    finally:
+        os.close(fd)
+    written = time.perf_counter()
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        drop_cache(fd)
+        data = bytearray()
+        while True:
+            chunk = os.read(fd, chunk_size)
+            if not chunk:
+                break
+            data.extend(chunk)
+    finally:
+        os.close(fd)
+    if data != payload:
+        raise OSError(f"read back {len(data)} bytes that differ from what was written")
+    return written - started, time.perf_counter() - written
+
+
+def sample_mount(mount_point, write_probe=True, throughput=False):
+    """
+    One health sample of ``mount_point``: {"time", "stat_ms", "round_trip_ms",
+    "latency_ms", "write_mbps", "read_mbps", "ok", "error"}.
+
+    stat_ms times os.stat of the mount point; round_trip_ms a 4 KiB file
+    written, fsynced, read back past the page cache and removed (None on a
+    read-only share); with ``throughput`` an 8 MiB file the same way for
+    sequential MB/s. latency_ms is stat plus round trip.
+    """
+    sample = {"time": time.time(), "stat_ms": None, "round_trip_ms": None, "latency_ms": None,
+              "write_mbps": None, "read_mbps": None, "ok": True, "error": ""}
+    started = time.perf_counter()
+    try:
+        os.stat(mount_point)
+    except OSError as e:
+        sample.update(ok=False, error=str(e))
+        return sample
+    sample["stat_ms"] = (time.perf_counter() - started) * 1000
+    sample["latency_ms"] = sample["stat_ms"]
+    if not write_probe:
+        return sample
+
+    path = os.path.join(mount_point, PROBE_FILE_NAME.format(os.getpid()))
+    try:
+        write_seconds, read_seconds = write_and_read(path, os.urandom(ROUND_TRIP_SIZE))
+        sample["round_trip_ms"] = (write_seconds + read_seconds) * 1000
+        sample["latency_ms"] += sample["round_trip_ms"]
+        if throughput:
+            write_seconds, read_seconds = write_and_read(path, os.urandom(THROUGHPUT_SIZE), THROUGHPUT_CHUNK)
+            megabytes = THROUGHPUT_SIZE / (1024 * 1024)
+            sample["write_mbps"] = megabytes / max(write_seconds, 1e-6)
+            sample["read_mbps"] = megabytes / max(read_seconds, 1e-6)
+    except PermissionError:
+        # Read-only share or no write access: stat latency is all there is.
+        pass
+    except OSError as e:
+        sample.update(ok=False, error=str(e))
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    return sample
+
+
+def format_latency(milliseconds):
+    """"0.4 ms", "12 ms" or "1.3 s"; "-" before the first good sample."""
+    if milliseconds is None:
+        return "-"
+    if milliseconds >= 1000:
+        return f"{milliseconds / 1000:.1f} s"
+    return f"{milliseconds:.1f} ms" if milliseconds < 10 else f"{milliseconds:.0f} ms"
+
+
+def describe_health(summary):
+    """Tooltip text for a summary(): last sample, failures and the current sampling interval."""
+    last = summary["last"]
+    if last is None:
+        return "No samples yet"
+    lines = [f"{summary['samples']} samples, {summary['failures']} failed"]
+    if last["ok"]:
+        lines.append(f"Last: stat {format_latency(last['stat_ms'])}, "
+                     f"4 KiB round trip {format_latency(last['round_trip_ms'])}")
+        if last["write_mbps"] is not None:
+            lines.append(f"Sequential: write {last['write_mbps']:.1f} MB/s, read {last['read_mbps']:.1f} MB/s")
+    else:
+        lines.append(f"Last sample failed: {last['error']}")
+    lines.append(f"Next sample in {summary['backoff']:.0f} s")
+    return "\n".join(lines)
+
+
+class DriveHealthMonitor:
+    """
+    Samples every mounted network drive from fstab in the background.
+
+    Each mount is sampled every ``interval`` seconds into a bounded deque of
+    ``history`` samples. Samples run on throwaway daemon threads with a
+    ``timeout`` deadline, since I/O on a hung share cannot be interrupted; a
+    mount that misses the deadline (or is still stuck from last time) is
+    recorded as unresponsive and sampled at a doubling interval up to
+    MAX_BACKOFF, back to normal after its first good sample. Listeners get
+    ``callback(mount_point, summary)`` from the monitor thread after each
+    sample (see summary()).
+    """
+
+    def __init__(self, interval=HEALTH_INTERVAL, history=HEALTH_HISTORY, timeout=PROBE_TIMEOUT,
+                 write_probe=True, throughput=False):
+        self.interval = interval
+        self.history = history
+        self.timeout = timeout
+        self.write_probe = write_probe
+        self.throughput = throughput
+        self.samples = {}
+        self.backoff = {}
+        self.next_due = {}
+        self.stuck = set()
+        self._listeners = []
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """Register ``callback(mount_point, summary)``; it is called from the monitor thread."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        # A share mounted while the monitor runs is sampled right away, not at the next tick.
+        get_mount_table().add_listener(self.wake)
+        self._thread = threading.Thread(target=self._run, name="drive-health-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        get_mount_table().remove_listener(self.wake)
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for drive in get_mount_table().network_drives():
+                mount_point = drive["mount_point"]
+                if drive["mounted"] and self.next_due.get(mount_point, 0) <= now:
+                    self.sample(mount_point)
+                if self._stop.is_set():
+                    return
+            due = [due for due in self.next_due.values() if due > time.monotonic()]
+            self._wake.wait(max(1.0, min(due, default=now + self.interval) - time.monotonic()))
+            self._wake.clear()
+
+    def wake(self, *_args):
+        """Check for due (or newly mounted) drives now instead of at the next scheduled sample."""
+        self._wake.set()
+
+    def sample(self, mount_point):
+        """Take one sample of ``mount_point`` (waits at most ``timeout``) and schedule the next one."""
+        with self._lock:
+            already_stuck = mount_point in self.stuck
+            if not already_stuck:
+                self.stuck.add(mount_point)
+        result = {}
+        if not already_stuck:
+            done = threading.Event()
+            threading.Thread(target=self._sample_thread, args=(mount_point, result, done), daemon=True,
+                             name=f"drive health {mount_point}").start()
+            done.wait(self.timeout)
+        sample = result.get("sample")
+        if sample is None:
+            sample = {"time": time.time(), "stat_ms": None, "round_trip_ms": None, "latency_ms": None,
+                      "write_mbps": None, "read_mbps": None, "ok": False, "error": "unresponsive"}
+
+        with self._lock:
+            samples = self.samples.setdefault(mount_point, deque(maxlen=self.history))
+            samples.append(sample)
+            if sample["error"] == "unresponsive":
+                self.backoff[mount_point] = min(MAX_BACKOFF, self.backoff.get(mount_point, self.interval) * 2)
+            else:
+                self.backoff[mount_point] = self.interval
+            self.next_due[mount_point] = time.monotonic() + self.backoff[mount_point]
+            listeners = list(self._listeners)
+        summary = self.summary(mount_point)
+        for callback in listeners:
+            try:
+                callback(mount_point, summary)
+            except Exception as e:
+                print(f"Drive health listener failed: {e}")
+        return sample
+
+    def _sample_thread(self, mount_point, result, done):
+        try:
+            result["sample"] = sample_mount(mount_point, self.write_probe, self.throughput)
+        finally:
+            with self._lock:
+                self.stuck.discard(mount_point)
+            done.set()
+
+    def summary(self, mount_point):
+        """
+        {"samples", "p50_ms", "p95_ms", "last", "failures", "status", "backoff"}
+        over the kept samples; status is "ok", "unresponsive" or "error".
+        """
+        with self._lock:
+            samples = list(self.samples.get(mount_point, ()))
+            backoff = self.backoff.get(mount_point, self.interval)
+        latencies = [sample["latency_ms"] for sample in samples if sample["ok"] and sample["latency_ms"] is not None]
+        last = samples[-1] if samples else None
+        if last is None or last["ok"]:
+            status = "ok"
+        else:
+            status = "unresponsive" if last["error"] == "unresponsive" else "error"
+        return {
+            "samples": len(samples),
+            "p50_ms": percentile(latencies, 0.5),
+            "p95_ms": percentile(latencies, 0.95),
+            "last": last,
+            "failures": sum(1 for sample in samples if not sample["ok"]),
+            "status": status,
+            "backoff": backoff,
+        }
+
+
+drive_health_monitor = DriveHealthMonitor()
+
+
+def get_drive_health_monitor():
+    return drive_health_monitor
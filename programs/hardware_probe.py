@@ -0,0 +1,105 @@
+import functools
+from pathlib import Path
+
+from programs.installer_logic import get_installed_index
+
+PCI_DEVICES_DIR = Path("/sys/bus/pci/devices")
+
+# PCI base class 0x03 "display controller": VGA (0x00), XGA (0x01), 3D (0x02), other (0x80).
+DISPLAY_CLASS = 0x03
+
+# Driver packages per GPU vendor, by PCI vendor id. "required" are the packages
+# whose presence counts as "drivers installed" for that vendor.
+GPU_DRIVERS = {
+    0x8086: {
+        "vendor": "Intel",
+        "packages": ("mesa", "lib32-mesa", "vulkan-intel", "lib32-vulkan-intel", "xf86-video-intel"),
+        "required": ("mesa", "vulkan-intel"),
+    },
+    0x10DE: {
+        "vendor": "NVIDIA",
+        "packages": ("nvidia", "nvidia-utils", "lib32-nvidia-utils"),
+        "required": ("nvidia-utils",),
+    },
+    0x1002: {
+        "vendor": "AMD",
+        "packages": ("mesa", "lib32-mesa", "vulkan-radeon", "lib32-vulkan-radeon", "xf86-video-amdgpu"),
+        "required": ("mesa", "vulkan-radeon"),
+    },
+}
+
+
+def read_hex(path):
+    try:
+        return int(path.read_text().strip(), 16)
+    except (OSError, ValueError):
+        return None
+
+
+def read_pci_device(device_dir):
+    """{"slot", "vendor_id", "device_id", "class", "driver", "boot_vga"} from one sysfs PCI device directory."""
+    driver = device_dir / "driver"
+    try:
+        boot_vga = (device_dir / "boot_vga").read_text().strip() == "1"
+    except OSError:
+        boot_vga = False
+    return {
+        "slot": device_dir.name,
+        "vendor_id": read_hex(device_dir / "vendor"),
+        "device_id": read_hex(device_dir / "device"),
+        "class": read_hex(device_dir / "class"),
+        # Kernel driver bound right now (amdgpu, i915, nvidia, nouveau), None when unbound.
+        "driver": driver.resolve().name if driver.exists() else None,
+        "boot_vga": boot_vga,
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def detect_gpus(devices_dir=PCI_DEVICES_DIR):
+    """
+    Every display controller on the PCI bus, read from sysfs once per session.
+
+    Covers VGA and 3D controllers alike, so the discrete GPU of a hybrid
+    laptop is found next to the integrated one. Each GPU is a
+    read_pci_device() dict plus "vendor" ("Intel", "NVIDIA", "AMD" or the
+    hex vendor id); the GPU the firmware booted on comes first.
+    """
+    gpus = []
+    try:
+        device_dirs = sorted(Path(devices_dir).iterdir())
+    except OSError:
+        return ()
+    for device_dir in device_dirs:
+        device = read_pci_device(device_dir)
+        if device["class"] is None or device["class"] >> 16 != DISPLAY_CLASS:
+            continue
+        vendor = GPU_DRIVERS.get(device["vendor_id"], {}).get("vendor")
+        device["vendor"] = vendor or f"{device['vendor_id'] or 0:04x}"
+        gpus.append(device)
+    return tuple(sorted(gpus, key=lambda gpu: not gpu["boot_vga"]))
+
+
+def gpu_vendors(gpus=None):
+    """Known vendors of ``gpus`` (default: detect_gpus()), without duplicates, boot GPU first."""
+    gpus = detect_gpus() if gpus is None else gpus
+    return list(dict.fromkeys(gpu["vendor"] for gpu in gpus if gpu["vendor_id"] in GPU_DRIVERS))
+
+
+def driver_packages(gpus=None):
+    """Driver packages for all ``gpus`` together, e.g. Intel and NVIDIA on a hybrid laptop."""
+    gpus = detect_gpus() if gpus is None else gpus
+    packages = {}
+    for gpu in gpus:
+        for package in GPU_DRIVERS.get(gpu["vendor_id"], {}).get("packages", ()):
+            packages[package] = None
+    return list(packages)
+
+
+def gpu_driver_installed(gpus=None, installed_index=None):
+    """True when the required driver packages of every known GPU are installed; False without a known GPU."""
+    gpus = detect_gpus() if gpus is None else gpus
+    drivers = [GPU_DRIVERS[gpu["vendor_id"]] for gpu in gpus if gpu["vendor_id"] in GPU_DRIVERS]
+    if not drivers:
+        return False
+    installed_index = installed_index or get_installed_index()
+    return all(installed_index.is_installed(package) for driver in drivers for package in driver["required"])
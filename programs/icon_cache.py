@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from programs.config import CACHE_DIR
+
+ICON_CACHE_DIR = CACHE_DIR.joinpath("icons")
+ICON_CACHE_INDEX_VERSION = 1
+# Total bytes of icon blobs kept before least recently used ones are evicted.
+ICON_CACHE_BUDGET = 32 * 1024 * 1024
+# Cached icons are revalidated (If-None-Match / If-Modified-Since) after this many seconds.
+ICON_REVALIDATE_AFTER = 7 * 24 * 60 * 60
+
+
+def guess_icon_extension(content):
+    """Pick a file extension from the image magic bytes so Qt loads the right format."""
+    head = content[:512].lstrip()
+    if content.startswith(b"\x89PNG"):
+        return "png"
+    if content.startswith(b"\xff\xd8"):
+        return "jpg"
+    if content.startswith(b"GIF8"):
+        return "gif"
+    if content.startswith(b"RIFF") and content[8:12] == b"WEBP":
+        return "webp"
+    if content.startswith(b"\x00\x00\x01\x00"):
+        return "ico"
+    if head.startswith(b"<?xml") or head.startswith(b"<svg"):
+        return "svg"
+    return "img"
+
+
+def atomic_write_bytes(path: Path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            temp_file.write(content)
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class IconCache:
+    """
+    Content-addressed, size-bounded icon cache under ``$XDG_CACHE_HOME/arch-mysetup/icons``.
+
+    Blobs are stored once per SHA-256, so catalog entries whose URLs serve the
+    same image share a file. ``index.json`` maps each URL to its blob plus the
+    ``ETag``/``Last-Modified`` validators and last check time, and records blob
+    sizes and last use, so LRU eviction never stats the icons. Last-use times
+    from lookup() are kept in memory until flush(). All writes are atomic.
+    """
+
+    def __init__(self, root=None, budget=ICON_CACHE_BUDGET, revalidate_after=ICON_REVALIDATE_AFTER):
+        self.root = Path(root) if root else ICON_CACHE_DIR
+        self.index_path = self.root.joinpath("index.json")
+        self.budget = budget
+        self.revalidate_after = revalidate_after
+        self._index = None
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    def _load(self):
+        if self._index is None:
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as index_file:
+                    data = json.load(index_file)
+                if data.get("version") != ICON_CACHE_INDEX_VERSION:
+                    raise ValueError("icon cache index version mismatch")
+                self._index = data
+            except (OSError, ValueError, AttributeError):
+                self._index = {"version": ICON_CACHE_INDEX_VERSION, "urls": {}, "blobs": {}}
+        return self._index
+
+    def _save(self):
+        content = json.dumps(self._index, separators=(",", ":")).encode("utf-8")
+        try:
+            atomic_write_bytes(self.index_path, content)
+            self._dirty = False
+        except OSError as e:
+            print(f"Failed to write icon cache index: {e}")
+
+    def blob_path(self, digest, extension):
+        return self.root.joinpath("blobs", digest[:2], f"{digest}.{extension}")
+
+    def lookup(self, url):
+        """Return the cached file for ``url`` (and mark it used), or None; forgets blobs deleted behind its back."""
+        with self._lock:
+            index = self._load()
+            entry = index["urls"].get(url)
+            if entry is None:
+                return None
+            blob = index["blobs"].get(entry["hash"])
+            path = self.blob_path(entry["hash"], blob["ext"]) if blob is not None else None
+            if path is None or not path.exists():
+                index["blobs"].pop(entry["hash"], None)
+                index["urls"] = {other_url: other for other_url, other in index["urls"].items()
+                                 if other["hash"] != entry["hash"]}
+                self._dirty = True
+                return None
+            blob["used"] = time.time()
+            self._dirty = True
+            return path
+
+    def validators(self, url):
+        """Return conditional request headers for ``url`` when it is due for revalidation, else None."""
+        with self._lock:
+            entry = self._load()["urls"].get(url)
+            if entry is None:
+                return {}
+            if time.time() - entry.get("checked", 0) < self.revalidate_after:
+                return None
+            headers = {}
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+            return headers
+
+    def store(self, url, content, headers=None):
+        """Store a downloaded icon and return its blob path."""
+        headers = headers or {}
+        digest = hashlib.sha256(content).hexdigest()
+        extension = guess_icon_extension(content)
+        with self._lock:
+            index = self._load()
+            path = self.blob_path(digest, extension)
+            if digest not in index["blobs"]:
+                atomic_write_bytes(path, content)
+                index["blobs"][digest] = {"size": len(content), "ext": extension, "used": time.time()}
+            index["urls"][url] = {
+                "hash": digest,
+                "etag": headers.get("etag"),
+                "last_modified": headers.get("last-modified"),
+                "checked": time.time(),
+            }
+            self._evict()
+            self._save()
+            return path
+
+    def mark_validated(self, url, headers=None):
+        """Record a 304 Not Modified answer for ``url``."""
+        headers = headers or {}
+        with self._lock:
+            entry = self._load()["urls"].get(url)
+            if entry is None:
+                return
+            entry["checked"] = time.time()
+            entry["etag"] = headers.get("etag") or entry.get("etag")
+            entry["last_modified"] = headers.get("last-modified") or entry.get("last_modified")
+            self._save()
+
+    def flush(self):
+        """Persist last-use times recorded by lookup(); call after a batch of lookups and at exit."""
+        with self._lock:
+            if self._index is not None and self._dirty:
+                self._save()
+
+    def _evict(self):
+        index = self._index
+        total = sum(blob["size"] for blob in index["blobs"].values())
+        if total <= self.budget:
+            return
+        for digest, blob in sorted(index["blobs"].items(), key=lambda item: item[1]["used"]):
+            if total <= self.budget:
+                break
+            try:
+                self.blob_path(digest, blob["ext"]).unlink()
+            except OSError:
+                pass
+            total -= blob["size"]
+            del index["blobs"][digest]
+        index["urls"] = {url: entry for url, entry in index["urls"].items() if entry["hash"] in index["blobs"]}
+
+
+icon_cache = IconCache()
+
+
+def get_icon_cache():
+    return icon_cache
@@ -0,0 +1,160 @@
+import http.client
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+ICON_FETCH_WORKERS = 6
+ICON_FETCH_TIMEOUT = 12
+ICON_FETCH_RETRIES = 3
+ICON_FETCH_BACKOFF = 0.5
+MAX_REDIRECTS = 5
+# Idle keep-alive connections kept per host.
+MAX_IDLE_PER_HOST = 4
+# Statuses worth asking again for; every other 4xx/5xx is final.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class IconFetchError(RuntimeError):
+    pass
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections, reused per (scheme, host, port)."""
+
+    def __init__(self, timeout=ICON_FETCH_TIMEOUT, max_idle_per_host=MAX_IDLE_PER_HOST):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, scheme, host, port):
+        key = (scheme, host, port)
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop()
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def release(self, scheme, host, port, connection):
+        key = (scheme, host, port)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+
+class IconFetcher:
+    """
+    Downloads icons concurrently on a bounded thread pool.
+
+    Connections are reused per host, redirects are followed, and failed
+    requests (network errors, 5xx, 429) are retried with exponential backoff.
+    Concurrent requests for the same URL share one download.
+    """
+
+    def __init__(self, max_workers=ICON_FETCH_WORKERS, timeout=ICON_FETCH_TIMEOUT,
+                 retries=ICON_FETCH_RETRIES, backoff=ICON_FETCH_BACKOFF):
+        self.pool = ConnectionPool(timeout=timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="icon-fetch")
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, url, on_done=None, headers=None):
+        """
+        Queue a GET of ``url`` and return its Future (result: (status, body, headers)).
+        ``on_done(url, result_or_none)`` is called from a pool thread.
+        """
+        key = (url, tuple(sorted((headers or {}).items())))
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self.executor.submit(self.request, url, headers)
+                self._in_flight[key] = future
+                future.add_done_callback(lambda _f, done_key=key: self._forget(done_key))
+        if on_done is not None:
+            future.add_done_callback(lambda f: on_done(url, None if f.exception() else f.result()))
+        return future
+
+    def _forget(self, key):
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    def fetch(self, url, headers=None):
+        """Download ``url`` and return its body, retrying transient failures."""
+        return self.request(url, headers)[1]
+
+    def request(self, url, headers=None):
+        """Return (status, body, response_headers) for a GET, following redirects."""
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            # IconFetchError from _get() (bad scheme, redirect loop) is permanent and not retried.
+            try:
+                status, body, response_headers = self._get(url, headers or {})
+            except (OSError, http.client.HTTPException):
+                if attempt >= self.retries:
+                    raise
+            else:
+                if status < 400:
+                    return status, body, response_headers
+                if status not in RETRY_STATUSES or attempt >= self.retries:
+                    raise IconFetchError(f"HTTP {status} for {url}")
+            time.sleep(delay)
+            delay *= 2
+        raise IconFetchError(f"Could not download {url}")
+
+    def _get(self, url, headers):
+        for _ in range(MAX_REDIRECTS + 1):
+            parsed = urllib.parse.urlsplit(url)
+            scheme = parsed.scheme.lower()
+            if scheme not in ("http", "https"):
+                raise IconFetchError(f"Unsupported URL scheme: {url}")
+            port = parsed.port or (443 if scheme == "https" else 80)
+            path = parsed.path or "/"
+            if parsed.query:
+                path = f"{path}?{parsed.query}"
+
+            connection = self.pool.acquire(scheme, parsed.hostname, port)
+            try:
+                connection.request("GET", path, headers={"User-Agent": "arch-mysetup", **headers})
+                response = connection.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self.pool.release(scheme, parsed.hostname, port, connection)
+
+            location = response.getheader("Location")
+            if response.status in (301, 302, 303, 307, 308) and location:
+                url = urllib.parse.urljoin(url, location)
+                continue
+            return response.status, body, {key.lower(): value for key, value in response.getheaders()}
+        raise IconFetchError(f"Too many redirects for {url}")
+
+
+_icon_fetcher = None
+_icon_fetcher_lock = threading.Lock()
+
+
+def get_icon_fetcher():
+    global _icon_fetcher
+    with _icon_fetcher_lock:
+        if _icon_fetcher is None:
+            _icon_fetcher = IconFetcher()
+        return _icon_fetcher
@@ -0,0 +1,336 @@
+import os
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from programs.aur_rpc import get_aur_client
+from programs.config import CACHE_DIR
+from programs.installer_logic import command_exists, get_installed_index
+from programs.pacman_db import strip_version_constraint
+from programs.pty_runner import PACKAGE_FILE_PATTERN, ScrollbackBuffer, pty_supported, run_in_pty, strip_ansi
+from programs.sync_db import get_sync_index
+
+# Concurrent makepkg runs; each gets an equal share of the CPUs through MAKEFLAGS.
+PIPELINE_BUILD_JOBS = max(1, min(4, (os.cpu_count() or 2) // 2))
+# AUR clones are network bound, so they run wider than the builds.
+PIPELINE_CLONE_JOBS = 8
+AUR_BUILD_DIR = CACHE_DIR.joinpath("aur-builds")
+AUR_PACKAGE_DIR = AUR_BUILD_DIR.joinpath("packages")
+AUR_GIT_URL = "https://aur.archlinux.org/{}.git"
+PACKAGE_SUFFIX_PATTERN = re.compile(r"\.pkg\.tar(\.\w+)?$")
+
+PACMAN_COMMAND = ["pkexec", "pacman", "--noconfirm", "--needed", "--color", "always"]
+PARU_COMMAND = ["paru", "-S", "--noconfirm", "--needed", "--skipreview", "--sudo", "pkexec", "--color", "always"]
+
+
+def pipeline_supported():
+    """The pipeline needs a pty for progress, pkexec for root and git + makepkg for AUR builds."""
+    return pty_supported() and all(command_exists(command) for command in ("pkexec", "git", "makepkg"))
+
+
+def root_prompt_count(plan):
+    """
+    How many polkit password prompts InstallPipeline shows for ``plan`` at most.
+
+    Every root step is its own ``pkexec pacman`` (``-S --asdeps``, ``-Sw``,
+    ``-S``, ``-U``) and pkexec does not keep the authorization between
+    calls, so each one asks again; paru may ask more than once on its own.
+    """
+    repo_apps = any(not package["dependency"] for package in plan["repo_packages"])
+    return bool(plan["dependencies"]) + 2 * repo_apps + 2 * bool(plan["aur_packages"])
+
+
+def split_aur_builds(aur_packages):
+    """
+    Split the AUR part of a plan into packages the pipeline builds itself and
+    packages left to paru.
+
+    Returns (builds, via_paru): ``builds`` maps a package base to the app
+    names it provides (split packages are built once); ``via_paru`` lists
+    apps that depend on other AUR packages, which paru has to build and
+    install in order, or whose metadata could not be fetched.
+    """
+    if not aur_packages:
+        return {}, []
+    installed_index = get_installed_index()
+    sync_index = get_sync_index()
+    if not sync_index.is_available():
+        # Without the sync index the repo build dependencies were not planned.
+        return {}, list(aur_packages)
+
+    builds = {}
+    via_paru = []
+    aur_info = get_aur_client().info(aur_packages)
+    for name in aur_packages:
+        info = aur_info.get(name)
+        if not info:
+            via_paru.append(name)
+            continue
+        dependencies = [strip_version_constraint(dependency)
+                        for dependency in [*(info.get("Depends") or []), *(info.get("MakeDepends") or [])]]
+        if any(dependency and not installed_index.is_installed(dependency) and sync_index.resolve(dependency) is None
+               for dependency in dependencies):
+            via_paru.append(name)
+            continue
+        builds.setdefault(info.get("PackageBase") or name, []).append(name)
+    return builds, via_paru
+
+
+class PhaseTimer:
+    """
+    Per-package durations from the progress events of one command.
+
+    pacman works through packages one at a time, so a (package, phase)
+    lasts from its first event until the next package shows up (or the
+    command ends).
+    """
+
+    def __init__(self, timings, lock):
+        self.timings = timings
+        self.lock = lock
+        self.current = None
+        self.started = None
+
+    def record(self, event):
+        key = (event["package"], event["phase"])
+        if key != self.current:
+            self.close()
+            self.current = key
+            self.started = time.monotonic()
+
+    def close(self):
+        if self.current is None:
+            return
+        package, phase = self.current
+        with self.lock:
+            phases = self.timings.setdefault(package, {})
+            phases[phase] = phases.get(phase, 0.0) + time.monotonic() - self.started
+        self.current = None
+
+
+class InstallPipeline:
+    """
+    Runs a plan_install() plan as overlapping stages instead of one step after another.
+
+    Stage one prefetches every repo package into the pacman cache
+    (``pacman -Sw``) while the AUR packages are cloned and built with
+    makepkg, up to ``jobs`` builds at a time; the repo build dependencies of
+    the AUR packages are installed first on the same pacman thread, and the
+    builds wait only for that. Stage two installs everything in one go:
+    ``pacman -S`` from the warm cache, ``pacman -U`` of the built packages,
+    then paru for the AUR packages that need other AUR packages. Stage three
+    reports stage and per-package timings, so the wall-clock time is close
+    to the slower of downloading and building rather than their sum.
+
+    Commands run in a pty, root commands through pkexec, one password
+    prompt each (see root_prompt_count()). A failed install step is recorded
+    in the report's "failed" like a failed build, so the other steps still
+    run and the report survives. ``on_output(label,
+    text)`` receives command output, ``on_event(event)`` the parsed progress
+    events and ``on_stage(name)`` stage changes; all are called from worker
+    threads.
+    """
+
+    def __init__(self, plan, jobs=PIPELINE_BUILD_JOBS, on_output=None, on_event=None, on_stage=None):
+        self.plan = plan
+        self.jobs = max(1, jobs)
+        self.on_output = on_output
+        self.on_event = on_event
+        self.on_stage = on_stage
+        self.cancelled = threading.Event()
+        self.processes = set()
+        self.lock = threading.Lock()
+        self.timings = {}
+        self.stages = []
+        self.failed = {}
+
+    def cancel(self):
+        self.cancelled.set()
+        with self.lock:
+            processes = list(self.processes)
+        for process in processes:
+            process.terminate()
+
+    def run(self):
+        """Run all stages; returns the report dict (see report()). Raises RuntimeError on failure."""
+        started = time.monotonic()
+        repo_apps = [package["name"] for package in self.plan["repo_packages"] if not package["dependency"]]
+        dependencies = list(self.plan["dependencies"])
+        builds, via_paru = split_aur_builds(self.plan["aur_packages"])
+
+        self.start_stage("download and build")
+        stage_started = time.monotonic()
+        dependencies_ready = threading.Event()
+        build_env = self.build_environment()
+        AUR_PACKAGE_DIR.mkdir(parents=True, exist_ok=True)
+
+        with ThreadPoolExecutor(max_workers=PIPELINE_CLONE_JOBS, thread_name_prefix="aur-clone") as clone_pool, \
+                ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="aur-build") as build_pool:
+            clones = {base: clone_pool.submit(self.clone, base) for base in builds}
+            build_futures = {
+                base: build_pool.submit(self.build, base, names, clones[base], dependencies_ready, build_env)
+                for base, names in builds.items()
+            }
+            try:
+                if dependencies:
+                    self.run_command("dependencies", [*PACMAN_COMMAND, "-S", "--asdeps", *dependencies])
+                dependencies_ready.set()
+                if repo_apps:
+                    self.run_command("download", [*PACMAN_COMMAND, "-Sw", *repo_apps])
+            except RuntimeError:
+                # Stop the builds (and any still waiting for their dependencies) before failing.
+                self.cancel()
+                dependencies_ready.set()
+                raise
+            built_files = []
+            built_names = []
+            for base, future in build_futures.items():
+                try:
+                    built_files.extend(future.result())
+                    built_names.extend(builds[base])
+                except RuntimeError as e:
+                    for name in builds[base]:
+                        self.failed[name] = str(e)
+        self.finish_stage("download and build", stage_started)
+        self.check_cancelled()
+
+        self.start_stage("install")
+        stage_started = time.monotonic()
+        steps = [
+            ("install", [*PACMAN_COMMAND, "-S", *repo_apps], repo_apps),
+            ("install", [*PACMAN_COMMAND, "-U", *built_files], built_names),
+            ("paru", [*PARU_COMMAND, *via_paru], via_paru),
+        ]
+        for label, command, names in steps:
+            if not names:
+                continue
+            try:
+                self.run_command(label, command)
+            except RuntimeError as e:
+                self.check_cancelled()
+                for name in names:
+                    self.failed[name] = str(e)
+        self.finish_stage("install", stage_started)
+
+        return self.report(time.monotonic() - started)
+
+    def start_stage(self, name):
+        if self.on_stage is not None:
+            self.on_stage(name)
+
+    def finish_stage(self, name, started):
+        self.stages.append({"name": name, "seconds": time.monotonic() - started})
+
+    def check_cancelled(self):
+        if self.cancelled.is_set():
+            raise RuntimeError("Installation cancelled")
+
+    def run_command(self, label, command, env=None, cwd=None):
+        """Run ``command`` in a pty, feeding output and progress to the callbacks; raises on failure."""
+        self.check_cancelled()
+        scrollback = ScrollbackBuffer(64 * 1024)
+        timer = PhaseTimer(self.timings, self.lock)
+
+        def on_output(text):
+            if self.on_output is not None:
+                self.on_output(label, text)
+
+        def on_event(event):
+            timer.record(event)
+            if self.on_event is not None:
+                self.on_event(event)
+
+        def on_start(process):
+            with self.lock:
+                self.processes.add(process)
+            if self.cancelled.is_set():
+                process.terminate()
+
+        try:
+            exit_code = run_in_pty(command, on_output, on_event, scrollback, env=env, cwd=cwd, on_start=on_start)
+        except OSError as e:
+            raise RuntimeError(f"Could not start {command[0]}: {e}")
+        finally:
+            timer.close()
+            with self.lock:
+                self.processes = {process for process in self.processes if process.master_fd is not None}
+        self.check_cancelled()
+        if exit_code != 0:
+            tail = "\n".join(scrollback.tail_lines(10))
+            raise RuntimeError(f"{' '.join(command[:3])} ... failed with exit code {exit_code}\n{tail}")
+
+    def build_environment(self):
+        env = dict(os.environ)
+        env["PKGDEST"] = str(AUR_PACKAGE_DIR)
+        if "MAKEFLAGS" not in env:
+            env["MAKEFLAGS"] = f"-j{max(1, (os.cpu_count() or 1) // self.jobs)}"
+        return env
+
+    def clone(self, base):
+        """Clone (or fast-forward) the AUR git repo of ``base``; returns its directory."""
+        self.check_cancelled()
+        directory = AUR_BUILD_DIR.joinpath(base)
+        if directory.joinpath(".git").is_dir():
+            command = ["git", "-C", str(directory), "pull", "--ff-only", "--quiet"]
+        else:
+            command = ["git", "clone", "--depth", "1", "--quiet", AUR_GIT_URL.format(base), str(directory)]
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Could not fetch {base} from the AUR: {result.stdout.strip()}")
+        return directory
+
+    def build(self, base, names, clone_future, dependencies_ready, env):
+        """Build one package base with makepkg; returns the package files for ``names``."""
+        directory = clone_future.result()
+        dependencies_ready.wait()
+        started = time.monotonic()
+        self.run_command(base, ["makepkg", "--noconfirm", "--force", "--cleanbuild", "--nocheck"],
+                         env=env, cwd=str(directory))
+        elapsed = time.monotonic() - started
+        with self.lock:
+            for name in names:
+                self.timings.setdefault(name, {})["build"] = elapsed
+
+        result = subprocess.run(["makepkg", "--packagelist"], cwd=str(directory), env=env,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        files = []
+        for path in result.stdout.splitlines():
+            match = PACKAGE_FILE_PATTERN.match(PACKAGE_SUFFIX_PATTERN.sub("", os.path.basename(path)))
+            if match and match.group("name") in names and os.path.exists(path):
+                files.append(path)
+        if not files:
+            raise RuntimeError(f"makepkg did not produce a package for {', '.join(names)}")
+        return files
+
+    def report(self, elapsed):
+        """{"elapsed", "stages": [{"name", "seconds"}], "packages": {name: {phase: seconds}}, "failed": {name: error}}"""
+        return {
+            "elapsed": elapsed,
+            "stages": self.stages,
+            "packages": self.timings,
+            "failed": self.failed,
+        }
+
+
+def run_install_pipeline(plan, jobs=PIPELINE_BUILD_JOBS, on_output=None, on_event=None, on_stage=None):
+    return InstallPipeline(plan, jobs, on_output, on_event, on_stage).run()
+
+
+def describe_timings(report):
+    """Human readable stage three summary of an InstallPipeline report."""
+    lines = [f"Finished in {report['elapsed']:.0f} s"]
+    for stage in report["stages"]:
+        lines.append(f"  {stage['name']}: {stage['seconds']:.0f} s")
+    if report["packages"]:
+        lines.append("Per package:")
+        slowest = sorted(report["packages"].items(), key=lambda item: -sum(item[1].values()))
+        for name, phases in slowest:
+            detail = ", ".join(f"{phase} {seconds:.1f} s" for phase, seconds in sorted(phases.items()))
+            lines.append(f"  {name}: {detail}")
+    if report["failed"]:
+        lines.append("Failed:")
+        for name, error in report["failed"].items():
+            lines.append(f"  {name}: {strip_ansi(error).splitlines()[0]}")
+    return "\n".join(lines)
@@ -1,11 +1,14 @@
 import os
-import secrets
 import shutil
 import subprocess
 import tempfile
+import threading
 import time
 from pathlib import Path
 
+from programs.pacman_db import LocalDatabase
+from programs.sync_db import get_sync_index
+
 # Filesystem types that are backed by the network (fstab "type" field).
 NETWORK_FS_TYPES = {
     "cifs", "cifs4", "smbfs", "smb", "nfs", "nfs4", "nfsv4", "nfsd",
@@ -22,32 +25,42 @@ def detect_install_method(app_name):
     Decide how the app should be installed.
     Returns: "pacman", "paru" or None
     """
+    return detect_install_methods([app_name]).get(app_name)
 
-    # Check official repos
-    try:
-        subprocess.run(
-            ["pacman", "-Si", app_name],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            check=True
-        )
-        return "pacman"
-    except subprocess.CalledProcessError:
-        pass
 
-    # Check AUR via paru
-    if command_exists("paru"):
-        try:
-            subprocess.run(
-                ["paru", "-Si", app_name],
+def detect_install_methods(app_names):
+    """
+    Batched detect_install_method: returns {name: "pacman" | "paru" | None}.
+    Repo packages are answered from the sync database index, everything else
+    with a single AUR RPC round trip.
+    """
+    methods = {}
+    aur_candidates = []
+
+    # Check official repos, answered from the sync database index when available
+    sync_index = get_sync_index()
+    for app_name in app_names:
+        if sync_index.is_available():
+            in_repo = app_name in sync_index
+        else:
+            in_repo = subprocess.run(
+                ["pacman", "-Si", app_name],
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL,
-                check=True
-            )
-            return "paru"
-        except subprocess.CalledProcessError:
-            pass
-    return None
+            ).returncode == 0
+        if in_repo:
+            methods[app_name] = "pacman"
+        else:
+            aur_candidates.append(app_name)
+
+    # Check AUR via the RPC (falls back to paru -Si when the AUR is unreachable)
+    if aur_candidates:
+        # Imported here: urllib/ssl dominate the import time of this module.
+        from programs.aur_rpc import get_aur_client
+        aur_info = get_aur_client().info(aur_candidates)
+        for app_name in aur_candidates:
+            methods[app_name] = "paru" if aur_info.get(app_name) else None
+    return methods
 
 
 def get_install_method_from_source(source):
@@ -61,73 +74,191 @@ def get_install_method_from_source(source):
     return None
 
 
-def detect_installed_method(app_name):
-    """Best-effort detection of how an installed app should be removed."""
-    try:
-        subprocess.run(
-            ["pacman", "-Qm", app_name],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            check=True
+class InstalledPackageIndex:
+    """
+    Snapshot of every installed package, built in one pass.
+
+    Maps package name -> {"version", "reason", "foreign"} where reason is
+    "explicit" or "dependency" and foreign is True for packages that did not
+    come from a sync repository (AUR/local builds). Names listed in a
+    package's provides are resolved to that package as well.
+
+    The snapshot is rebuilt only when pacman's local database directory
+    changes, so repeated lookups never fork pacman.
+    """
+
+    def __init__(self, local_db_path=None):
+        self.local_db = LocalDatabase(local_db_path)
+        self.packages = {}
+        self.provides = {}
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        with self._lock:
+            stamp = self.local_db.stamp() or "missing"
+            if force or self._stamp is None or stamp != self._stamp:
+                self._build(force)
+                self._stamp = stamp
+        return self
+
+    def _build(self, force=False):
+        if self.local_db.exists():
+            packages, provides = self._read_local_db(force)
+        else:
+            packages, provides = self._read_pacman_query()
+
+        foreign = self._read_foreign_names(packages)
+        for name, package in packages.items():
+            package["foreign"] = name in foreign
+
+        self.packages = packages
+        self.provides = provides
+
+    def _read_local_db(self, force=False):
+        # Package directories seen on an earlier scan keep their parsed fields,
+        # so only newly installed/upgraded packages have their desc file read.
+        self.local_db.scan(force=force)
+        packages = {}
+        provides = {}
+        for name, local_package in self.local_db.packages().items():
+            # One pass over the desc file for both fields read below.
+            local_package.fields("REASON", "PROVIDES")
+            packages[name] = {
+                "version": local_package.version,
+                "reason": local_package.reason,
+                "foreign": False,
+            }
+            for provided in local_package.provides:
+                provides.setdefault(provided, name)
+        return packages, provides
+
+    @staticmethod
+    def _read_pacman_query():
+        packages = {}
+        for line in _run_query(["pacman", "-Q"]):
+            parts = line.split()
+            if len(parts) >= 2:
+                packages[parts[0]] = {"version": parts[1], "reason": "dependency", "foreign": False}
+        for name in _run_query(["pacman", "-Qeq"]):
+            if name in packages:
+                packages[name]["reason"] = "explicit"
+        return packages, {}
+
+    @staticmethod
+    def _read_foreign_names(packages):
+        # Foreign means "not in any sync repository", same as pacman -Qm.
+        sync_index = get_sync_index()
+        if sync_index.is_available():
+            return {name for name in packages if name not in sync_index}
+        return set(_run_query(["pacman", "-Qmq"]))
+
+    def get(self, app_name):
+        package = self.packages.get(app_name)
+        if package is None:
+            provider = self.provides.get(app_name)
+            if provider is not None:
+                package = self.packages.get(provider)
+        return package
+
+    def is_installed(self, app_name):
+        return self.get(app_name) is not None
+
+    def explicit_names(self, foreign=None):
+        return sorted(
+            name for name, package in self.packages.items()
+            if package["reason"] == "explicit" and (foreign is None or package["foreign"] == foreign)
         )
-        return "paru" if command_exists("paru") else "pacman"
-    except subprocess.CalledProcessError:
-        pass
 
+
+def _run_query(cmd):
     try:
-        subprocess.run(
-            ["pacman", "-Q", app_name],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            check=True
-        )
-        return "pacman"
-    except subprocess.CalledProcessError:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
+        return result.stdout.splitlines()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return []
+
+
+installed_package_index = InstalledPackageIndex()
+
+
+def get_installed_index(force=False):
+    return installed_package_index.refresh(force=force)
+
+
+def detect_installed_method(app_name):
+    """Best-effort detection of how an installed app should be removed."""
+    package = get_installed_index().get(app_name)
+    if package is None:
         return None
+    if package["foreign"]:
+        return "paru" if command_exists("paru") else "pacman"
+    return "pacman"
 
 
 def list_all_installed_apps():
-    app_list = []
-    app_list.extend(list_apps("pacman"))
-    app_list.extend(list_apps("paru"))
-    app_list.sort()
-    return app_list
+    return get_installed_index().explicit_names()
+
+
+def describe_packages(app_names):
+    """
+    Return one row dict per name with "name", "version", "size", "repo" and
+    "description" for the package lists. Installed packages are described
+    from the local database, others from the sync index and, for names no
+    repository carries, one batched AUR RPC lookup.
+    """
+    installed_index = get_installed_index()
+    sync_index = get_sync_index()
+    rows = []
+    aur_rows = []
+    for app_name in app_names:
+        row = {"name": app_name, "version": "", "size": None, "repo": "", "description": ""}
+        installed = installed_index.get(app_name)
+        local_package = installed_index.local_db.get(app_name) if installed is not None else None
+        sync_package = sync_index.get(app_name) if sync_index.is_available() else None
+        if installed is not None:
+            row["version"] = installed["version"]
+            if local_package is not None:
+                row["size"] = local_package.size
+                row["description"] = local_package.description
+            if sync_package is not None:
+                row["repo"] = sync_package["repo"]
+            elif installed["foreign"]:
+                row["repo"] = "AUR"
+        elif sync_package is not None:
+            row["version"] = sync_package["version"]
+            row["size"] = sync_package["install_size"]
+            row["repo"] = sync_package["repo"]
+            row["description"] = sync_package["description"]
+        else:
+            aur_rows.append(row)
+        rows.append(row)
+
+    if aur_rows:
+        from programs.aur_rpc import get_aur_client
+        aur_info = get_aur_client().info([row["name"] for row in aur_rows])
+        for row in aur_rows:
+            info = aur_info.get(row["name"])
+            if info:
+                row["repo"] = "AUR"
+                row["version"] = info.get("Version") or ""
+                row["description"] = info.get("Description") or ""
+    return rows
 
 
 def list_apps(method: str):
     if method == "pacman":
-        cmd = ["pacman", "-Qenq"]
-    elif method == "paru":
+        return get_installed_index().explicit_names(foreign=False)
+    if method == "paru":
         if not command_exists("paru"):
             return []
-        cmd = ["paru", "-Qemq"]
-    else:
-        return []
-    try:
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
-        applist = result.stdout.splitlines()
-        return applist
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return []
+        return get_installed_index().explicit_names(foreign=True)
+    return []
 
 
 def is_app_installed(app_name):
-    """Check if an app is installed using pacman or paru."""
-    try:
-        subprocess.run(["pacman", "-Q", app_name],
-                       stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
-        return True
-    except subprocess.CalledProcessError:
-        pass
-
-    if command_exists("paru"):
-        try:
-            subprocess.run(["paru", "-Q", app_name],
-                           stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
-            return True
-        except subprocess.CalledProcessError:
-            pass
-    return False
+    """Check if an app is installed, answered from the installed package index."""
+    return get_installed_index().is_installed(app_name)
 
 
 def install_paru():
@@ -222,24 +353,37 @@ def open_terminal(command):
     raise RuntimeError("No supported terminal emulator found")
 
 
-def app_install(apps, command: str):
+def install_command(apps, command: str):
+    """Return the argv that installs ``apps`` (a name or a list) with "pacman" or "paru", or None."""
+    apps = apps if isinstance(apps, list) else [apps]
     if command == "paru":
-        install_command= ["paru", "-S", "--skipreview", "--needed", "--quiet", "--color", "always"]
-        return apps_helper(apps, install_command)
+        return ["paru", "-S", "--skipreview", "--needed", "--quiet", "--color", "always", *apps]
     elif command == "pacman":
-        install_command = ["sudo", "pacman", "-S", "--needed", "--quiet", "--color", "always"]
-        return apps_helper(apps, install_command)
+        return ["sudo", "pacman", "-S", "--needed", "--quiet", "--color", "always", *apps]
     return None
 
-def remove_apps(apps, command: str):
-    remove_command = []
+
+def remove_command(apps, command: str):
+    """Return the argv that removes ``apps`` (a name or a list) with "pacman" or "paru"."""
+    apps = apps if isinstance(apps, list) else [apps]
+    command_prefix = []
     if command == "paru":
-        remove_command.append("paru")
+        command_prefix.append("paru")
     elif command == "pacman":
-        remove_command.append("sudo")
-        remove_command.append("pacman")
-    remove_command.extend(["-Rns", "--color", "always"])
-    return apps_helper(apps, remove_command)
+        command_prefix.append("sudo")
+        command_prefix.append("pacman")
+    return [*command_prefix, "-Rns", "--color", "always", *apps]
+
+
+def app_install(apps, command: str):
+    command_prefix = install_command([], command)
+    if command_prefix is None:
+        return None
+    return apps_helper(apps, command_prefix)
+
+
+def remove_apps(apps, command: str):
+    return apps_helper(apps, remove_command([], command))
 
 
 def apps_helper(apps, command):
@@ -254,7 +398,9 @@ def apps_helper(apps, command):
 
 
 def add_samba_drive(share_path, mount_point, username, password):
-    """Add a Samba network drive to fstab and create .smbcredentials."""
+    """Add a Samba network drive to fstab (replacing an older entry for the mount point) and create .smbcredentials."""
+    from programs.network_drives import apply_drives, normalize_drive, plan_drives
+
     cred_file = generate_unique_cred_path()
 
     # Create credentials file
@@ -266,21 +412,21 @@ def add_samba_drive(share_path, mount_point, username, password):
         print(f"Failed to write credentials: {e}")
         return False
 
-    # Run the setup script with sudo
+    # Same privileged fstab edit as bin/drives.yaml, for a single share
     try:
-        script_path = Path(__file__).parent.parent / "scripts" / "setup_samba.sh"
-        subprocess.run(
-            ["pkexec", str(script_path), mount_point, share_path, str(cred_file)],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=True,
-        )
-    except subprocess.CalledProcessError as e:
+        drive = normalize_drive({
+            "mount_point": mount_point,
+            "device": f"//{share_path.lstrip('/')}",
+            "type": "cifs",
+            "credentials": str(cred_file),
+            "options": ["users"],
+        })
+        result = apply_drives(plan_drives([drive]))
+    except (RuntimeError, OSError) as e:
         print(f"Failed to setup Samba drive: {e}")
         return False
 
-    return True
+    return not result["failed"]
 
 
 def generate_unique_cred_path(root_dir=None, max_attempts=100):
@@ -288,6 +434,8 @@ def generate_unique_cred_path(root_dir=None, max_attempts=100):
     Create a unique random subdirectory under root_dir and return its
     .smbcredentials file path.
     """
+    import secrets
+
     if root_dir is None:
         root_dir = Path.home().joinpath(".config", "arch-mysetup", "credentials")
     root_path = Path(root_dir)
@@ -382,35 +530,10 @@ def get_mount_size(mount_point):
     Returns ``(mounted, size_text)`` where ``mounted`` is True when the path is an
     active mount point and ``size_text`` is a human-readable usage string such as
     "12G / 50G (24%)". When the path is not mounted, returns
-    ``(False, "Not mounted")``.
-
-    Subprocess calls are guarded with timeouts so a stale/unresponsive mount never
-    blocks the UI; a missing tool or failure simply falls back to "Mounted".
+    ``(False, "Not mounted")``; a mount that does not answer within
+    mount_probe.PROBE_TIMEOUT gives ``(True, "Unresponsive")``.
     """
-    path = str(mount_point)
-    try:
-        if not os.path.ismount(path):
-            return False, "Not mounted"
-    except (OSError, ValueError):
-        return False, "Not mounted"
+    from programs.mount_probe import STATUS_NOT_MOUNTED, get_mount_probe
 
-    try:
-        result = subprocess.run(
-            ["df", "-h", path],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.DEVNULL,
-            text=True,
-            timeout=10,
-        )
-        lines = result.stdout.splitlines()
-        if len(lines) >= 2:
-            parts = lines[1].split()
-            # Filesystem  Size  Used  Avail  Use%  Mounted on
-            if len(parts) >= 6:
-                size = parts[1]
-                used = parts[2]
-                use_pct = parts[4]
-                return True, f"{used} / {size} ({use_pct})"
-        return True, "Mounted"
-    except (subprocess.SubprocessError, OSError):
-        return True, "Mounted"
+    status, size_text = get_mount_probe().probe([str(mount_point)])[str(mount_point)]
+    return status != STATUS_NOT_MOUNTED, size_text
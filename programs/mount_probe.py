@@ -0,0 +1,116 @@
+import os
+import queue
+import threading
+import time
+
+from programs.mount_table import get_mount_table
+
+# Seconds a statvfs may take before its mount is reported unresponsive.
+PROBE_TIMEOUT = 2.0
+
+STATUS_MOUNTED = "mounted"
+STATUS_NOT_MOUNTED = "not mounted"
+STATUS_UNRESPONSIVE = "unresponsive"
+
+
+def human_size(size):
+    """Bytes in the style of ``df -h``: 1024 based, one decimal below 10, e.g. "9.8G" or "50G"."""
+    value = float(size)
+    for suffix in ("", "K", "M", "G", "T", "P"):
+        if value < 1024 or suffix == "P":
+            break
+        value /= 1024
+    if not suffix:
+        return f"{int(value)}"
+    return f"{value:.1f}{suffix}" if value < 10 else f"{value:.0f}{suffix}"
+
+
+def format_usage(stats):
+    """"used / size (use%)" from an os.statvfs result, with df's use% (used of used + available)."""
+    size = stats.f_blocks * stats.f_frsize
+    used = (stats.f_blocks - stats.f_bfree) * stats.f_frsize
+    available = stats.f_bavail * stats.f_frsize
+    percent = -(-used * 100 // (used + available)) if used + available else 0
+    return f"{human_size(used)} / {human_size(size)} ({percent}%)"
+
+
+class MountProbe:
+    """
+    Usage of mount points without ever blocking the caller for long.
+
+    Mounted state comes from the shared MountTable. Each mounted path gets
+    os.statvfs() on its own daemon thread; whatever has not answered by the
+    deadline is reported unresponsive. A thread stuck on a hung server is
+    left behind (a blocked statvfs cannot be interrupted) and the same
+    mount is not probed again until that thread returns, so repeated
+    refreshes never pile up threads on one dead share.
+    """
+
+    def __init__(self, timeout=PROBE_TIMEOUT):
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.stuck = set()
+
+    def probe(self, mount_points, on_result=None, timeout=None):
+        """
+        Probe all ``mount_points`` at once; ``on_result(mount_point, status,
+        size_text)`` is called (on the calling thread) as each resolves.
+        Returns {mount_point: (status, size_text)} after at most ``timeout`` s.
+        """
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        mount_table = get_mount_table()
+        results = {}
+        answers = queue.Queue()
+        waiting = set()
+
+        def report(mount_point, status, size_text):
+            results[mount_point] = (status, size_text)
+            if on_result is not None:
+                on_result(mount_point, status, size_text)
+
+        for mount_point in dict.fromkeys(mount_points):
+            if not mount_table.is_mounted(mount_point):
+                report(mount_point, STATUS_NOT_MOUNTED, "Not mounted")
+                continue
+            with self.lock:
+                if mount_point in self.stuck:
+                    report(mount_point, STATUS_UNRESPONSIVE, "Unresponsive")
+                    continue
+                self.stuck.add(mount_point)
+            waiting.add(mount_point)
+            threading.Thread(target=self.stat, args=(mount_point, answers), daemon=True,
+                             name=f"statvfs {mount_point}").start()
+
+        while waiting:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                mount_point, size_text = answers.get(timeout=remaining)
+            except queue.Empty:
+                break
+            waiting.discard(mount_point)
+            report(mount_point, STATUS_MOUNTED, size_text)
+        for mount_point in waiting:
+            report(mount_point, STATUS_UNRESPONSIVE, "Unresponsive")
+        return results
+
+    def stat(self, mount_point, answers):
+        try:
+            size_text = format_usage(os.statvfs(mount_point))
+        except OSError:
+            size_text = "Mounted"
+        finally:
+            with self.lock:
+                self.stuck.discard(mount_point)
+        answers.put((mount_point, size_text))
+
+
+_mount_probe = None
+
+
+def get_mount_probe():
+    global _mount_probe
+    if _mount_probe is None:
+        _mount_probe = MountProbe()
+    return _mount_probe
@@ -0,0 +1,233 @@
+import os
+import re
+import select
+import threading
+from pathlib import Path
+
+from programs.installer_logic import parse_fstab_network_drives
+
+MOUNTINFO_PATH = Path("/proc/self/mountinfo")
+FSTAB_PATH = Path("/etc/fstab")
+
+OCTAL_ESCAPE_PATTERN = re.compile(r"\\([0-7]{3})")
+
+
+def unescape_mount_field(field):
+    """mountinfo writes space, tab, newline and backslash in paths as \\040, \\011, \\012 and \\134."""
+    return OCTAL_ESCAPE_PATTERN.sub(lambda match: chr(int(match.group(1), 8)), field)
+
+
+def parse_mountinfo(text):
+    """
+    One dict per mountinfo line: {"mount_id", "parent_id", "device_number",
+    "root", "mount_point", "options", "fs_type", "source", "super_options"}.
+    """
+    mounts = []
+    for line in text.splitlines():
+        # "36 35 98:0 /mnt1 /mnt/parent rw,noatime master:1 - ext3 /dev/root rw,errors=continue"
+        fields = line.split()
+        if "-" not in fields:
+            continue
+        separator = fields.index("-")
+        if separator < 6 or len(fields) < separator + 3:
+            continue
+        mounts.append({
+            "mount_id": int(fields[0]),
+            "parent_id": int(fields[1]),
+            "device_number": fields[2],
+            "root": unescape_mount_field(fields[3]),
+            "mount_point": unescape_mount_field(fields[4]),
+            "options": fields[5],
+            "fs_type": fields[separator + 1],
+            "source": unescape_mount_field(fields[separator + 2]),
+            "super_options": fields[separator + 3] if len(fields) > separator + 3 else "",
+        })
+    return mounts
+
+
+class MountTable:
+    """
+    The mount table of this process, parsed from /proc/self/mountinfo once.
+
+    The kernel flags the open mountinfo file with POLLPRI/POLLERR whenever
+    something is mounted or unmounted; lookups check that flag with a
+    zero-timeout poll() and re-parse only then, so they cost a dict lookup.
+    ``start()`` adds a thread that blocks on the same poll() and calls the
+    listeners with the new generation, for live updates of mounts made
+    outside the app. fstab network entries are cached until /etc/fstab
+    changes and joined with the table by mount point.
+
+    The autofs placeholder systemd puts at an ``x-systemd.automount`` mount
+    point is not a mount of the share: lookups skip it (touching the path
+    would trigger the automount) and only a real mount stacked on top counts.
+    """
+
+    def __init__(self, mountinfo_path=MOUNTINFO_PATH, fstab_path=FSTAB_PATH):
+        self.mountinfo_path = Path(mountinfo_path)
+        self.fstab_path = Path(fstab_path)
+        self.generation = 0
+        self.mounts = []
+        self.by_mount_point = {}
+        self.by_source = {}
+        self.automount_points = set()
+        self._fd = None
+        self._poller = None
+        self._fstab_stamp = None
+        self._fstab_entries = []
+        self._listeners = []
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.RLock()
+
+    def add_listener(self, callback):
+        """Register ``callback(generation)``; it is called from whichever thread noticed the change."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def refresh(self):
+        """Re-parse if the mount table changed since the last parse; returns True when it did."""
+        with self._lock:
+            if self._fd is None:
+                return self._open()
+            # poll() itself consumes the change flag (for the watcher thread too),
+            # so whoever sees it re-parses and tells the listeners.
+            if not self._poller.poll(0):
+                return False
+            self._parse()
+        self._notify()
+        return True
+
+    def _open(self):
+        try:
+            self._fd = os.open(self.mountinfo_path, os.O_RDONLY | os.O_CLOEXEC)
+        except OSError:
+            return False
+        self._poller = select.poll()
+        self._poller.register(self._fd, select.POLLPRI | select.POLLERR)
+        self._parse()
+        return True
+
+    def _parse(self):
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        chunks = []
+        while True:
+            chunk = os.read(self._fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        mounts = parse_mountinfo(b"".join(chunks).decode("utf-8", errors="replace"))
+        by_mount_point = {}
+        by_source = {}
+        automount_points = set()
+        for mount in mounts:
+            by_source.setdefault(mount["source"], []).append(mount)
+            if mount["fs_type"] == "autofs":
+                automount_points.add(mount["mount_point"])
+                continue
+            # Later lines are stacked on top of earlier ones at the same path.
+            by_mount_point[mount["mount_point"]] = mount
+        self.mounts = mounts
+        self.by_mount_point = by_mount_point
+        self.by_source = by_source
+        self.automount_points = automount_points
+        self.generation += 1
+
+    def mount_at(self, path):
+        """The mount whose mount point is exactly ``path`` (the topmost one, never an autofs placeholder), else None."""
+        self.refresh()
+        # normpath only rewrites the string; realpath would stat a possibly hung path.
+        return self.by_mount_point.get(os.path.normpath(str(path)))
+
+    def is_mounted(self, path):
+        return self.mount_at(path) is not None
+
+    def is_automount(self, path):
+        """True when an autofs trigger sits at ``path`` (mounted on first access, whether or not it is now)."""
+        self.refresh()
+        return os.path.normpath(str(path)) in self.automount_points
+
+    def mounts_of(self, source):
+        """Every mount of a device or share, e.g. "//nas/media" or "/dev/sda1"."""
+        self.refresh()
+        return list(self.by_source.get(source, []))
+
+    def mount_points(self):
+        self.refresh()
+        return set(self.by_mount_point)
+
+    def fstab_network_drives(self):
+        """parse_fstab_network_drives(), read again only when /etc/fstab changed."""
+        try:
+            stat = self.fstab_path.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except OSError:
+            stamp = None
+        with self._lock:
+            if stamp is None or stamp != self._fstab_stamp:
+                self._fstab_entries = parse_fstab_network_drives(self.fstab_path) if stamp else []
+                self._fstab_stamp = stamp
+            return self._fstab_entries
+
+    def network_drives(self):
+        """
+        fstab network entries, each with "mounted", the live "mount" dict
+        (None when not mounted) and "automount" (an autofs trigger is in
+        place). "mount_point" is the real path: fstab writes
+        a space as \\040 like mountinfo does ("raw" keeps the line as written).
+        """
+        drives = []
+        for entry in self.fstab_network_drives():
+            mount_point = unescape_mount_field(entry["mount_point"])
+            mount = self.mount_at(mount_point)
+            drives.append({**entry, "mount_point": mount_point, "mounted": mount is not None, "mount": mount,
+                           "automount": self.is_automount(mount_point)})
+        return drives
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self.refresh()
+        if self._fd is None:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="mount-table-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _watch(self):
+        watcher = select.poll()
+        watcher.register(self._fd, select.POLLPRI | select.POLLERR)
+        while not self._stop.is_set():
+            if not watcher.poll(1000):
+                continue
+            with self._lock:
+                self._parse()
+            self._notify()
+
+    def _notify(self):
+        with self._lock:
+            generation = self.generation
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(generation)
+            except Exception as e:
+                print(f"Mount table listener failed: {e}")
+
+
+mount_table = MountTable()
+
+
+def get_mount_table():
+    return mount_table
@@ -0,0 +1,301 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+import yaml
+
+from programs.config import DRIVES_PATH, FSTAB_PATH, SYSTEMD_UNIT_DIR
+from programs.installer_logic import parse_fstab_network_drives
+from programs.mount_table import get_mount_table, unescape_mount_field
+
+APPLY_DRIVES_SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "apply_drives.sh"
+
+# Manifest "type" -> fstab / mount unit type.
+DRIVE_FS_TYPES = {"cifs": "cifs", "nfs": "nfs", "nfs4": "nfs4", "sshfs": "fuse.sshfs"}
+# Never wait for the network at boot and never fail boot over a missing share.
+REQUIRED_OPTIONS = ("_netdev", "nofail")
+DEFAULT_IDLE_TIMEOUT = 600
+# Written into every generated unit; only units carrying it are ever replaced or removed.
+UNIT_MARKER = "# Managed by arch-mysetup (bin/drives.yaml)"
+
+
+def escape_fstab_field(field):
+    """fstab and mountinfo write space, tab, newline and backslash as \\040, \\011, \\012 and \\134."""
+    return "".join(f"\\{ord(character):03o}" if character in " \t\n\\" else character for character in field)
+
+
+def mount_unit_name(mount_point, suffix=".mount"):
+    """systemd's unit name for ``mount_point`` (``systemd-escape --path``), e.g. /mnt/nas data -> mnt-nas\\x20data.mount."""
+    path = os.path.normpath(mount_point).strip("/")
+    if not path:
+        return "-" + suffix
+    escaped = []
+    for index, byte in enumerate(path.encode("utf-8")):
+        character = chr(byte)
+        if character == "/":
+            escaped.append("-")
+        elif character.isascii() and (character.isalnum() or character in ":_" or (character == "." and index > 0)):
+            escaped.append(character)
+        else:
+            escaped.append(f"\\x{byte:02x}")
+    return "".join(escaped) + suffix
+
+
+def normalize_drive(entry):
+    """
+    One manifest entry as {"mount_point", "device", "fs_type", "options",
+    "automount", "idle_timeout", "absent"} with the fstab type and the full
+    option string. Raises RuntimeError for an incomplete entry.
+    """
+    mount_point = str(entry.get("mount_point") or "")
+    if not mount_point.startswith("/"):
+        raise RuntimeError(f"Drive {entry!r} needs an absolute mount_point")
+    mount_point = os.path.normpath(mount_point)
+    absent = bool(entry.get("absent"))
+    drive_type = str(entry.get("type") or "cifs").lower()
+    if drive_type not in DRIVE_FS_TYPES:
+        raise RuntimeError(f"Drive {mount_point}: unknown type {drive_type!r} ({', '.join(DRIVE_FS_TYPES)})")
+    device = str(entry.get("device") or "")
+    if not device and not absent:
+        raise RuntimeError(f"Drive {mount_point} needs a device")
+
+    options = entry.get("options") or []
+    if isinstance(options, str):
+        options = options.split(",")
+    options = [str(option).strip() for option in options if str(option).strip()]
+    names = {option.split("=", 1)[0] for option in options}
+    if entry.get("credentials") and "credentials" not in names:
+        options.append(f"credentials={os.path.expanduser(entry['credentials'])}")
+    if drive_type == "cifs":
+        # Files on the share belong to whoever set it up, not to root.
+        options += [f"{name}={value}" for name, value in (("uid", os.getuid()), ("gid", os.getgid())) if name not in names]
+    options += [option for option in REQUIRED_OPTIONS if option not in names]
+
+    return {
+        "mount_point": mount_point,
+        "device": device,
+        "fs_type": DRIVE_FS_TYPES[drive_type],
+        "options": ",".join(options),
+        "automount": bool(entry.get("automount")),
+        "idle_timeout": int(entry.get("idle_timeout") or DEFAULT_IDLE_TIMEOUT),
+        "absent": absent,
+    }
+
+
+def load_drives(drives_path=DRIVES_PATH):
+    """Drives declared in bin/drives.yaml; RuntimeError for invalid or duplicate entries."""
+    if not drives_path.exists():
+        return []
+    with open(drives_path, "r", encoding="utf-8") as drives_file:
+        data = yaml.safe_load(drives_file) or []
+
+    drives = {}
+    for entry in data:
+        if not isinstance(entry, dict):
+            continue
+        drive = normalize_drive(entry)
+        if drive["mount_point"] in drives:
+            raise RuntimeError(f"{drive['mount_point']} is declared twice in {drives_path.name}")
+        drives[drive["mount_point"]] = drive
+    return list(drives.values())
+
+
+def fstab_line(drive):
+    return " ".join([
+        escape_fstab_field(drive["device"]),
+        escape_fstab_field(drive["mount_point"]),
+        drive["fs_type"],
+        drive["options"],
+        "0",
+        "0",
+    ])
+
+
+def drive_units(drive):
+    """{unit name: unit file text} for an automounted drive: a .mount and the .automount that triggers it."""
+    mount_point = drive["mount_point"]
+    mount_unit = (
+        f"{UNIT_MARKER}\n"
+        "[Unit]\n"
+        f"Description=Network drive {mount_point}\n"
+        "Wants=network-online.target\n"
+        "After=network-online.target\n"
+        "\n"
+        "[Mount]\n"
+        f"What={drive['device']}\n"
+        f"Where={mount_point}\n"
+        f"Type={drive['fs_type']}\n"
+        f"Options={drive['options']}\n"
+        "TimeoutSec=30\n"
+    )
+    automount_unit = (
+        f"{UNIT_MARKER}\n"
+        "[Unit]\n"
+        f"Description=Automount network drive {mount_point}\n"
+        "\n"
+        "[Automount]\n"
+        f"Where={mount_point}\n"
+        f"TimeoutIdleSec={drive['idle_timeout']}\n"
+        "\n"
+        "[Install]\n"
+        "WantedBy=remote-fs.target\n"
+    )
+    return {
+        mount_unit_name(mount_point): mount_unit,
+        mount_unit_name(mount_point, ".automount"): automount_unit,
+    }
+
+
+def read_managed_units(mount_point, unit_dir=SYSTEMD_UNIT_DIR):
+    """{unit name: text} of the units this app wrote for ``mount_point``."""
+    units = {}
+    for suffix in (".mount", ".automount"):
+        name = mount_unit_name(mount_point, suffix)
+        try:
+            text = (unit_dir / name).read_text(encoding="utf-8")
+        except OSError:
+            continue
+        if UNIT_MARKER in text:
+            units[name] = text
+    return units
+
+
+def plan_drives(drives, fstab_path=FSTAB_PATH, unit_dir=SYSTEMD_UNIT_DIR):
+    """
+    Diff ``drives`` against the network entries of fstab and the generated units.
+
+    Returns {"changes": [...], "unchanged": [mount points]}. A change is
+    {"mount_point", "action" ("add", "update", "remove"), "fstab_line"
+    (None when the drive must not be in fstab), "replace" (current fstab
+    lines of the mount point), "units", "remove_units", "mounted"}.
+    fstab entries of mount points not in ``drives`` are left alone.
+    """
+    current_lines = {}
+    for entry in parse_fstab_network_drives(fstab_path):
+        current_lines.setdefault(os.path.normpath(unescape_mount_field(entry["mount_point"])), []).append(entry["raw"])
+
+    mount_table = get_mount_table()
+    plan = {"changes": [], "unchanged": []}
+    for drive in drives:
+        mount_point = drive["mount_point"]
+        lines = current_lines.get(mount_point, [])
+        units = read_managed_units(mount_point, unit_dir)
+        if drive["absent"]:
+            wanted_line, wanted_units = None, {}
+        elif drive["automount"]:
+            wanted_line, wanted_units = None, drive_units(drive)
+        else:
+            wanted_line, wanted_units = fstab_line(drive), {}
+
+        current = [" ".join(line.split()) for line in lines]
+        if current == ([wanted_line] if wanted_line else []) and units == wanted_units:
+            plan["unchanged"].append(mount_point)
+            continue
+        if drive["absent"]:
+            action = "remove"
+        else:
+            action = "update" if lines or units else "add"
+        plan["changes"].append({
+            "mount_point": mount_point,
+            "action": action,
+            "fstab_line": wanted_line,
+            "replace": lines,
+            "units": {name: text for name, text in wanted_units.items() if units.get(name) != text},
+            "remove_units": sorted(name for name in units if name not in wanted_units),
+            "automount": drive["automount"] and not drive["absent"],
+            "mounted": mount_table.is_mounted(mount_point),
+        })
+    return plan
+
+
+def render_fstab(text, changes):
+    """``text`` with the replaced lines of ``changes`` dropped and their new lines in place of the first one (or appended)."""
+    replaced = {}
+    for change in changes:
+        for line in change["replace"]:
+            replaced[line] = change
+    lines = []
+    written = set()
+    for line in text.splitlines():
+        change = replaced.get(line)
+        if change is None:
+            lines.append(line)
+            continue
+        if change["fstab_line"] and change["mount_point"] not in written:
+            lines.append(change["fstab_line"])
+        written.add(change["mount_point"])
+    for change in changes:
+        if change["fstab_line"] and change["mount_point"] not in written:
+            lines.append(change["fstab_line"])
+    return "\n".join(lines) + "\n"
+
+
+def apply_drives(plan, fstab_path=FSTAB_PATH):
+    """
+    Apply a plan_drives() plan with a single ``pkexec scripts/apply_drives.sh``.
+
+    The new fstab, the unit files and the mount lists are staged in a
+    temporary directory; the script refuses to run when fstab changed since
+    it was read here, replaces it with an atomic rename (keeping
+    /etc/fstab.arch-mysetup.bak), installs the units, and mounts the new
+    shares in parallel. Returns {"mounted": [...], "failed": [...]}.
+    """
+    changes = plan["changes"]
+    result = {"mounted": [], "failed": []}
+    if not changes:
+        return result
+
+    fstab_bytes = fstab_path.read_bytes() if fstab_path.exists() else b""
+    staging = Path(tempfile.mkdtemp(prefix="arch-mysetup-drives-"))
+    try:
+        staging.chmod(0o755)
+        if any(change["replace"] or change["fstab_line"] for change in changes):
+            new_fstab = render_fstab(fstab_bytes.decode("utf-8", errors="surrogateescape"), changes)
+            (staging / "fstab").write_bytes(new_fstab.encode("utf-8", errors="surrogateescape"))
+        unit_staging = staging / "units"
+        unit_staging.mkdir()
+        for change in changes:
+            for name, text in change["units"].items():
+                (unit_staging / name).write_text(text, encoding="utf-8")
+
+        def write_list(name, values):
+            (staging / name).write_text("".join(f"{value}\n" for value in values), encoding="utf-8")
+
+        write_list("remove_units", [name for change in changes for name in change["remove_units"]])
+        # Shares whose definition changed are remounted; removed ones just unmounted.
+        write_list("unmount", [change["mount_point"] for change in changes if change["mounted"]])
+        write_list("mount", [change["mount_point"] for change in changes
+                             if change["action"] != "remove" and not change["automount"]])
+        write_list("automount", [mount_unit_name(change["mount_point"], ".automount") for change in changes
+                                 if change["automount"] and change["units"]])
+
+        completed = subprocess.run(
+            ["pkexec", str(APPLY_DRIVES_SCRIPT), str(staging), hashlib.sha256(fstab_bytes).hexdigest()],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=False,
+        )
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    for line in completed.stdout.splitlines():
+        status, _, mount_point = line.partition(" ")
+        if status in ("mounted", "failed"):
+            result[status].append(mount_point)
+    if completed.returncode != 0 and not (result["mounted"] or result["failed"]):
+        raise RuntimeError(completed.stderr.strip() or completed.stdout.strip() or "Failed to apply network drives")
+    return result
+
+
+def reconcile_drives(mount_points=None):
+    """Bring the drives of bin/drives.yaml (only ``mount_points`` when given) to their declared state."""
+    drives = load_drives()
+    if mount_points is not None:
+        wanted = {os.path.normpath(mount_point) for mount_point in mount_points}
+        drives = [drive for drive in drives if drive["mount_point"] in wanted]
+    plan = plan_drives(drives)
+    return {**plan, **apply_drives(plan)}
@@ -0,0 +1,167 @@
+import bisect
+import re
+import threading
+from collections import OrderedDict
+
+from programs.sync_db import get_sync_index
+
+# Queries remembered per index, so backspacing to an earlier query is a dict hit.
+QUERY_CACHE_SIZE = 64
+
+# Match scores; higher ranks first.
+SCORE_EXACT = 1000
+SCORE_PREFIX = 800
+SCORE_SUBSTRING = 600
+SCORE_FUZZY = 300
+SCORE_DESCRIPTION = 100
+
+
+def trigrams(text):
+    return {text[position:position + 3] for position in range(len(text) - 2)}
+
+
+def fuzzy_pattern(query):
+    """Regex matching ``query`` as an in-order subsequence, e.g. "ffx" -> f.*?f.*?x."""
+    return re.compile(".*?".join(re.escape(char) for char in query))
+
+
+def match_tier(query):
+    """1: name prefix only, 2: names, 3: names and descriptions."""
+    return min(len(query), 3)
+
+
+class PackageSearchIndex:
+    """
+    Search over package names and descriptions for search-as-you-type.
+
+    Names match exactly, by prefix, by substring or fuzzily (query
+    characters in order, e.g. "vsc" finds "visual-studio-code-bin") and
+    rank in that order. A single character only matches name prefixes,
+    answered from a sorted name list. Descriptions are indexed by trigram,
+    so only the few documents holding every trigram of the query are read;
+    queries shorter than three characters match names only.
+
+    Every match for a query also matches each of its prefixes, so a query
+    that extends the previous keystroke only re-checks the previous
+    matches. Building is pure Python; do it off the UI thread.
+    """
+
+    def __init__(self, packages=()):
+        self.names = []
+        self.lower_names = []
+        self.descriptions = []
+        self.sorted_names = []
+        self.description_trigrams = {}
+        self._last_query = None
+        self._last_matches = None
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        for package in packages:
+            self._add(package)
+        self.sorted_names = sorted((lower_name, doc_id) for doc_id, lower_name in enumerate(self.lower_names))
+
+    def _add(self, package):
+        doc_id = len(self.names)
+        name = package["name"]
+        lower_name = name.lower()
+        description = (package.get("description") or "").lower()
+        self.names.append(name)
+        self.lower_names.append(lower_name)
+        self.descriptions.append(description)
+        for trigram in trigrams(description):
+            self.description_trigrams.setdefault(trigram, set()).add(doc_id)
+
+    def __len__(self):
+        return len(self.names)
+
+    def prefix_candidates(self, prefix):
+        start = bisect.bisect_left(self.sorted_names, (prefix, -1))
+        ids = []
+        for lower_name, doc_id in self.sorted_names[start:]:
+            if not lower_name.startswith(prefix):
+                break
+            ids.append(doc_id)
+        return ids
+
+    def description_candidates(self, query):
+        """Documents whose description holds every trigram of ``query`` (empty for short queries)."""
+        sets = [self.description_trigrams.get(trigram) for trigram in trigrams(query)]
+        if not sets or any(ids is None for ids in sets):
+            return set()
+        sets.sort(key=len)
+        return set.intersection(*sets)
+
+    def _candidates(self, query):
+        # Typing forward: only what matched the previous query can still match, as long
+        # as both queries are long enough to be matched the same way (see match_tier).
+        last_query = self._last_query
+        if last_query and query.startswith(last_query) and match_tier(last_query) == match_tier(query):
+            return self._last_matches
+        if len(query) == 1:
+            return self.prefix_candidates(query)
+        return range(len(self.names))
+
+    def _score(self, doc_id, query, pattern, description_ids):
+        lower_name = self.lower_names[doc_id]
+        if lower_name == query:
+            return SCORE_EXACT
+        if lower_name.startswith(query):
+            return SCORE_PREFIX - len(lower_name)
+        position = lower_name.find(query)
+        if position >= 0:
+            return SCORE_SUBSTRING - position - len(lower_name)
+        fuzzy = pattern.search(lower_name) if pattern is not None else None
+        if fuzzy is not None:
+            return SCORE_FUZZY - (fuzzy.end() - fuzzy.start() - len(query)) - len(lower_name)
+        if doc_id in description_ids and query in self.descriptions[doc_id]:
+            return SCORE_DESCRIPTION
+        return None
+
+    def search(self, query, limit=None):
+        """Return package names matching ``query``, best first."""
+        query = query.strip().lower()
+        if not query:
+            return list(self.names[:limit] if limit else self.names)
+
+        with self._lock:
+            ranked = self._cache.get(query)
+            if ranked is None:
+                pattern = fuzzy_pattern(query) if len(query) > 1 else None
+                description_ids = self.description_candidates(query)
+                scored = []
+                for doc_id in self._candidates(query):
+                    score = self._score(doc_id, query, pattern, description_ids)
+                    if score is not None:
+                        scored.append((-score, self.lower_names[doc_id], doc_id))
+                scored.sort()
+                ranked = [doc_id for _, _, doc_id in scored]
+                self._cache[query] = ranked
+                if len(self._cache) > QUERY_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+            else:
+                self._cache.move_to_end(query)
+            self._last_query = query
+            self._last_matches = ranked
+
+        if limit:
+            ranked = ranked[:limit]
+        return [self.names[doc_id] for doc_id in ranked]
+
+
+def build_search_index(packages):
+    """
+    Build a PackageSearchIndex from row dicts or plain names. Names without
+    a description are described from the sync database index.
+    """
+    sync_index = None
+    rows = []
+    for package in packages:
+        row = {"name": package} if isinstance(package, str) else dict(package)
+        if not row.get("description"):
+            if sync_index is None:
+                sync_index = get_sync_index()
+            sync_package = sync_index.get(row["name"]) if sync_index.is_available() else None
+            if sync_package is not None:
+                row["description"] = sync_package["description"]
+        rows.append(row)
+    return PackageSearchIndex(rows)
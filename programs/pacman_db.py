@@ -0,0 +1,240 @@
+import os
+import threading
+from pathlib import Path
+
+from programs.config import PACMAN_LOCAL_DB_PATH
+
+# Attribute name -> %FIELD% header used in pacman's local desc files.
+LOCAL_DESC_FIELDS = {
+    "name": "NAME",
+    "version": "VERSION",
+    "description": "DESC",
+    "install_date": "INSTALLDATE",
+    "size": "SIZE",
+    "reason": "REASON",
+    "validation": "VALIDATION",
+    "provides": "PROVIDES",
+    "depends": "DEPENDS",
+}
+
+
+def split_package_dir_name(dir_name):
+    """
+    Split a local db directory name ("name-pkgver-pkgrel") into (name, version).
+    Returns (None, None) when the name does not follow that layout.
+    """
+    parts = dir_name.rsplit("-", 2)
+    if len(parts) != 3 or not all(parts):
+        return None, None
+    return parts[0], f"{parts[1]}-{parts[2]}"
+
+
+def strip_version_constraint(dependency):
+    """Return the bare package name of a dependency such as "sh=5" or "python>=3.11"."""
+    for separator in ("<=", ">=", "=", "<", ">", ":"):
+        if separator in dependency:
+            dependency = dependency.split(separator, 1)[0]
+    return dependency.strip()
+
+
+def read_desc_fields(desc_path, wanted=None):
+    """
+    Parse a pacman desc file into {FIELD: [values...]}.
+
+    When ``wanted`` is given only those fields are collected and reading stops
+    as soon as all of them were seen.
+    """
+    fields = {}
+    remaining = set(wanted) if wanted is not None else None
+    current = None
+    with open(desc_path, "r", encoding="utf-8", errors="replace") as desc_file:
+        for raw_line in desc_file:
+            line = raw_line.rstrip("\n")
+            if line.startswith("%") and line.endswith("%") and len(line) > 2:
+                if remaining is not None and not remaining:
+                    break
+                header = line[1:-1]
+                if remaining is None or header in remaining:
+                    current = fields.setdefault(header, [])
+                    if remaining is not None:
+                        remaining.discard(header)
+                else:
+                    current = None
+            elif line and current is not None:
+                current.append(line)
+            else:
+                current = None
+    return fields
+
+
+class LocalPackage:
+    """
+    One package directory of pacman's local database.
+
+    Name and version come from the directory name, so they never touch the
+    disk. Every other field is read from the desc file the first time it is
+    requested and cached afterwards; ``desc_stamp`` records which version of
+    the desc file that cache came from.
+    """
+
+    def __init__(self, package_dir):
+        self.package_dir = Path(package_dir)
+        self.name, self.version = split_package_dir_name(self.package_dir.name)
+        self.desc_stamp = None
+        self._fields = {}
+        self._lock = threading.Lock()
+
+    def read_desc_stamp(self):
+        try:
+            stat = self.package_dir.joinpath("desc").stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def is_stale(self):
+        """True when fields were cached from a desc file that has been rewritten since (pacman -D)."""
+        return bool(self._fields) and self.read_desc_stamp() != self.desc_stamp
+
+    def fields(self, *headers):
+        """Return {FIELD: [values...]} for the requested headers, parsing only what is missing."""
+        with self._lock:
+            missing = [header for header in headers if header not in self._fields]
+            if missing:
+                if not self._fields:
+                    self.desc_stamp = self.read_desc_stamp()
+                try:
+                    parsed = read_desc_fields(self.package_dir.joinpath("desc"), missing)
+                except OSError:
+                    parsed = {}
+                for header in missing:
+                    self._fields[header] = parsed.get(header, [])
+            return {header: self._fields[header] for header in headers}
+
+    def field(self, header):
+        return self.fields(header)[header]
+
+    def _first(self, header, default=None):
+        values = self.field(header)
+        return values[0] if values else default
+
+    @property
+    def description(self):
+        return self._first("DESC", "")
+
+    @property
+    def reason(self):
+        # pacman omits %REASON% for explicit installs; 1 means "installed as a dependency".
+        return "dependency" if self._first("REASON", "0") == "1" else "explicit"
+
+    @property
+    def install_date(self):
+        value = self._first("INSTALLDATE")
+        return int(value) if value and value.isdigit() else None
+
+    @property
+    def size(self):
+        value = self._first("SIZE")
+        return int(value) if value and value.isdigit() else None
+
+    @property
+    def validation(self):
+        return list(self.field("VALIDATION"))
+
+    @property
+    def provides(self):
+        return [strip_version_constraint(provided) for provided in self.field("PROVIDES")]
+
+    @property
+    def depends(self):
+        return [strip_version_constraint(dependency) for dependency in self.field("DEPENDS")]
+
+    def to_dict(self, attributes=("name", "version")):
+        headers = [LOCAL_DESC_FIELDS[attribute] for attribute in attributes
+                   if attribute not in ("name", "version")]
+        if headers:
+            self.fields(*headers)
+        return {attribute: getattr(self, attribute) for attribute in attributes}
+
+
+class LocalDatabase:
+    """
+    Pure-Python reader for pacman's local database (``/var/lib/pacman/local``).
+
+    ``scan()`` lists the package directories; directories seen on a previous
+    scan keep their already-parsed fields, so after an install or upgrade only
+    the new directories are ever opened. ``scan(force=True)`` also drops the
+    fields of packages whose desc file was rewritten in place, which
+    ``pacman -D --asdeps/--asexplicit`` does without touching the directory.
+    Pass another ``root`` to read a fixture tree without pacman present.
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else PACMAN_LOCAL_DB_PATH
+        self._by_dir = {}
+        self._by_name = {}
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def exists(self):
+        return self.root.is_dir()
+
+    def stamp(self):
+        try:
+            return self.root.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def scan(self, force=False):
+        """Pick up added/removed package directories. Returns True when anything changed."""
+        with self._lock:
+            stamp = self.stamp()
+            if not force and stamp is not None and stamp == self._stamp:
+                return False
+
+            try:
+                dir_names = [entry.name for entry in os.scandir(self.root) if entry.is_dir()]
+            except OSError:
+                dir_names = []
+
+            by_dir = {}
+            changed = False
+            for dir_name in dir_names:
+                package = self._by_dir.get(dir_name)
+                if package is not None and force and package.is_stale():
+                    package = None
+                    changed = True
+                if package is None:
+                    package = LocalPackage(self.root.joinpath(dir_name))
+                    if package.name is None:
+                        continue
+                by_dir[dir_name] = package
+
+            changed = changed or by_dir.keys() != self._by_dir.keys()
+            self._by_dir = by_dir
+            self._by_name = {package.name: package for package in by_dir.values()}
+            self._stamp = stamp
+            return changed
+
+    def packages(self):
+        self.scan()
+        return dict(self._by_name)
+
+    def names(self):
+        self.scan()
+        return set(self._by_name)
+
+    def get(self, name):
+        self.scan()
+        return self._by_name.get(name)
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __len__(self):
+        self.scan()
+        return len(self._by_name)
+
+    def query(self, *attributes):
+        """Return one dict per installed package holding only the requested attributes."""
+        attributes = attributes or ("name", "version")
+        return [package.to_dict(attributes) for package in self.packages().values()]
@@ -0,0 +1,170 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import threading
+import time
+
+from programs.config import PACMAN_LOCAL_DB_PATH, PACMAN_SYNC_DB_PATH
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+)
+
+
+def _load_inotify():
+    """Return libc when it exposes inotify, otherwise None."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class PackageStateWatcher:
+    """
+    Watches pacman's local and sync database directories and bumps a
+    generation counter whenever installed or available package state changes.
+
+    Uses inotify through ctypes; when inotify is unavailable (or a directory
+    cannot be watched) it falls back to polling directory/file mtimes. Bursts
+    of events from one pacman transaction are coalesced into a single bump
+    once the directories have been quiet for ``settle`` seconds.
+    """
+
+    def __init__(self, paths=None, poll_interval=2.0, settle=0.5):
+        self.paths = [str(path) for path in (paths or (PACMAN_LOCAL_DB_PATH, PACMAN_SYNC_DB_PATH))]
+        self.poll_interval = poll_interval
+        self.settle = settle
+        self.generation = 0
+        self.backend = None
+        self._listeners = []
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """Register ``callback(generation)``; it is called from the watcher thread."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pacman-state-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+    def bump(self):
+        with self._lock:
+            self.generation += 1
+            generation = self.generation
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(generation)
+            except Exception as e:
+                print(f"Package state listener failed: {e}")
+
+    def _run(self):
+        inotify_fd = self._open_inotify()
+        try:
+            if inotify_fd is not None:
+                self.backend = "inotify"
+                self._watch_inotify(inotify_fd)
+            else:
+                self.backend = "poll"
+                self._watch_polling()
+        finally:
+            if inotify_fd is not None:
+                os.close(inotify_fd)
+
+    def _open_inotify(self):
+        libc = _load_inotify()
+        if libc is None:
+            return None
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        for path in self.paths:
+            if libc.inotify_add_watch(fd, os.fsencode(path), WATCH_MASK) < 0:
+                # A missing or unreadable directory cannot be watched; poll everything instead.
+                os.close(fd)
+                return None
+        return fd
+
+    def _watch_inotify(self, fd):
+        pending = False
+        while not self._stop.is_set():
+            timeout = self.settle if pending else self.poll_interval
+            readable, _, _ = select.select([fd], [], [], timeout)
+            if readable:
+                try:
+                    while os.read(fd, 65536):
+                        pass
+                except BlockingIOError:
+                    pass
+                pending = True
+            elif pending:
+                pending = False
+                self.bump()
+
+    def _stamps(self):
+        stamps = []
+        for path in self.paths:
+            try:
+                stamps.append(os.stat(path).st_mtime_ns)
+                with os.scandir(path) as entries:
+                    stamps.extend(entry.stat().st_mtime_ns for entry in entries if entry.is_file())
+            except OSError:
+                stamps.append(None)
+        return stamps
+
+    def _watch_polling(self):
+        last = self._stamps()
+        while not self._stop.wait(self.poll_interval):
+            current = self._stamps()
+            if current != last:
+                # Wait for the transaction to settle before announcing the change.
+                time.sleep(self.settle)
+                last = self._stamps()
+                self.bump()
+
+
+package_state_watcher = PackageStateWatcher()
+
+
+def get_package_watcher():
+    return package_state_watcher.start()
+
+
+def get_package_state_generation():
+    return package_state_watcher.generation
@@ -0,0 +1,267 @@
+import codecs
+import errno
+import fcntl
+import functools
+import os
+import pty
+import re
+import select
+import signal
+import struct
+import subprocess
+import termios
+from collections import deque
+
+# Scrollback kept per console, in characters; older output is dropped.
+SCROLLBACK_LIMIT = 2 * 1024 * 1024
+READ_CHUNK_SIZE = 65536
+
+ANSI_ESCAPE_PATTERN = re.compile(r"\x1b\[[0-9;?]*[ -/]*[@-~]|\x1b\][^\x07]*\x07|\x1b[()][0-9A-B]")
+
+# "(3/12) installing firefox   [######----]  45%"
+TRANSACTION_PATTERN = re.compile(
+    r"^\((?P<index>\d+)/(?P<total>\d+)\)\s+(?P<action>installing|upgrading|reinstalling|removing|downgrading)"
+    r"\s+(?P<package>\S+?)(?:\.\.\.)?(?:\s+\[[^\]]*\]\s+(?P<percent>\d+)%)?\s*$"
+)
+# " firefox-130.0-1-x86_64   65.2 MiB  10.2 MiB/s 00:06 [#####---]  45%"
+DOWNLOAD_PATTERN = re.compile(
+    r"^\s*(?P<file>\S+?)(?:\.pkg\.tar\.\w+)?\s+[\d.]+\s+\S?i?B\s+.*\[[^\]]*\]\s+(?P<percent>\d+)%\s*$"
+)
+# makepkg, as run by paru: "==> Making package: foo 1.0-1 (...)" / "==> Finished making: foo 1.0-1 (...)"
+BUILD_START_PATTERN = re.compile(r"^==> Making package: (?P<package>\S+)")
+BUILD_DONE_PATTERN = re.compile(r"^==> Finished making: (?P<package>\S+)")
+PACKAGE_FILE_PATTERN = re.compile(r"^(?P<name>.+)-[^-]+-[^-]+-(?:x86_64|any|i686|aarch64|armv7h)$")
+
+TRANSACTION_PHASES = {
+    "installing": "install",
+    "reinstalling": "install",
+    "upgrading": "upgrade",
+    "downgrading": "upgrade",
+    "removing": "remove",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def pty_supported():
+    """True when pseudo-terminals can be opened here (else callers fall back to a terminal emulator)."""
+    try:
+        master_fd, slave_fd = pty.openpty()
+    except OSError:
+        return False
+    os.close(master_fd)
+    os.close(slave_fd)
+    return True
+
+
+def strip_ansi(text):
+    return ANSI_ESCAPE_PATTERN.sub("", text)
+
+
+class ScrollbackBuffer:
+    """Ring buffer of output chunks holding at most ``limit`` characters."""
+
+    def __init__(self, limit=SCROLLBACK_LIMIT):
+        self.limit = limit
+        self.chunks = deque()
+        self.size = 0
+
+    def append(self, text):
+        if not text:
+            return
+        self.chunks.append(text)
+        self.size += len(text)
+        while self.size > self.limit and len(self.chunks) > 1:
+            self.size -= len(self.chunks.popleft())
+        if self.size > self.limit:
+            # A single chunk larger than the limit keeps only its tail.
+            tail = self.chunks[0][-self.limit:]
+            self.chunks[0] = tail
+            self.size = len(tail)
+
+    def text(self):
+        return "".join(self.chunks)
+
+    def tail_lines(self, count):
+        return strip_ansi(self.text()).replace("\r", "\n").splitlines()[-count:]
+
+    def clear(self):
+        self.chunks.clear()
+        self.size = 0
+
+
+class PacmanProgressParser:
+    """
+    Turns pacman/paru terminal output into structured progress events.
+
+    Each event is a dict {"package", "phase", "percent", "index", "total"}
+    where phase is "download", "install", "upgrade", "remove" or "build";
+    percent, index and total are None when the line does not carry them.
+    Progress bars redraw with carriage returns, so lines are split on both
+    "\\r" and "\\n" and an unfinished line is kept until more output arrives.
+    """
+
+    def __init__(self):
+        self.partial = ""
+        self.last_event = None
+
+    def feed(self, text):
+        lines = re.split(r"\r\n|\r|\n", self.partial + text)
+        self.partial = lines.pop()
+        events = []
+        for line in lines:
+            event = self.parse_line(strip_ansi(line))
+            if event is not None and event != self.last_event:
+                events.append(event)
+                self.last_event = event
+        return events
+
+    @staticmethod
+    def parse_line(line):
+        match = TRANSACTION_PATTERN.match(line.strip())
+        if match:
+            percent = match.group("percent")
+            return {
+                "package": match.group("package"),
+                "phase": TRANSACTION_PHASES[match.group("action")],
+                "percent": int(percent) if percent else None,
+                "index": int(match.group("index")),
+                "total": int(match.group("total")),
+            }
+        match = BUILD_START_PATTERN.match(line)
+        if match:
+            return {"package": match.group("package"), "phase": "build", "percent": 0, "index": None, "total": None}
+        match = BUILD_DONE_PATTERN.match(line)
+        if match:
+            return {"package": match.group("package"), "phase": "build", "percent": 100, "index": None, "total": None}
+        match = DOWNLOAD_PATTERN.match(line)
+        if match:
+            file_name = match.group("file")
+            package_match = PACKAGE_FILE_PATTERN.match(file_name)
+            return {
+                "package": package_match.group("name") if package_match else file_name,
+                "phase": "download",
+                "percent": int(match.group("percent")),
+                "index": None,
+                "total": None,
+            }
+        return None
+
+
+class PtyProcess:
+    """
+    A child process attached to a pseudo-terminal.
+
+    The child sees a real tty, so pacman/paru keep their colours, progress
+    bars and interactive prompts (sudo passwords, [Y/n] questions). The
+    master side is non-blocking: ``read()`` returns whatever is available,
+    "" when nothing is, and None once the child closed the terminal.
+    """
+
+    def __init__(self, command, rows=40, columns=120, env=None, cwd=None):
+        self.command = list(command)
+        master_fd, slave_fd = pty.openpty()
+        self.set_window_size(slave_fd, rows, columns)
+        child_env = dict(os.environ if env is None else env)
+        child_env.setdefault("TERM", "xterm-256color")
+        try:
+            # setsid(1) starts a new session and makes the pty (its stdin) the controlling
+            # terminal, so sudo can prompt on /dev/tty. Doing that in preexec_fn is not safe
+            # here: consoles are spawned from worker threads. The child is not a process
+            # group leader, so setsid does not fork and the pid stays the command's.
+            self.process = subprocess.Popen(
+                ["setsid", "--ctty", *self.command],
+                stdin=slave_fd,
+                stdout=slave_fd,
+                stderr=slave_fd,
+                env=child_env,
+                cwd=cwd,
+                close_fds=True,
+            )
+        except OSError:
+            os.close(master_fd)
+            raise
+        finally:
+            os.close(slave_fd)
+        self.master_fd = master_fd
+        os.set_blocking(master_fd, False)
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    @staticmethod
+    def set_window_size(fd, rows, columns):
+        fcntl.ioctl(fd, termios.TIOCSWINSZ, struct.pack("HHHH", rows, columns, 0, 0))
+
+    def resize(self, rows, columns):
+        if self.master_fd is not None:
+            self.set_window_size(self.master_fd, rows, columns)
+
+    def fileno(self):
+        return self.master_fd
+
+    def read(self):
+        if self.master_fd is None:
+            return None
+        try:
+            data = os.read(self.master_fd, READ_CHUNK_SIZE)
+        except BlockingIOError:
+            return ""
+        except OSError as e:
+            # Linux reports EIO on the master once every slave fd is closed.
+            if e.errno != errno.EIO:
+                raise
+            data = b""
+        if not data:
+            return None
+        return self.decoder.decode(data)
+
+    def write(self, text):
+        if self.master_fd is not None:
+            os.write(self.master_fd, text.encode("utf-8"))
+
+    def poll(self):
+        return self.process.poll()
+
+    def wait(self, timeout=None):
+        return self.process.wait(timeout)
+
+    def terminate(self):
+        if self.process.poll() is None:
+            try:
+                os.killpg(self.process.pid, signal.SIGTERM)
+            except OSError:
+                self.process.terminate()
+
+    def close(self):
+        if self.master_fd is not None:
+            os.close(self.master_fd)
+            self.master_fd = None
+
+
+def run_in_pty(command, on_output=None, on_event=None, scrollback=None, env=None, cwd=None, on_start=None):
+    """
+    Run ``command`` in a pty without a GUI, blocking until it exits.
+    ``on_output(text)`` gets raw output, ``on_event(event)`` parsed progress
+    and ``on_start(process)`` the PtyProcess (e.g. to terminate it later).
+    Returns the exit code.
+    """
+    process = PtyProcess(command, env=env, cwd=cwd)
+    if on_start is not None:
+        on_start(process)
+    parser = PacmanProgressParser()
+    try:
+        while True:
+            select.select([process.fileno()], [], [], 0.5)
+            text = process.read()
+            if text is None:
+                break
+            if not text:
+                continue
+            if scrollback is not None:
+                scrollback.append(text)
+            if on_output is not None:
+                on_output(text)
+            if on_event is not None:
+                for event in parser.feed(text):
+                    on_event(event)
+    finally:
+        process.close()
+    return process.wait()
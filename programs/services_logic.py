@@ -1,20 +1,80 @@
+import shlex
 import subprocess
 
+import yaml
 
-MANAGED_SERVICES = [
-    {
-        "key": "syncthing",
-        "name": "Syncthing",
-        "unit": "syncthing.service",
-        "scope": "user",
-    },
-    {
-        "key": "fstrim",
-        "name": "Filesystem Trim Timer",
-        "unit": "fstrim.timer",
-        "scope": "system",
-    },
-]
+from programs.config import SERVICES_PATH
+
+# Read for every managed unit in one `systemctl show` per scope.
+SHOW_PROPERTIES = ("Id", "LoadState", "UnitFileState", "ActiveState", "SubState")
+# Order the verbs of a reconcile run in; units are passed in requires order, reversed for stop.
+RECONCILE_VERBS = ("unmask", "stop", "disable", "mask", "enable", "start")
+# Verbs that take a unit down; their dependents (user units) go first, for the others their requirements do.
+STOP_VERBS = ("stop", "disable", "mask")
+ENABLED_STATES = ("enabled", "enabled-runtime")
+RUNNING_STATES = ("active", "activating", "reloading")
+
+
+def load_services(services_path=SERVICES_PATH):
+    """
+    Service definitions from bin/services.yaml in requires order.
+
+    Each is a dict {"key", "name", "unit", "scope", "enabled", "active",
+    "masked", "requires"}; the desired states are True, False or None (not
+    managed). Raises RuntimeError for unknown or circular requirements and
+    for a system service requiring a user service, which systemd cannot
+    honour (a user service may require a system one).
+    """
+    if not services_path.exists():
+        return []
+    with open(services_path, "r", encoding="utf-8") as services_file:
+        data = yaml.safe_load(services_file) or []
+
+    services = {}
+    for entry in data:
+        if not isinstance(entry, dict) or not entry.get("key") or not entry.get("unit"):
+            continue
+        services[entry["key"]] = {
+            "key": entry["key"],
+            "name": entry.get("name", entry["unit"]),
+            "unit": entry["unit"],
+            "scope": "system" if entry.get("scope") == "system" else "user",
+            "enabled": entry.get("enabled"),
+            "active": entry.get("active"),
+            "masked": entry.get("masked"),
+            "requires": list(entry.get("requires") or []),
+        }
+    return order_by_requirements(services)
+
+
+def order_by_requirements(services):
+    """Depth-first topological order of {key: service}: requirements come before the services needing them."""
+    ordered = []
+    visiting = set()
+    done = set()
+
+    def visit(key, needed_by):
+        if key in done:
+            return
+        if key not in services:
+            raise RuntimeError(f"{needed_by} requires unknown service {key}")
+        if key in visiting:
+            raise RuntimeError(f"Circular service requirement at {key}")
+        visiting.add(key)
+        for requirement in services[key]["requires"]:
+            visit(requirement, key)
+            if services[key]["scope"] == "system" and services[requirement]["scope"] == "user":
+                raise RuntimeError(f"System service {key} cannot require user service {requirement}")
+        visiting.discard(key)
+        done.add(key)
+        ordered.append(services[key])
+
+    for key in services:
+        visit(key, key)
+    return ordered
+
+
+MANAGED_SERVICES = load_services()
 
 
 def _run_systemctl_user(*args):
@@ -43,17 +103,76 @@ def _run_systemctl(service, *args):
     return _run_systemctl_user(*args)
 
 
-def _read_systemctl_state(service, *args):
-    result = _run_systemctl(service, *args)
-    stdout = result.stdout.strip()
-    if result.returncode != 0:
-        if stdout:
-            return stdout
-        stderr = result.stderr.strip()
-        if stderr:
-            return f"error: {stderr}"
-        return "unknown"
-    return stdout or "unknown"
+def _systemctl_show(scope, units):
+    """One ``systemctl show`` for every unit of a scope; reading state needs no root."""
+    scope_args = ["--user"] if scope == "user" else []
+    return subprocess.run(
+        ["systemctl", *scope_args, "show", f"--property={','.join(SHOW_PROPERTIES)}", "--", *units],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=False,
+    )
+
+
+def parse_systemctl_show(output):
+    """Split multi-unit ``systemctl show`` output into one {property: value} dict per unit, in order."""
+    units = []
+    properties = {}
+    for line in output.splitlines():
+        if not line.strip():
+            if properties:
+                units.append(properties)
+                properties = {}
+            continue
+        name, _, value = line.partition("=")
+        properties[name] = value
+    if properties:
+        units.append(properties)
+    return units
+
+
+def describe_unit_state(properties):
+    """Unit state dict from systemd Unit properties (``systemctl show`` or D-Bus GetAll)."""
+    load_state = properties.get("LoadState") or "unknown"
+    enabled_state = properties.get("UnitFileState")
+    if not enabled_state:
+        # Units without a unit file report no UnitFileState; is-enabled said "not-found" for these.
+        enabled_state = "not-found" if load_state == "not-found" else "unknown"
+    return {
+        "load_state": load_state,
+        "enabled_state": enabled_state,
+        "active_state": properties.get("ActiveState") or "unknown",
+        "sub_state": properties.get("SubState") or "",
+    }
+
+
+def unit_error_state(error_message):
+    error = f"error: {error_message}" if error_message else "unknown"
+    return {"load_state": "unknown", "enabled_state": error, "active_state": error, "sub_state": ""}
+
+
+def read_unit_states(services):
+    """{(scope, unit): state} for ``services`` with one systemctl call per scope, however many units there are."""
+    states = {}
+    units_by_scope = {}
+    for service in services:
+        units_by_scope.setdefault(service.get("scope", "user"), []).append(service["unit"])
+    for scope, units in units_by_scope.items():
+        result = _systemctl_show(scope, units)
+        blocks = parse_systemctl_show(result.stdout)
+        if result.returncode != 0 and not blocks:
+            for unit in units:
+                states[(scope, unit)] = unit_error_state(result.stderr.strip())
+            continue
+        if len(blocks) == len(units):
+            # systemctl answers in argument order; Id can differ from the requested name for aliases.
+            pairs = zip(units, blocks)
+        else:
+            pairs = ((block.get("Id"), block) for block in blocks)
+        for unit, properties in pairs:
+            states[(scope, unit)] = describe_unit_state(properties)
+    return states
 
 
 def has_system_services():
@@ -97,16 +216,132 @@ def is_sudo_auth_error(error_message):
 
 
 def get_managed_services():
-    services = []
-    for service in MANAGED_SERVICES:
-        services.append(
-            {
-                **service,
-                "enabled_state": _read_systemctl_state(service, "is-enabled", service["unit"]),
-                "active_state": _read_systemctl_state(service, "is-active", service["unit"]),
-            }
+    states = read_unit_states(MANAGED_SERVICES)
+    return [
+        {**service, **states.get((service.get("scope", "user"), service["unit"]), unit_error_state(""))}
+        for service in MANAGED_SERVICES
+    ]
+
+
+def with_requirements(keys, services=None):
+    """The services named by ``keys`` plus everything they require, in requires order."""
+    services = MANAGED_SERVICES if services is None else services
+    by_key = {service["key"]: service for service in services}
+    selected = set()
+    pending = list(keys)
+    while pending:
+        key = pending.pop()
+        if key in selected:
+            continue
+        if key not in by_key:
+            raise RuntimeError(f"Unknown service: {key}")
+        selected.add(key)
+        pending.extend(by_key[key]["requires"])
+    return [service for service in services if service["key"] in selected]
+
+
+def plan_reconcile(services):
+    """
+    Diff desired against current state for ``services`` (get_managed_services() rows).
+
+    Returns {"changes": [{"key", "unit", "scope", "verb"}], "skipped": [{"key", "unit", "reason"}]};
+    changes are in RECONCILE_VERBS order.
+    """
+    changes = []
+    skipped = []
+    for service in services:
+        enabled_state = service["enabled_state"]
+        if service["load_state"] == "not-found" or enabled_state.startswith("error") or enabled_state == "unknown":
+            if any(service.get(field) is not None for field in ("enabled", "active", "masked")):
+                skipped.append({"key": service["key"], "unit": service["unit"], "reason": enabled_state})
+            continue
+        masked = enabled_state in ("masked", "masked-runtime")
+        running = service["active_state"] in RUNNING_STATES
+        verbs = []
+        if service.get("masked"):
+            if running:
+                verbs.append("stop")
+            if not masked:
+                verbs.append("mask")
+        else:
+            if masked and (service.get("masked") is False or service.get("enabled") or service.get("active")):
+                verbs.append("unmask")
+                masked = False
+            if service.get("enabled") and not masked and enabled_state not in ENABLED_STATES:
+                # static/indirect/generated units cannot be enabled; enable only what is disabled.
+                if enabled_state in ("disabled", "masked", "masked-runtime"):
+                    verbs.append("enable")
+            elif service.get("enabled") is False and enabled_state in ENABLED_STATES:
+                verbs.append("disable")
+            if service.get("active") and not running and not masked:
+                verbs.append("start")
+            elif service.get("active") is False and running:
+                verbs.append("stop")
+        for verb in verbs:
+            changes.append({"key": service["key"], "unit": service["unit"], "scope": service["scope"], "verb": verb})
+    changes.sort(key=lambda change: RECONCILE_VERBS.index(change["verb"]))
+    return {"changes": changes, "skipped": skipped}
+
+
+def reconcile_commands(changes):
+    """
+    [(scope, systemctl argument list)] in the order to run them: one call per
+    verb and scope, stops in reverse requires order. User services may
+    require system ones, so system units come up before user units and go
+    down after them.
+    """
+    commands = []
+    for verb in RECONCILE_VERBS:
+        scopes = ("user", "system") if verb in STOP_VERBS else ("system", "user")
+        for scope in scopes:
+            units = [change["unit"] for change in changes if change["verb"] == verb and change["scope"] == scope]
+            if verb == "stop":
+                units.reverse()
+            if units:
+                commands.append((scope, [verb, "--", *units]))
+    return commands
+
+
+def apply_reconcile(plan):
+    """
+    Run a plan_reconcile() plan in reconcile_commands() order: user units
+    with plain ``systemctl --user``, each run of consecutive system calls in
+    one ``sudo -n sh -c``. Without system stops that have to wait for user
+    stops, a bulk apply needs a single privileged invocation.
+    """
+    commands = reconcile_commands(plan["changes"])
+    index = 0
+    while index < len(commands):
+        scope, arguments = commands[index]
+        index += 1
+        if scope == "user":
+            result = _run_systemctl_user(*arguments)
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.strip() or f"systemctl --user {arguments[0]} failed")
+            continue
+        system_commands = [arguments]
+        while index < len(commands) and commands[index][0] == "system":
+            system_commands.append(commands[index][1])
+            index += 1
+        script = " && ".join(shlex.join(["systemctl", *arguments]) for arguments in system_commands)
+        result = subprocess.run(
+            ["sudo", "-n", "sh", "-c", script],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=False,
         )
-    return services
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or "Failed to apply system service changes")
+
+
+def reconcile_services(keys=None):
+    """Bring the services named by ``keys`` (all when None) and their requirements to the declared state."""
+    services = MANAGED_SERVICES if keys is None else with_requirements(keys)
+    selected = {service["key"] for service in services}
+    plan = plan_reconcile([service for service in get_managed_services() if service["key"] in selected])
+    apply_reconcile(plan)
+    return plan
 
 
 def start_service(service):
@@ -0,0 +1,254 @@
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import threading
+from pathlib import Path
+
+from programs.config import CACHE_DIR, PACMAN_CONF_PATH, PACMAN_SYNC_DB_PATH
+from programs.pacman_db import strip_version_constraint
+
+SYNC_INDEX_CACHE_PATH = CACHE_DIR.joinpath("sync_db_index.json.gz")
+SYNC_INDEX_CACHE_VERSION = 1
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _parse_desc_text(text, fields):
+    current = None
+    for line in text.splitlines():
+        if line.startswith("%") and line.endswith("%") and len(line) > 2:
+            current = fields.setdefault(line[1:-1], [])
+        elif line and current is not None:
+            current.append(line)
+        else:
+            current = None
+    return fields
+
+
+def _open_zstd_stream(db_path, db_file):
+    """Return (stream, process) decompressing a zstd file without touching the disk."""
+    try:
+        import zstandard
+        return zstandard.ZstdDecompressor().stream_reader(db_file), None
+    except ImportError:
+        pass
+    if shutil.which("zstd") is None:
+        raise RuntimeError("zstd compressed sync database needs the zstandard module or the zstd tool")
+    process = subprocess.Popen(["zstd", "-dcq", str(db_path)], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    return process.stdout, process
+
+
+def read_sync_db(db_path):
+    """
+    Stream a pacman sync database (``<repo>.db``) and return
+    {name: [version, description, csize, isize, provides, depends]}.
+
+    The archive is read member by member straight from the compressed file;
+    nothing is extracted to disk. gzip, xz, bzip2 and zstd are supported.
+    """
+    packages = {}
+    process = None
+    with open(db_path, "rb") as db_file:
+        magic = db_file.read(4)
+        db_file.seek(0)
+        if magic == ZSTD_MAGIC:
+            stream, process = _open_zstd_stream(db_path, db_file)
+            archive = tarfile.open(fileobj=stream, mode="r|")
+        else:
+            archive = tarfile.open(fileobj=db_file, mode="r|*")
+
+        try:
+            per_dir = {}
+            for member in archive:
+                if not member.isfile():
+                    continue
+                dir_name, _, file_name = member.name.rpartition("/")
+                if file_name not in ("desc", "depends"):
+                    continue
+                content = archive.extractfile(member).read().decode("utf-8", errors="replace")
+                _parse_desc_text(content, per_dir.setdefault(dir_name, {}))
+        finally:
+            archive.close()
+            if process is not None:
+                process.stdout.close()
+                process.wait()
+
+    for fields in per_dir.values():
+        name = fields.get("NAME", [None])[0]
+        if not name:
+            continue
+        packages[name] = [
+            fields.get("VERSION", [""])[0],
+            fields.get("DESC", [""])[0],
+            int(fields.get("CSIZE", ["0"])[0] or 0),
+            int(fields.get("ISIZE", ["0"])[0] or 0),
+            [strip_version_constraint(value) for value in fields.get("PROVIDES", [])],
+            [strip_version_constraint(value) for value in fields.get("DEPENDS", [])],
+        ]
+    return packages
+
+
+def read_repo_order(pacman_conf_path=None):
+    """Return repository names in pacman.conf order (which is also pacman's priority order)."""
+    path = Path(pacman_conf_path) if pacman_conf_path else PACMAN_CONF_PATH
+    repos = []
+    try:
+        lines = path.read_text().splitlines()
+    except OSError:
+        return repos
+    for raw_line in lines:
+        line = raw_line.strip()
+        if line.startswith("[") and line.endswith("]"):
+            section = line[1:-1].strip()
+            if section and section != "options":
+                repos.append(section)
+    return repos
+
+
+class SyncDatabaseIndex:
+    """
+    In-memory index of every package in pacman's sync databases.
+
+    Answers "is this in the official repos, and which repo" without forking
+    pacman. Parsed databases are persisted to a gzip'd JSON cache keyed by
+    each ``.db`` file's mtime and size, so later launches only re-read the
+    archives that ``pacman -Sy`` actually replaced.
+    """
+
+    def __init__(self, sync_dir=None, cache_path=None, pacman_conf_path=None):
+        self.sync_dir = Path(sync_dir) if sync_dir else PACMAN_SYNC_DB_PATH
+        self.cache_path = Path(cache_path) if cache_path else SYNC_INDEX_CACHE_PATH
+        self.pacman_conf_path = pacman_conf_path
+        self.repos = {}
+        self.repo_order = []
+        self.provides = {}
+        self._stamps = None
+        self._lock = threading.Lock()
+
+    def _db_stamps(self):
+        stamps = {}
+        try:
+            db_paths = list(self.sync_dir.glob("*.db"))
+        except OSError:
+            return stamps
+        for db_path in db_paths:
+            try:
+                stat = db_path.stat()
+            except OSError:
+                continue
+            stamps[db_path.stem] = [stat.st_mtime_ns, stat.st_size]
+        return stamps
+
+    def refresh(self, force=False):
+        with self._lock:
+            stamps = self._db_stamps()
+            if force or stamps != self._stamps:
+                self._build(stamps)
+                self._stamps = stamps
+        return self
+
+    def _build(self, stamps):
+        cached = self._load_cache()
+        repos = {}
+        dirty = set(cached) != set(stamps)
+        for repo, stamp in stamps.items():
+            entry = cached.get(repo)
+            if entry is not None and entry.get("stamp") == stamp:
+                repos[repo] = entry["packages"]
+                continue
+            try:
+                repos[repo] = read_sync_db(self.sync_dir.joinpath(f"{repo}.db"))
+            except (OSError, tarfile.TarError, RuntimeError, EOFError) as e:
+                print(f"Failed to read sync database {repo}: {e}")
+                continue
+            dirty = True
+
+        if dirty:
+            self._save_cache({repo: {"stamp": stamps[repo], "packages": packages}
+                              for repo, packages in repos.items()})
+
+        configured = read_repo_order(self.pacman_conf_path)
+        self.repo_order = [repo for repo in configured if repo in repos]
+        self.repo_order.extend(sorted(repo for repo in repos if repo not in self.repo_order))
+        self.repos = repos
+        self.provides = {}
+        for repo in reversed(self.repo_order):
+            for name, package in repos[repo].items():
+                for provided in package[4]:
+                    self.provides[provided] = name
+
+    def _load_cache(self):
+        try:
+            with gzip.open(self.cache_path, "rt", encoding="utf-8") as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError, EOFError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != SYNC_INDEX_CACHE_VERSION:
+            return {}
+        return data.get("repos", {})
+
+    def _save_cache(self, repos):
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_path.parent, prefix=".sync_db_index.")
+            with os.fdopen(fd, "wb") as raw_file, gzip.open(raw_file, "wt", encoding="utf-8") as cache_file:
+                json.dump({"version": SYNC_INDEX_CACHE_VERSION, "repos": repos}, cache_file,
+                          separators=(",", ":"))
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            print(f"Failed to write sync database cache: {e}")
+
+    def is_available(self):
+        return bool(self.repos)
+
+    def repo_of(self, name):
+        """Return the first repository (pacman priority order) that carries ``name``, or None."""
+        for repo in self.repo_order:
+            if name in self.repos[repo]:
+                return repo
+        return None
+
+    def get(self, name):
+        repo = self.repo_of(name)
+        if repo is None:
+            return None
+        version, description, csize, isize, provides, depends = self.repos[repo][name]
+        return {
+            "name": name,
+            "repo": repo,
+            "version": version,
+            "description": description,
+            "download_size": csize,
+            "install_size": isize,
+            "provides": provides,
+            "depends": depends,
+        }
+
+    def resolve(self, name):
+        """Like ``get`` but also follows provides (e.g. "sh" -> bash)."""
+        package = self.get(name)
+        if package is None and name in self.provides:
+            package = self.get(self.provides[name])
+        return package
+
+    def __contains__(self, name):
+        return self.repo_of(name) is not None
+
+    def iter_packages(self):
+        seen = set()
+        for repo in self.repo_order:
+            for name in self.repos[repo]:
+                if name not in seen:
+                    seen.add(name)
+                    yield self.get(name)
+
+
+sync_database_index = SyncDatabaseIndex()
+
+
+def get_sync_index(force=False):
+    return sync_database_index.refresh(force=force)
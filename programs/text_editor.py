@@ -23,19 +23,20 @@ bash_extra_path = BASH_EXTRA_PATH
 bashrc_path = BASHRC_PATH
 bashrc_extra_text = 'if [ -f ~/.bash_extra ]; then\n. ~/.bash_extra\nfi'
 bash_extra_version = BASH_EXTRA_VERSION
-_bash_extra_body = BASH_EXTRA_TEMPLATE_PATH.read_text().rstrip()
-bash_extra_text = (
-    f"# Managed by arch-mysetup\n"
-    f"# arch-mysetup-bash-extra-version: {bash_extra_version}\n\n"
-    f"{_bash_extra_body}\n"
-)
 bash_custom_version = BASH_CUSTOM_VERSION
-_bash_custom_body = BASH_CUSTOM_TEMPLATE_PATH.read_text().rstrip()
-bash_custom_text = (
-    f"# Managed by arch-mysetup\n"
-    f"# arch-mysetup-bash-extra-version: {bash_custom_version}\n\n"
-    f"{_bash_custom_body}\n"
-)
+
+
+def managed_bash_text(template_path: Path, version: str) -> str:
+    """
+    A bash template with the managed version header.
+    Templates are read when written, not when this module is imported.
+    """
+    body = template_path.read_text().rstrip()
+    return (
+        f"# Managed by arch-mysetup\n"
+        f"# arch-mysetup-bash-extra-version: {version}\n\n"
+        f"{body}\n"
+    )
 
 
 # todo: find text and then read the whole line to edit eg. ParallelDownload=5 to edit the number
@@ -87,7 +88,7 @@ def update_bash_custom() -> None:
         print(f"Updating ~/.bash_extra to version {bash_custom_version}...")
     else:
         print(f"Installing ~/.bash_extra version {bash_custom_version}...")
-    bashrc_path.write_text(bash_custom_text)
+    bashrc_path.write_text(managed_bash_text(BASH_CUSTOM_TEMPLATE_PATH, bash_custom_version))
 
 
 def enable_bash_extra() -> bool:
@@ -129,7 +130,7 @@ def update_bash_extra() -> None:
         print(f"Updating ~/.bash_extra to version {bash_extra_version}...")
     else:
         print(f"Installing ~/.bash_extra version {bash_extra_version}...")
-    bash_extra_path.write_text(bash_extra_text)
+    bash_extra_path.write_text(managed_bash_text(BASH_EXTRA_TEMPLATE_PATH, bash_extra_version))
 
 
 def check_multilib() -> bool:
@@ -0,0 +1,179 @@
+from programs.aur_rpc import get_aur_client
+from programs.installer_logic import (
+    detect_install_methods,
+    get_install_method_from_source,
+    get_installed_index,
+    install_command,
+)
+from programs.pacman_db import strip_version_constraint
+from programs.sync_db import get_sync_index
+
+PACMAN_ASDEPS_COMMAND = ["sudo", "pacman", "-D", "--asdeps", "--quiet"]
+
+
+def format_size(size):
+    if size is None:
+        return ""
+    value = float(size)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if value < 1024 or unit == "GiB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return ""
+
+
+def _aur_repo_dependencies(aur_packages, planned, installed_index, sync_index):
+    """Repo packages that AUR packages depend on (to build or run) and that are not installed yet."""
+    if not aur_packages or not sync_index.is_available():
+        return []
+    dependencies = []
+    planned = set(planned)
+    seen = set(planned)
+    for info in get_aur_client().info(aur_packages).values():
+        if not info:
+            continue
+        for dependency in [*(info.get("Depends") or []), *(info.get("MakeDepends") or [])]:
+            dependency = strip_version_constraint(dependency)
+            if not dependency or dependency in seen or installed_index.is_installed(dependency):
+                continue
+            seen.add(dependency)
+            # Follows provides, e.g. "java-runtime" -> the repo package providing it.
+            package = sync_index.resolve(dependency)
+            if package is None or package["name"] in planned or package["name"] in dependencies:
+                continue
+            dependencies.append(package["name"])
+    return dependencies
+
+
+def _pulled_in_repo_packages(roots, installed_index, sync_index):
+    """
+    Repo packages pacman installs on top of ``roots``: the depends closure,
+    following provides and stopping at anything already installed.
+    """
+    if not roots or not sync_index.is_available():
+        return []
+    planned = set(roots)
+    pulled_in = []
+    queue = list(roots)
+    while queue:
+        package = sync_index.get(queue.pop(0))
+        if package is None:
+            continue
+        for dependency in package["depends"]:
+            if not dependency or installed_index.is_installed(dependency):
+                continue
+            provider = sync_index.resolve(dependency)
+            if provider is None or provider["name"] in planned or installed_index.is_installed(provider["name"]):
+                continue
+            planned.add(provider["name"])
+            pulled_in.append(provider)
+            queue.append(provider["name"])
+    return pulled_in
+
+
+def plan_install(apps, sources=None):
+    """
+    Plan installing ``apps`` as few transactions as possible, without running anything.
+
+    Every repo package goes into one ``pacman -S`` and every AUR package into
+    one ``paru -S``, after dropping names that are already installed. Repo
+    packages that the AUR packages depend on join the pacman transaction (and
+    are then marked as dependencies), so paru only has to build. ``sources``
+    maps app names to their apps.yaml source; other names are detected.
+
+    Returns a dict with the ordered ``steps`` (each {"method", "packages",
+    "command"}), the per-package ``repo_packages`` rows with download and
+    install sizes from the sync index, ``pulled_in`` rows for the repo
+    dependencies pacman resolves on its own, the size totals of both,
+    ``aur_packages``, ``dependencies``, ``already_installed`` and ``unknown``.
+    """
+    sources = sources or {}
+    installed_index = get_installed_index()
+    sync_index = get_sync_index()
+
+    requested = list(dict.fromkeys(app for app in apps if app))
+    already_installed = [app for app in requested if installed_index.is_installed(app)]
+    missing = [app for app in requested if not installed_index.is_installed(app)]
+
+    methods = {app: get_install_method_from_source(sources.get(app)) for app in missing}
+    undetected = [app for app, method in methods.items() if method is None]
+    if undetected:
+        methods.update(detect_install_methods(undetected))
+
+    repo_apps = [app for app in missing if methods[app] == "pacman"]
+    aur_apps = [app for app in missing if methods[app] == "paru"]
+    unknown = [app for app in missing if methods[app] is None]
+    dependencies = _aur_repo_dependencies(aur_apps, repo_apps + aur_apps, installed_index, sync_index)
+
+    repo_packages = []
+    for name in repo_apps + dependencies:
+        package = sync_index.get(name) if sync_index.is_available() else None
+        repo_packages.append({
+            "name": name,
+            "repo": package["repo"] if package else "",
+            "version": package["version"] if package else "",
+            "download_size": package["download_size"] if package else None,
+            "install_size": package["install_size"] if package else None,
+            "dependency": name in dependencies,
+        })
+
+    pulled_in = [
+        {
+            "name": package["name"],
+            "repo": package["repo"],
+            "version": package["version"],
+            "download_size": package["download_size"],
+            "install_size": package["install_size"],
+            "dependency": True,
+        }
+        for package in _pulled_in_repo_packages(repo_apps + dependencies, installed_index, sync_index)
+    ]
+
+    steps = []
+    if repo_packages:
+        names = [package["name"] for package in repo_packages]
+        steps.append({"method": "pacman", "packages": names, "command": install_command(names, "pacman")})
+    if dependencies:
+        steps.append({"method": "pacman", "packages": dependencies,
+                      "command": [*PACMAN_ASDEPS_COMMAND, *dependencies]})
+    if aur_apps:
+        steps.append({"method": "paru", "packages": aur_apps, "command": install_command(aur_apps, "paru")})
+
+    return {
+        "steps": steps,
+        "repo_packages": repo_packages,
+        "pulled_in": pulled_in,
+        "aur_packages": aur_apps,
+        "dependencies": dependencies,
+        "already_installed": already_installed,
+        "unknown": unknown,
+        "download_size": sum(package["download_size"] or 0 for package in repo_packages + pulled_in),
+        "install_size": sum(package["install_size"] or 0 for package in repo_packages + pulled_in),
+    }
+
+
+def describe_plan(plan):
+    """Human readable dry-run summary of a plan_install() result."""
+    lines = []
+    repo_packages = plan["repo_packages"]
+    if repo_packages:
+        lines.append(
+            f"Repositories (one pacman transaction): {len(repo_packages)} packages, "
+            f"{format_size(plan['download_size'])} to download, {format_size(plan['install_size'])} installed"
+        )
+        for package in repo_packages:
+            note = " (dependency of an AUR package)" if package["dependency"] else ""
+            size = format_size(package["download_size"]) or "size unknown"
+            lines.append(f"  {package['name']} {package['version']} [{package['repo'] or '?'}] {size}{note}")
+        if plan["pulled_in"]:
+            pulled_in_size = sum(package["download_size"] or 0 for package in plan["pulled_in"])
+            lines.append(f"  + {len(plan['pulled_in'])} dependencies pacman pulls in ({format_size(pulled_in_size)}): "
+                         f"{', '.join(package['name'] for package in plan['pulled_in'])}")
+    if plan["aur_packages"]:
+        lines.append(f"AUR (one paru transaction, built locally): {len(plan['aur_packages'])} packages")
+        lines.append(f"  {', '.join(plan['aur_packages'])}")
+    if plan["already_installed"]:
+        lines.append(f"Already installed, skipped: {', '.join(plan['already_installed'])}")
+    if plan["unknown"]:
+        lines.append(f"Not found in the repositories or the AUR: {', '.join(plan['unknown'])}")
+    return "\n".join(lines)
@@ -0,0 +1,69 @@
+#!/bin/bash
+
+# Applies a network drive plan staged by programs/network_drives.py in one privileged step.
+#   $1  staging directory: fstab (optional), units/, remove_units, unmount, mount, automount
+#   $2  sha256 of /etc/fstab when the plan was made; nothing is changed if it differs
+# Prints "mounted <mount point>" or "failed <mount point>" for every share it mounts.
+
+STAGE="$1"
+EXPECTED_SHA="$2"
+UNIT_DIR=/etc/systemd/system
+MOUNT_TIMEOUT=30
+
+CURRENT_SHA="$(sha256sum /etc/fstab 2>/dev/null | cut -d' ' -f1)"
+if [ "$CURRENT_SHA" != "$EXPECTED_SHA" ] && [ -e /etc/fstab ]; then
+    echo "/etc/fstab was changed by something else, nothing applied" >&2
+    exit 3
+fi
+
+# Unmount shares that are removed or remounted with new settings.
+while read -r mount_point; do
+    [ -n "$mount_point" ] && { timeout 10 umount "$mount_point" || umount -l "$mount_point"; }
+done < "$STAGE/unmount"
+
+# Replace fstab atomically: write next to it, then rename over it.
+if [ -f "$STAGE/fstab" ]; then
+    [ -e /etc/fstab ] && cp -p /etc/fstab /etc/fstab.arch-mysetup.bak
+    install -m 644 -o root -g root "$STAGE/fstab" /etc/fstab.arch-mysetup.new || exit 1
+    sync /etc/fstab.arch-mysetup.new
+    mv -f /etc/fstab.arch-mysetup.new /etc/fstab || exit 1
+fi
+
+while read -r unit; do
+    [ -z "$unit" ] && continue
+    systemctl disable --now "$unit" 2>/dev/null
+    rm -f "$UNIT_DIR/$unit"
+done < "$STAGE/remove_units"
+for unit in "$STAGE"/units/*; do
+    [ -e "$unit" ] && install -m 644 -o root -g root "$unit" "$UNIT_DIR/"
+done
+systemctl daemon-reload
+
+# Mount every new share at once; a slow server only delays its own line.
+mount_points=()
+pids=()
+while read -r mount_point; do
+    [ -z "$mount_point" ] && continue
+    mkdir -p "$mount_point"
+    timeout "$MOUNT_TIMEOUT" mount "$mount_point" &
+    mount_points+=("$mount_point")
+    pids+=($!)
+done < "$STAGE/mount"
+
+automounts=()
+while read -r unit; do
+    [ -n "$unit" ] && automounts+=("$unit")
+done < "$STAGE/automount"
+if [ ${#automounts[@]} -gt 0 ]; then
+    systemctl enable --now "${automounts[@]}" || status=1
+fi
+
+for index in "${!pids[@]}"; do
+    if wait "${pids[$index]}"; then
+        echo "mounted ${mount_points[$index]}"
+    else
+        echo "failed ${mount_points[$index]}"
+        status=1
+    fi
+done
+exit ${status:-0}
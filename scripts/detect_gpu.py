@@ -1,51 +1,32 @@
-import subprocess
 import sys
 from pathlib import Path
 
-parent_dir = str(Path(__file__).resolve().parent.parent.joinpath("gui"))
-sys.path.append(parent_dir)
+project_root = str(Path(__file__).resolve().parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
 
-from installer_logic import open_terminal
+from programs.hardware_probe import detect_gpus, driver_packages, gpu_vendors
+from programs.installer_logic import open_terminal
 
 
 def detect_gpu_vendor():
-    try:
-        result = subprocess.run(
-            ["lspci", "-v"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        lines = result.stdout.splitlines()
-        for line in lines:
-            if "VGA compatible controller" in line:
-                if "Intel" in line:
-                    return "Intel"
-                elif "NVIDIA" in line:
-                    return "NVIDIA"
-                elif "AMD" in line:
-                    return "AMD"
-        return None
-    except subprocess.CalledProcessError:
-        return None
-
-
-def install_drivers(vendor_name):
-    if vendor_name == "Intel":
-        open_terminal(
-            ["sudo", "pacman", "-S", "--needed", "mesa", "lib32-mesa", "vulkan-intel", "lib32-vulkan-intel","xf86-video-intel"])
-    elif vendor_name == "NVIDIA":
-        open_terminal(["sudo", "pacman", "-S", "--needed", "nvidia", "nvidia-utils", "lib32-nvidia-utils"])
-    elif vendor_name == "AMD":
-        open_terminal(
-            ["sudo", "pacman", "-S", "--needed", "mesa", "lib32-mesa", "vulkan-radeon", "lib32-vulkan-radeon",
-             "xf86-video-amdgpu"])
+    """Vendor of the boot GPU ("Intel", "NVIDIA" or "AMD"), None when no known GPU is present."""
+    vendors = gpu_vendors()
+    return vendors[0] if vendors else None
+
+
+def install_drivers(gpus=None):
+    packages = driver_packages(gpus)
+    if packages:
+        open_terminal(["sudo", "pacman", "-S", "--needed", *packages])
 
 
 if __name__ == "__main__":
-    vendor = detect_gpu_vendor()
-    if vendor:
-        print(f"Detected {vendor} GPU. Installing drivers...")
-        # install_drivers(vendor)
+    gpus = detect_gpus()
+    for gpu in gpus:
+        print(f"{gpu['slot']}: {gpu['vendor']} {gpu['device_id'] or 0:04x} (driver: {gpu['driver'] or 'none'})")
+    if gpu_vendors(gpus):
+        print(f"Detected {' + '.join(gpu_vendors(gpus))} GPU. Installing drivers...")
+        # install_drivers(gpus)
     else:
         print("GPU vendor not recognized. No drivers installed.")
@@ -21,12 +21,7 @@ airplay_dest_path = AIRPLAY_DEST_PATH
 xorg_keyboard_conf_path = XORG_KEYBOARD_CONF_PATH
 pacman_mirrorlist_path = PACMAN_MIRRORLIST_PATH
 pacman_reflector_config_path = PACMAN_REFLECTOR_CONFIG_PATH
-
-# texts
-zeroconf_text = ZEROCONF_TEMPLATE_PATH.read_text()
-airplay_text = AIRPLAY_TEMPLATE_PATH.read_text()
-xorg_keyboard_conf_text = XORG_KEYBOARD_TEMPLATE_PATH.read_text()
-reflector_text = REFLECTOR_TEMPLATE_PATH.read_text()
+# Templates (bin/*.txt) are read by the tweak that writes them, not at import time.
 
 
 def reflector_service_timer():
@@ -40,11 +35,28 @@ def reflector_service_timer():
         if not command_exists("reflector"):
             return
         write_config_file(pacman_reflector_config_path,
-                          reflector_text, True, True)
+                          REFLECTOR_TEMPLATE_PATH.read_text(), True, True)
         command = ["pkexec", "systemctl", "enable", "--now", "reflector.timer"]
         subprocess.run(command, check=True)
 
 
+def is_reflector_enabled():
+    return pacman_reflector_config_path.exists()
+
+
+def is_git_keystore_enabled():
+    result = subprocess.run(
+        ["git", "config", "--global", "credential.helper"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=False,
+    )
+    if result.returncode not in (0, 1):
+        return None
+    return result.stdout.strip() == "store"
+
+
 def git_keystore():
     result = subprocess.run(
         ["git", "config", "--global", "credential.helper"],
@@ -111,6 +123,14 @@ def write_config_file(file: Path, content: str, sudo=False, remove=False):
         return True
 
 
+def is_zeroconf_enabled():
+    return zeroconf_dest_path.exists()
+
+
+def is_airplay_enabled():
+    return airplay_dest_path.exists()
+
+
 def zeroconf_discover_pw():
     """
     Write zeroconf discover config file
@@ -118,7 +138,7 @@ def zeroconf_discover_pw():
     """
     if zeroconf_dest_path.exists():
         return
-    write_config_file(zeroconf_dest_path, zeroconf_text)
+    write_config_file(zeroconf_dest_path, ZEROCONF_TEMPLATE_PATH.read_text())
     subprocess.run(["pactl", "load-module", "module-zeroconf-discover"])
 
 
@@ -129,11 +149,11 @@ def airplay_discover_pw():
     """
     if airplay_dest_path.exists():
         return
-    write_config_file(airplay_dest_path, airplay_text)
+    write_config_file(airplay_dest_path, AIRPLAY_TEMPLATE_PATH.read_text())
     subprocess.run(["pactl", "load-module", "module-raop-discover"])
 
 
 def xorg_keyboard_layout_fi():
     if xorg_keyboard_conf_path.exists():
         return
-    write_config_file(xorg_keyboard_conf_path, xorg_keyboard_conf_text, True)
+    write_config_file(xorg_keyboard_conf_path, XORG_KEYBOARD_TEMPLATE_PATH.read_text(), True)